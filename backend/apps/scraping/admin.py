@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import XAccount, SearchTarget, ScrapingJob, Tweet
+from .models import XAccount, SearchTarget, ScrapingJob, Tweet, ExportArtifact, JobMetrics, MediaFile
 
 
 @admin.register(XAccount)
@@ -8,10 +8,12 @@ class XAccountAdmin(admin.ModelAdmin):
     """
     Para gestionar las cuentas de X desde el admin
     """
-    list_display = ['username', 'email', 'is_active', 'last_login', 'has_cookies', 'owner']
+    list_display = ['username', 'email', 'is_active', 'last_login', 'has_cookies',
+                    'session_expires_at', 'owner']
     list_filter = ['is_active', 'last_login']
     search_fields = ['username', 'email']
-    readonly_fields = ['created_at', 'updated_at', 'last_login']
+    readonly_fields = ['created_at', 'updated_at', 'last_login',
+                       'session_expires_at', 'session_checked_at']
     
     def has_cookies(self, obj):
         """Indica si tiene cookies guardadas"""
@@ -38,24 +40,33 @@ class ScrapingJobAdmin(admin.ModelAdmin):
     """
     Para ver y gestionar los trabajos de scraping
     """
-    list_display = ['name', 'account', 'query_type', 'status_colored', 
+    list_display = ['name', 'account', 'query_type', 'status_colored', 'priority',
                     'tweets_count', 'date_range', 'created_by', 'created_at']
-    list_filter = ['status', 'query_type', 'created_at']
+    list_filter = ['status', 'job_type', 'query_type', 'priority', 'created_at']
     search_fields = ['name', 'error_message']
-    readonly_fields = ['created_at', 'started_at', 'completed_at', 
-                       'tweets_count', 'duration', 'error_display']
+    readonly_fields = ['created_at', 'started_at', 'completed_at', 'queued_at',
+                       'tweets_count', 'duration', 'error_display', 'coalesced_into']
     
     # Agrupamos los campos en secciones
     fieldsets = (
         ('Información básica', {
-            'fields': ('name', 'account', 'targets')
+            'fields': ('name', 'job_type', 'refresh_source', 'account', 'targets')
         }),
         ('Parámetros de búsqueda', {
-            'fields': ('start_date', 'end_date', 'query_type')
+            'fields': ('start_date', 'end_date', 'query_type', 'export_format',
+                      'expand_conversations', 'download_media')
+        }),
+        ('Cola', {
+            'fields': ('priority', 'queued_at')
+        }),
+        ('Límites', {
+            'fields': ('max_duration_minutes', 'max_tweets', 'max_pages',
+                      'max_browser_memory_mb', 'cancel_requested'),
+            'classes': ('collapse',)
         }),
         ('Estado y resultados', {
             'fields': ('status', 'tweets_count', 'error_display',
-                      'started_at', 'completed_at', 'duration')
+                      'started_at', 'completed_at', 'duration', 'coalesced_into')
         }),
         ('Metadata', {
             'fields': ('created_by', 'created_at'),
@@ -68,8 +79,11 @@ class ScrapingJobAdmin(admin.ModelAdmin):
         colors = {
             'pending': 'orange',
             'running': 'blue',
+            'waiting': 'purple',
             'completed': 'green',
-            'failed': 'red'
+            'failed': 'red',
+            'cancelled': 'gray',
+            'budget_exceeded': 'darkorange'
         }
         return format_html(
             '<span style="color: {};">{}</span>',
@@ -104,7 +118,7 @@ class TweetAdmin(admin.ModelAdmin):
     """
     list_display = ['tweet_id', 'username', 'text_preview', 'date', 
                     'metrics_summary', 'job']
-    list_filter = ['date', 'is_rt', 'is_quote', 'job']
+    list_filter = ['date', 'is_rt', 'is_quote', 'is_thread', 'job']
     search_fields = ['text', 'username', 'tweet_id']
     readonly_fields = ['scraped_at', 'url', 'formatted_text']
     
@@ -132,4 +146,43 @@ class TweetAdmin(admin.ModelAdmin):
     def formatted_text(self, obj):
         """Texto completo con formato"""
         return format_html('<pre style="white-space: pre-wrap;">{}</pre>', obj.text)
-    formatted_text.short_description = 'Texto completo'
\ No newline at end of file
+    formatted_text.short_description = 'Texto completo'
+
+
+@admin.register(ExportArtifact)
+class ExportArtifactAdmin(admin.ModelAdmin):
+    """
+    Exports ya generados de cada job
+    """
+    list_display = ['job', 'export_format', 'size', 'sha256', 'created_at']
+    list_filter = ['export_format']
+    readonly_fields = ['job', 'export_format', 'path', 'sha256', 'size', 'created_at']
+
+
+@admin.register(JobMetrics)
+class JobMetricsAdmin(admin.ModelAdmin):
+    """
+    Dónde se fue el tiempo de cada job
+    """
+    list_display = ['job', 'total_seconds', 'tweets_extracted', 'updated_at']
+    readonly_fields = ['job', 'phases', 'counters', 'updated_at']
+    
+    def total_seconds(self, obj):
+        """Suma de todas las fases"""
+        return round(sum(p.get('total', 0) for p in obj.phases.values()), 1)
+    total_seconds.short_description = 'Segundos medidos'
+    
+    def tweets_extracted(self, obj):
+        return obj.counters.get('tweets_extracted', 0)
+    tweets_extracted.short_description = 'Tweets'
+
+
+@admin.register(MediaFile)
+class MediaFileAdmin(admin.ModelAdmin):
+    """
+    Fotos y videos bajados de los tweets
+    """
+    list_display = ['path', 'content_type', 'size', 'created_at']
+    list_filter = ['content_type']
+    search_fields = ['url', 'sha256']
+    readonly_fields = ['url', 'sha256', 'path', 'content_type', 'size', 'created_at']
@@ -1,6 +1,21 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 
 
 class ScrapingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.scraping'
+
+    def ready(self):
+        if settings.SCRAPING_RUNNER == 'async':
+            # Los jobs corren en run_scraping_worker: el progreso tiene que
+            # cruzar de proceso, el broker en memoria no le llega a la API
+            try:
+                import redis  # noqa: F401
+            except ImportError:
+                redis = None
+            if not settings.SCRAPING_PROGRESS_REDIS_URL or redis is None:
+                raise ImproperlyConfigured(
+                    "SCRAPING_RUNNER=async necesita SCRAPING_PROGRESS_REDIS_URL y el paquete redis"
+                )
@@ -0,0 +1,367 @@
+import html
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+from urllib.parse import parse_qs, urlparse
+
+
+# GIF transparente de 1x1 para las "imágenes" de los tweets
+PIXEL_GIF = bytes.fromhex(
+    '47494638396101000100800000000000ffffff21f90401000000002c00000000010001000002024401003b'
+)
+
+SEARCH_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Buscar / X</title>
+<style>
+  body {{ margin: 0; font-family: sans-serif; }}
+  article {{ min-height: 140px; border-bottom: 1px solid #ddd; padding: 8px; box-sizing: border-box; }}
+</style>
+</head>
+<body>
+<main role="main">
+<div data-testid="primaryColumn">
+<section aria-label="Timeline: Search timeline">
+<div id="timeline">{first_page}</div>
+</section>
+</div>
+</main>
+<script>
+  // Scroll infinito: al llegar al fondo pide la página siguiente, como el timeline real
+  let cursor = {next_cursor};
+  let loading = false;
+  let query = {query};
+  const timeline = document.getElementById('timeline');
+  async function fetchPage(page) {{
+    const response = await fetch('/i/api/timeline?q=' + encodeURIComponent(query) + '&cursor=' + page);
+    return response.json();
+  }}
+  async function loadMore() {{
+    if (loading || cursor === null) return;
+    if (window.innerHeight + window.scrollY < document.body.scrollHeight - 400) return;
+    loading = true;
+    try {{
+      const data = await fetchPage(cursor);
+      timeline.insertAdjacentHTML('beforeend', data.html);
+      cursor = data.next;
+    }} finally {{
+      loading = false;
+    }}
+    // Como el timeline real: sigue pidiendo hasta llenar la pantalla
+    setTimeout(loadMore, 0);
+  }}
+  window.addEventListener('scroll', loadMore, {{passive: true}});
+  loadMore();
+  // Cambio de ruta del lado del cliente (como el router de X): sin recargar
+  // la página, solo se baja la primera página del timeline nuevo
+  window.addEventListener('popstate', async () => {{
+    query = new URLSearchParams(location.search).get('q') || '';
+    cursor = null;
+    const data = await fetchPage(0);
+    timeline.replaceChildren();
+    timeline.insertAdjacentHTML('beforeend', data.html ||
+      '<div data-testid="empty_state_header_text">Sin resultados</div>');
+    cursor = data.next;
+    loadMore();
+  }});
+</script>
+</body>
+</html>
+"""
+
+EMPTY_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Buscar / X</title></head>
+<body><div data-testid="primaryColumn">
+<div data-testid="emptyState"><div data-testid="empty_state_header_text">Sin resultados para "{query}"</div></div>
+</div>
+<script>window.addEventListener('popstate', () => location.reload());</script>
+</body></html>
+"""
+
+HOME_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Inicio / X</title></head>
+<body><div data-testid="primaryColumn"><div data-testid="AppTabBar_Home_Link">Inicio</div></div></body></html>
+"""
+
+LOGIN_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Iniciar sesión / X</title></head>
+<body>
+<form id="login" onsubmit="return false">
+  <input autocomplete="username" name="username">
+  <input type="password" name="password" style="display:none">
+</form>
+<script>
+  const user = document.querySelector('input[autocomplete="username"]');
+  const password = document.querySelector('input[type="password"]');
+  user.addEventListener('keydown', e => {{ if (e.key === 'Enter') password.style.display = 'block'; }});
+  password.addEventListener('keydown', e => {{
+    if (e.key === 'Enter') {{
+      document.cookie = 'auth_token=fake; path=/';
+      location.href = '/home';
+    }}
+  }});
+</script>
+</body></html>
+"""
+
+QUERY_TARGET_RE = re.compile(r'(from:|to:|@)(\w+)')
+QUERY_DATE_RE = re.compile(r'(since|until):(\d{4}-\d{2}-\d{2})')
+QUERY_MAX_ID_RE = re.compile(r'max_id:(\d+)')
+
+
+def format_metric(value: int) -> str:
+    """Como lo muestra X: 950, 1.5K, 2.3M (así se ejercita _parse_metric_value)"""
+    if value >= 1000000:
+        return f"{value / 1000000:.1f}M"
+    if value >= 10000:
+        return f"{value / 1000:.1f}K"
+    if value >= 1000:
+        return f"{value:,}"
+    return str(value) if value else ''
+
+
+class SyntheticTimeline:
+    """
+    Tweets inventados para una búsqueda, siempre los mismos para la misma query.
+
+    La cantidad sale de `density` (tweets por target por día) y el rango de
+    fechas de la query; se sirven de a `page_size`, del más nuevo al más viejo.
+    Con `max_id:` en la query arranca desde el primer tweet con id menor o igual.
+    """
+
+    def __init__(self, query: str, density: float, page_size: int, seed: int = 0,
+                 base_url: str = ''):
+        self.query = query
+        self.page_size = page_size
+        self.base_url = base_url
+        self.targets = [name for _, name in QUERY_TARGET_RE.findall(query)] or ['usuario']
+        dates = dict(QUERY_DATE_RE.findall(query))
+        until = datetime.strptime(dates.get('until', '2024-01-02'), '%Y-%m-%d')
+        since = datetime.strptime(dates.get('since', '2024-01-01'), '%Y-%m-%d')
+        self.until = until
+        self.days = max((until - since).days, 0)
+        self.total = int(density * self.days * len(self.targets))
+        self.seed = seed
+        max_id = QUERY_MAX_ID_RE.search(query)
+        self.offset = self._first_at_or_below(int(max_id.group(1))) if max_id else 0
+
+    def _position(self, index: int):
+        """Fecha e id del tweet `index`, repartidos parejo en el rango"""
+        seconds = self.days * 86400 * (index + 0.5) / max(self.total, 1)
+        date = self.until - timedelta(seconds=seconds)
+        # Mismo esquema que los ids de X: milisegundos en los bits altos
+        tweet_id = (int((date.timestamp() - 1288834974.657) * 1000) << 22) | (index % 4096)
+        return date, tweet_id
+
+    def _first_at_or_below(self, max_id: int) -> int:
+        # Los ids bajan con el índice: búsqueda binaria
+        low, high = 0, self.total
+        while low < high:
+            middle = (low + high) // 2
+            if self._position(middle)[1] <= max_id:
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    def page(self, cursor: int) -> List[dict]:
+        start = self.offset + cursor * self.page_size
+        return [self.tweet(i) for i in range(start, min(start + self.page_size, self.total))]
+
+    def next_cursor(self, cursor: int) -> Optional[int]:
+        return cursor + 1 if self.offset + (cursor + 1) * self.page_size < self.total else None
+
+    def tweet(self, index: int) -> dict:
+        rng = random.Random(f"{self.seed}:{self.query}:{index}")
+        username = self.targets[index % len(self.targets)]
+        date, tweet_id = self._position(index)
+        words = "el la de que y a en un ser se no haber por con su para como estar tener".split()
+        return {
+            'tweet_id': str(tweet_id),
+            'username': username,
+            'text': ' '.join(rng.choices(words, k=rng.randint(5, 40))),
+            'datetime': date.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+            'replies': rng.choice([0, rng.randint(1, 300)]),
+            'retweets': rng.randint(0, 3000),
+            'likes': rng.randint(0, 50000),
+            'views': rng.randint(100, 5000000),
+            'has_image': rng.random() < 0.2,
+            'has_video': rng.random() < 0.05,
+            'is_retweet': rng.random() < 0.1,
+            'is_quote': rng.random() < 0.05,
+        }
+
+    def render(self, tweet: dict) -> str:
+        """Un <article> con el mismo markup (data-testid) que lee TweetScraper"""
+        user = html.escape(tweet['username'])
+        status = f"/{user}/status/{tweet['tweet_id']}"
+        parts = ['<article data-testid="tweet" role="article">']
+        if tweet['is_retweet']:
+            parts.append(f'<a href="/{user}"><div data-testid="socialContext"><span>{user} Retweeted</span></div></a>')
+        parts.append(
+            f'<div data-testid="User-Name"><a href="/{user}"><span>{user.title()}</span></a>'
+            f'<a href="/{user}"><span>@{user}</span></a><span>·</span>'
+            f'<a href="{status}"><time datetime="{tweet["datetime"]}">{tweet["datetime"][:10]}</time></a></div>'
+        )
+        parts.append(f'<div data-testid="tweetText" lang="es"><span>{html.escape(tweet["text"])}</span></div>')
+        if tweet['has_image']:
+            parts.append(f'<div data-testid="tweetPhoto"><img alt="Imagen" '
+                         f'src="{self.base_url}/pbs.twimg.com/media/{tweet["tweet_id"]}.jpg"></div>')
+        if tweet['has_video']:
+            parts.append(f'<div data-testid="videoPlayer"><video preload="none" poster="{self.base_url}'
+                         f'/pbs.twimg.com/ext_tw_video_thumb/{tweet["tweet_id"]}.jpg"></video></div>')
+        if tweet['is_quote']:
+            parts.append('<div data-testid="quoteTweet"><span>Tweet citado</span></div>')
+        parts.append(
+            '<div role="group">'
+            f'<button data-testid="reply"><span>{format_metric(tweet["replies"])}</span></button>'
+            f'<button data-testid="retweet"><span>{format_metric(tweet["retweets"])}</span></button>'
+            f'<button data-testid="like"><span>{format_metric(tweet["likes"])}</span></button>'
+            f'<a href="{status}/analytics"><span>{format_metric(tweet["views"])}</span></a>'
+            '</div>'
+        )
+        parts.append('</article>')
+        return ''.join(parts)
+
+    def render_page(self, cursor: int) -> str:
+        return ''.join(self.render(tweet) for tweet in self.page(cursor))
+
+
+class FakeXServer:
+    """
+    Un x.com de mentira en 127.0.0.1 para medir el scraper sin tocar el sitio.
+
+    Sirve la búsqueda avanzada con el mismo markup que el real y agrega
+    tweets con scroll infinito. `density` son tweets por target por día,
+    `latency` los segundos que tarda cada página del timeline y `page_size`
+    cuántos tweets trae cada una.
+
+    También hace de servidor de fotos y videos (/pbs.twimg.com/...): con
+    `media_kb` cada archivo pesa eso y hay `media_variants` contenidos
+    distintos (0 = uno por URL), para medir la deduplicación por hash.
+    `media_error_rate` es la fracción de pedidos que responden 503.
+
+        with FakeXServer(density=20, latency=0.2) as server:
+            scraper = TweetScraper('bench', base_url=server.url)
+    """
+
+    def __init__(self, density: float = 10, latency: float = 0.1, page_size: int = 20,
+                 seed: int = 0, port: int = 0, media_kb: int = 0, media_variants: int = 0,
+                 media_latency: float = 0.0, media_error_rate: float = 0.0):
+        self.density = density
+        self.latency = latency
+        self.page_size = page_size
+        self.seed = seed
+        self.media_kb = media_kb
+        self.media_variants = media_variants
+        self.media_latency = media_latency
+        self.media_error_rate = media_error_rate
+        self.requests = 0
+        self.media_requests = 0
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def timeline(self, query: str) -> SyntheticTimeline:
+        return SyntheticTimeline(query, self.density, self.page_size, self.seed, self.url)
+
+    def media_body(self, path: str) -> bytes:
+        """Bytes fijos por URL; con media_variants, varias URLs comparten contenido"""
+        key = zlib.crc32(path.encode()) % self.media_variants if self.media_variants else path
+        return random.Random(f"{self.seed}:{key}").randbytes(self.media_kb * 1024)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                server.requests += 1
+                parsed = urlparse(self.path)
+                params = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+
+                if parsed.path == '/search':
+                    self._search(params.get('q', ''))
+                elif parsed.path == '/i/api/timeline':
+                    self._timeline(params.get('q', ''), int(params.get('cursor', 1)))
+                elif parsed.path.startswith(('/pbs.twimg.com/', '/video.twimg.com/')):
+                    self._media(parsed.path)
+                elif parsed.path == '/i/flow/login':
+                    self._send(200, LOGIN_PAGE.format().encode(), 'text/html; charset=utf-8')
+                elif parsed.path in ('/', '/home'):
+                    self._send(200, HOME_PAGE.encode(), 'text/html; charset=utf-8')
+                else:
+                    self._send(404, b'', 'text/plain')
+
+            def _search(self, query):
+                timeline = server.timeline(query)
+                time.sleep(server.latency)
+                if timeline.offset >= timeline.total:
+                    page = EMPTY_PAGE.format(query=html.escape(query))
+                else:
+                    page = SEARCH_PAGE.format(
+                        first_page=timeline.render_page(0),
+                        next_cursor=json.dumps(timeline.next_cursor(0)),
+                        query=json.dumps(query),
+                    )
+                self._send(200, page.encode(), 'text/html; charset=utf-8')
+
+            def _timeline(self, query, cursor):
+                timeline = server.timeline(query)
+                time.sleep(server.latency)
+                body = json.dumps({
+                    'html': timeline.render_page(cursor),
+                    'next': timeline.next_cursor(cursor),
+                })
+                self._send(200, body.encode(), 'application/json')
+
+            def _media(self, path):
+                server.media_requests += 1
+                time.sleep(server.media_latency)
+                if server.media_error_rate and random.random() < server.media_error_rate:
+                    self._send(503, b'', 'text/plain')
+                elif not server.media_kb:
+                    self._send(200, PIXEL_GIF, 'image/gif')
+                else:
+                    content_type = 'video/mp4' if path.endswith('.mp4') else 'image/jpeg'
+                    self._send(200, server.media_body(path), content_type)
+
+            def _send(self, status, body, content_type):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
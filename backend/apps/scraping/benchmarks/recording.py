@@ -0,0 +1,66 @@
+import json
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from ..services.twitter_scraper import TweetScraper
+from ..services.output_writer import TweetOutputWriter
+
+
+HAR_NAME = 'session.har.zip'
+META_NAME = 'session.json'
+
+
+def har_path(directory) -> Path:
+    return Path(directory) / HAR_NAME
+
+
+def load_session(directory) -> Dict:
+    """Los datos de la búsqueda grabada (usuarios, fechas, host)"""
+    path = Path(directory) / META_NAME
+    if not path.exists() or not har_path(directory).exists():
+        raise FileNotFoundError(f"No hay una sesión grabada en {directory}")
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+async def record_session(directory, users: List[str], query_type: str, since_date: str,
+                         until_date: str, cookies: dict = None, base_url: str = None,
+                         headless: bool = True) -> Dict:
+    """
+    Corre una búsqueda real y graba todo el tráfico del navegador.
+
+    Quedan en `directory` el HAR (con los cuerpos de las respuestas, también
+    las de la API del timeline) y un JSON con la búsqueda, para reproducirla
+    después con `benchmark_scraper --replay`. El HAR incluye las cookies de
+    la cuenta: no hay que compartirlo.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    writer = TweetOutputWriter('session', compression=None, directory=directory).open()
+    scraper = TweetScraper('recording', base_url=base_url, output_writer=writer)
+    scraper.har_mode = 'record'
+    scraper.har_path = har_path(directory)
+    start = time.perf_counter()
+    try:
+        await scraper.start_browser(headless=headless)
+        await scraper.create_context(cookies=cookies)
+        tweets = await scraper.search_tweets(users, query_type, since_date, until_date)
+    finally:
+        await scraper.close_browser()
+        writer.close()
+
+    session = {
+        'users': users,
+        'query_type': query_type,
+        'since': since_date,
+        'until': until_date,
+        'base_url': scraper.base_url,
+        'tweets': len(tweets),
+        'seconds': round(time.perf_counter() - start, 2),
+        'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    with open(directory / META_NAME, 'w', encoding='utf-8') as f:
+        json.dump(session, f, indent=2)
+    return session
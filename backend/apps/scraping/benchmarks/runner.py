@@ -0,0 +1,213 @@
+import asyncio
+import tempfile
+import time
+from typing import Dict, List
+from urllib.parse import urlparse
+
+from playwright.async_api import async_playwright
+
+from ..services.twitter_scraper import BROWSER_ARGS, TweetScraper
+from ..services.output_writer import TweetOutputWriter
+from ..services.process_memory import playwright_driver_pid, process_tree_rss_mb
+
+
+def protocol_calls(playwright) -> int:
+    """
+    Llamadas que el cliente le hizo al driver de Playwright hasta ahora.
+
+    Cada una es un ida y vuelta con el navegador (query_selector, evaluate,
+    get_attribute...), así que sirve de proxy de las llamadas CDP.
+    """
+    try:
+        return playwright._impl_obj._connection._last_id
+    except AttributeError:
+        return 0
+
+
+async def _sample_memory(scraper: TweetScraper, peak: Dict[str, float], interval: float):
+    while True:
+        peak['mb'] = max(peak['mb'], scraper.browser_rss_mb())
+        await asyncio.sleep(interval)
+
+
+async def run_search_benchmark(base_url: str, users: List[str], since_date: str,
+                               until_date: str, query_type: str = 'from',
+                               wait_scale: float = 1.0, headless: bool = True,
+                               memory_interval: float = 0.5, replay_har: str = None,
+                               extraction_mode: str = None, dom_pruning: bool = None,
+                               sample_page_memory: bool = True,
+                               recycle_scrolls: int = None,
+                               prefetch_windows: int = None,
+                               viewport_profile: str = None) -> Dict:
+    """
+    Corre TweetScraper.search_tweets contra `base_url` y mide la corrida.
+
+    Con `replay_har` las respuestas salen de una sesión grabada, sin red.
+
+    Devuelve tweets por segundo, tweets por scroll, llamadas al navegador por
+    tweet, pico de memoria del navegador y los tiempos por fase del scraper.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = TweetOutputWriter('benchmark', compression=None, directory=tmp).open()
+        scraper = TweetScraper('benchmark', base_url=base_url, output_writer=writer)
+        scraper.wait_scale = wait_scale
+        if extraction_mode:
+            scraper.extraction_mode = extraction_mode
+        if dom_pruning is not None:
+            scraper.dom_pruning = dom_pruning
+        scraper.sample_page_memory = sample_page_memory
+        if recycle_scrolls is not None:
+            scraper.recycle_policy.max_scrolls = recycle_scrolls
+        if prefetch_windows is not None:
+            scraper.prefetch_windows = prefetch_windows
+        if viewport_profile:
+            scraper.viewport_profile = viewport_profile
+        if replay_har:
+            scraper.har_mode = 'replay'
+            scraper.har_path = replay_har
+        peak = {'mb': 0.0}
+        sampler = None
+        try:
+            await scraper.start_browser(headless=headless)
+            await scraper.create_context()
+            sampler = asyncio.ensure_future(_sample_memory(scraper, peak, memory_interval))
+
+            calls_before = protocol_calls(scraper.playwright)
+            start = time.perf_counter()
+            tweets = await scraper.search_tweets(users, query_type, since_date, until_date)
+            elapsed = time.perf_counter() - start
+            calls = protocol_calls(scraper.playwright) - calls_before
+            peak['mb'] = max(peak['mb'], scraper.browser_rss_mb())
+        finally:
+            if sampler:
+                sampler.cancel()
+            await scraper.close_browser()
+            writer.close()
+
+    return {
+        'tweets': len(tweets),
+        'seconds': round(elapsed, 2),
+        'tweets_per_second': round(len(tweets) / elapsed, 2) if elapsed else 0,
+        'scrolls': scraper.pages_scrolled,
+        'tweets_per_scroll': (round(len(tweets) / scraper.pages_scrolled, 1)
+                              if scraper.pages_scrolled else None),
+        'calls': calls,
+        'calls_per_tweet': round(calls / len(tweets), 1) if tweets else None,
+        'peak_memory_mb': round(peak['mb'], 1),
+        'page_memory': page_memory_trend(scraper.page_memory_samples),
+        'metrics': scraper.metrics.as_dict(),
+    }
+
+
+def page_memory_trend(samples: List[Dict]) -> Dict:
+    """
+    Heap, nodos y tiempo de extracción del primer y el último cuarto de scrolls.
+
+    Si la poda funciona, los dos cuartos dan parecido aunque haya miles de tweets.
+    """
+    if len(samples) < 4:
+        return {}
+    quarter = len(samples) // 4
+
+    def average(chunk, key):
+        return round(sum(sample[key] for sample in chunk) / len(chunk), 2)
+
+    first, last = samples[:quarter], samples[-quarter:]
+    return {
+        key: {'first': average(first, key), 'last': average(last, key),
+              'max': max(sample[key] for sample in samples)}
+        for key in ('js_heap_mb', 'nodes', 'extract_ms')
+    }
+
+
+def fake_session(base_url: str, name: str) -> Dict:
+    """storage_state con un auth_token propio, como el de una XAccount"""
+    return {
+        'cookies': [{
+            'name': 'auth_token', 'value': name, 'domain': urlparse(base_url).hostname,
+            'path': '/', 'expires': -1, 'httpOnly': True, 'secure': False, 'sameSite': 'Lax',
+        }],
+        'origins': [],
+    }
+
+
+async def run_session_memory_benchmark(base_url: str, users: List[str], since_date: str,
+                                       until_date: str, sessions: int = 4,
+                                       shared: bool = True, wait_scale: float = 1.0,
+                                       headless: bool = True,
+                                       memory_interval: float = 0.5) -> Dict:
+    """
+    Corre `sessions` búsquedas a la vez, cada una con su propia sesión, y mide
+    la memoria: con `shared` todas son contextos de un mismo Chromium (como el
+    runner async); si no, cada una lanza su navegador (como los threads).
+
+    `per_session_mb` es lo que agrega cada sesión: en modo compartido, el pico
+    menos el navegador vacío, dividido por las sesiones.
+    """
+    playwright = await async_playwright().start() if shared else None
+    browser = None
+    scrapers = []
+    writers = []
+    peak = {'mb': 0.0}
+    baseline = 0.0
+
+    def rss():
+        if shared:
+            return process_tree_rss_mb(playwright_driver_pid(playwright))
+        return sum(scraper.browser_rss_mb() for scraper in scrapers)
+
+    async def sample():
+        while True:
+            peak['mb'] = max(peak['mb'], rss())
+            await asyncio.sleep(memory_interval)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sampler = None
+        try:
+            if shared:
+                browser = await playwright.chromium.launch(headless=headless, args=BROWSER_ARGS)
+                baseline = rss()
+
+            for i in range(sessions):
+                writer = TweetOutputWriter(f'session_{i}', compression=None, directory=tmp).open()
+                writers.append(writer)
+                scraper = TweetScraper(f'session_{i}', base_url=base_url, output_writer=writer)
+                scraper.wait_scale = wait_scale
+                if shared:
+                    scraper.attach_browser(browser)
+                else:
+                    await scraper.start_browser(headless=headless)
+                await scraper.create_context(cookies=fake_session(base_url, f'session_{i}'))
+                scrapers.append(scraper)
+
+            sampler = asyncio.ensure_future(sample())
+            start = time.perf_counter()
+            results = await asyncio.gather(*[
+                scraper.search_tweets(users, 'from', since_date, until_date)
+                for scraper in scrapers
+            ])
+            elapsed = time.perf_counter() - start
+            peak['mb'] = max(peak['mb'], rss())
+        finally:
+            if sampler:
+                sampler.cancel()
+            for scraper in scrapers:
+                await scraper.close_browser()
+            if browser:
+                await browser.close()
+            if playwright:
+                await playwright.stop()
+            for writer in writers:
+                writer.close()
+
+    tweets = sum(len(result) for result in results)
+    return {
+        'mode': 'contexts' if shared else 'browsers',
+        'sessions': sessions,
+        'tweets': tweets,
+        'seconds': round(elapsed, 2),
+        'tweets_per_second': round(tweets / elapsed, 2) if elapsed else 0,
+        'peak_memory_mb': round(peak['mb'], 1),
+        'baseline_mb': round(baseline, 1),
+        'per_session_mb': round((peak['mb'] - baseline) / sessions, 1),
+    }
@@ -0,0 +1,86 @@
+import re
+from pathlib import Path
+
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def _parse_range(header: str, size: int):
+    """Devuelve (inicio, fin) inclusivos, o None si el rango no sirve"""
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    start, end = match.groups()
+    if start == '' and end == '':
+        return None
+    if start == '':
+        # bytes=-500: los últimos 500 bytes
+        length = int(end)
+        if length == 0:
+            return None
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = int(end) if end else size - 1
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def _iter_file_range(path: Path, start: int, end: int):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def serve_file(request, path: Path, filename: str, content_type: str, etag: str = None):
+    """
+    Sirve un archivo del disco con soporte de ETag y Range.
+
+    Con `If-None-Match` igual al ETag responde 304 sin cuerpo; con `Range`
+    manda solo ese pedazo (206). La respuesta completa va con FileResponse,
+    que el servidor puede mandar con sendfile.
+    """
+    path = Path(path)
+    size = path.stat().st_size
+    disposition = f'attachment; filename="{filename}"'
+
+    if etag:
+        if_none_match = request.headers.get('If-None-Match', '')
+        if etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*':
+            response = HttpResponse(status=304)
+            response['ETag'] = etag
+            return response
+
+    range_header = request.headers.get('Range')
+    if_range = request.headers.get('If-Range')
+    # Si el archivo cambió desde que empezó la descarga, va completo
+    if range_header and (not if_range or (etag and if_range == etag)):
+        byte_range = _parse_range(range_header, size)
+        if byte_range is None:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+        start, end = byte_range
+        response = StreamingHttpResponse(_iter_file_range(path, start, end),
+                                         status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+    else:
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+        response['Content-Length'] = str(size)
+
+    response['Content-Disposition'] = disposition
+    response['Accept-Ranges'] = 'bytes'
+    if etag:
+        response['ETag'] = etag
+    return response
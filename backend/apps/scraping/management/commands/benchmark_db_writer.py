@@ -0,0 +1,106 @@
+import asyncio
+import random
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.scraping.models import XAccount, ScrapingJob, Tweet
+from apps.scraping.services.db_writer import TweetDBWriter, build_tweet
+
+
+class Command(BaseCommand):
+    help = ("Compara guardar los tweets al final contra el writer en otro thread, "
+            "con un scraper simulado (sin navegador)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scrolls', type=int, default=200)
+        parser.add_argument('--per-scroll', type=int, default=20, help="Tweets nuevos por scroll")
+        parser.add_argument('--scroll-seconds', type=float, default=0.05,
+                            help="Lo que tarda el navegador en cada scroll")
+        parser.add_argument('--batch-size', type=int)
+        parser.add_argument('--queue-size', type=int)
+
+    def handle(self, *args, **options):
+        user = User.objects.first() or User.objects.create(username='benchmark')
+        account = XAccount.objects.first() or XAccount.objects.create(
+            owner=user, username='benchmark', password='-', email='benchmark@example.com'
+        )
+        total = options['scrolls'] * options['per_scroll']
+        self.stdout.write(f"📊 {options['scrolls']} scrolls de {options['per_scroll']} tweets "
+                          f"({total} en total), {options['scroll_seconds']}s por scroll")
+
+        for mode in ('al final', 'writer'):
+            now = timezone.now()
+            job = ScrapingJob.objects.create(
+                name=f"Benchmark de escritura ({mode})", account=account, created_by=user,
+                start_date=now - timedelta(days=30), end_date=now, query_type='from'
+            )
+            try:
+                if mode == 'al final':
+                    result = asyncio.run(self._at_end(job, options))
+                else:
+                    result = asyncio.run(self._with_writer(job, options))
+                saved = Tweet.objects.filter(job=job).count()
+            finally:
+                job.delete()
+
+            self.stdout.write(
+                f"  {mode:9} total {result['total']:6.2f}s  scraper esperando a la base "
+                f"{result['waiting']:6.2f}s  ({saved} guardados)"
+            )
+
+    def _records(self, options):
+        """Lo que iría sacando el scraper, scroll por scroll"""
+        base = timezone.now()
+        index = 0
+        for _ in range(options['scrolls']):
+            batch = []
+            for _ in range(options['per_scroll']):
+                index += 1
+                username = f"usuario_{index % 50}"
+                batch.append({
+                    'tweet_id': str(1700000000000000000 + index),
+                    'username': username,
+                    'url': f"https://x.com/{username}/status/{1700000000000000000 + index}",
+                    'text': ' '.join(random.choices('el la de que y a en un'.split(), k=20)),
+                    'datetime': (base - timedelta(minutes=index)).isoformat(),
+                    'metrics': {'replies': 1, 'retweets': 2, 'likes': 3, 'views': 4},
+                    'has_image': False, 'has_video': False,
+                    'is_retweet': False, 'is_quote': False,
+                })
+            yield batch
+
+    async def _at_end(self, job, options):
+        """Como antes: se junta todo y se guarda al terminar"""
+        start = time.perf_counter()
+        collected = []
+        for batch in self._records(options):
+            await asyncio.sleep(options['scroll_seconds'])
+            collected.extend(batch)
+
+        write_start = time.perf_counter()
+        await sync_to_async(Tweet.objects.bulk_create)(
+            [build_tweet(job, data) for data in collected], ignore_conflicts=True
+        )
+        waiting = time.perf_counter() - write_start
+        return {'total': time.perf_counter() - start, 'waiting': waiting}
+
+    async def _with_writer(self, job, options):
+        """Con TweetDBWriter: se guarda en otro thread mientras se scrollea"""
+        writer = TweetDBWriter(job, batch_size=options['batch_size'],
+                               max_pending=options['queue_size']).start()
+        start = time.perf_counter()
+        for batch in self._records(options):
+            await asyncio.sleep(options['scroll_seconds'])
+            for data in batch:
+                writer.add(data)
+            await writer.submit()
+
+        close_start = time.perf_counter()
+        await writer.close()
+        waiting = writer.backpressure_seconds + (time.perf_counter() - close_start)
+        return {'total': time.perf_counter() - start, 'waiting': waiting}
@@ -0,0 +1,114 @@
+import os
+import random
+import tempfile
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from apps.scraping.models import XAccount, ScrapingJob, Tweet
+from apps.scraping.services import exporters
+
+
+class Command(BaseCommand):
+    help = "Compara tamaño y tiempo de carga de los exports CSV, Parquet y Arrow"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--job', type=int, help="Job existente a exportar")
+        parser.add_argument('--synthetic', type=int, default=100000,
+                            help="Si no hay --job, cantidad de tweets sintéticos "
+                                 "(se crean en una transacción que se descarta)")
+        parser.add_argument('--batch-size', type=int)
+
+    def handle(self, *args, **options):
+        if exporters.pa is None:
+            raise CommandError("Hace falta pyarrow para este benchmark")
+
+        if options['job']:
+            try:
+                job = ScrapingJob.objects.get(pk=options['job'])
+            except ScrapingJob.DoesNotExist:
+                raise CommandError(f"No existe el job {options['job']}")
+            self._run(job, options['batch_size'])
+            return
+
+        with transaction.atomic():
+            job = self._synthetic_job(options['synthetic'])
+            self._run(job, options['batch_size'])
+            transaction.set_rollback(True)
+
+    def _run(self, job, batch_size):
+        rows = job.tweets.count()
+        self.stdout.write(f"📊 Job {job.id}: {rows} tweets")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            for export_format, writer in exporters.WRITERS.items():
+                path = os.path.join(tmp, f"export.{exporters.EXTENSIONS[export_format]}")
+
+                start = time.perf_counter()
+                with open(path, 'wb') as f:
+                    writer(job, f, batch_size)
+                write_seconds = time.perf_counter() - start
+
+                start = time.perf_counter()
+                loaded = self._load(export_format, path)
+                load_seconds = time.perf_counter() - start
+
+                size_mb = os.path.getsize(path) / 1024 / 1024
+                self.stdout.write(
+                    f"  {export_format:8} {size_mb:8.2f} MB  "
+                    f"export {write_seconds:6.2f}s  carga {load_seconds:6.3f}s  ({loaded} filas)"
+                )
+
+    def _load(self, export_format, path) -> int:
+        """Carga el archivo como lo haría un analista y devuelve las filas"""
+        pa = exporters.pa
+        if export_format == 'csv':
+            try:
+                import pandas
+                return len(pandas.read_csv(path))
+            except ImportError:
+                import pyarrow.csv
+                return pyarrow.csv.read_csv(path).num_rows
+        if export_format == 'parquet':
+            return exporters.pq.read_table(path).num_rows
+        with pa.memory_map(path) as source:
+            return pa.ipc.open_file(source).read_all().num_rows
+
+    def _synthetic_job(self, count):
+        """Job con tweets inventados, parecidos en forma a los reales"""
+        user = User.objects.first() or User.objects.create(username='benchmark')
+        account = XAccount.objects.first() or XAccount.objects.create(
+            owner=user, username='benchmark', password='-', email='benchmark@example.com'
+        )
+        now = timezone.now()
+        job = ScrapingJob.objects.create(
+            name="Benchmark de export", account=account, created_by=user,
+            start_date=now - timedelta(days=365), end_date=now, query_type='from'
+        )
+
+        usernames = [f"usuario_{i}" for i in range(200)]
+        words = "el la de que y a en un ser se no haber por con su para como estar tener".split()
+        tweets = []
+        for i in range(count):
+            username = random.choice(usernames)
+            tweets.append(Tweet(
+                job=job,
+                tweet_id=str(1700000000000000000 + i),
+                username=username,
+                url=f"https://x.com/{username}/status/{1700000000000000000 + i}",
+                text=' '.join(random.choices(words, k=random.randint(5, 40))),
+                date=now - timedelta(minutes=i),
+                like_count=random.randint(0, 5000),
+                retweet_count=random.randint(0, 1000),
+                reply_count=random.randint(0, 300),
+                analytics_count=random.randint(0, 100000),
+            ))
+            if len(tweets) == 5000:
+                Tweet.objects.bulk_create(tweets)
+                tweets = []
+        Tweet.objects.bulk_create(tweets)
+        return job
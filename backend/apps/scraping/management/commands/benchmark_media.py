@@ -0,0 +1,72 @@
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from apps.scraping.benchmarks.fake_x import FakeXServer
+from apps.scraping.services.media_downloader import MediaDownloader
+
+
+class Command(BaseCommand):
+    help = ("Mide el MediaDownloader contra el servidor de fotos de mentira: "
+            "descargas por segundo según la concurrencia, reintentos y deduplicación")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--files', type=int, default=200, help="URLs a bajar")
+        parser.add_argument('--variants', type=int, default=150,
+                            help="Contenidos distintos entre esas URLs (0 = todos distintos)")
+        parser.add_argument('--kb', type=int, default=200, help="Tamaño de cada archivo")
+        parser.add_argument('--latency', type=float, default=0.05,
+                            help="Segundos que tarda el servidor en cada archivo")
+        parser.add_argument('--error-rate', type=float, default=0.05,
+                            help="Fracción de pedidos que responden 503")
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 8])
+        parser.add_argument('--json', action='store_true')
+
+    def handle(self, *args, **options):
+        with FakeXServer(media_kb=options['kb'], media_variants=options['variants'],
+                         media_latency=options['latency'],
+                         media_error_rate=options['error_rate']) as server:
+            urls = [f"{server.url}/pbs.twimg.com/media/{index}.jpg"
+                    for index in range(options['files'])]
+            for concurrency in options['concurrency']:
+                server.media_requests = 0
+                with tempfile.TemporaryDirectory() as root:
+                    result = self._run(urls, concurrency, root)
+                    result['files_on_disk'] = sum(1 for _ in Path(root).glob('*/*'))
+                result['requests'] = server.media_requests
+                if options['json']:
+                    self.stdout.write(json.dumps(result))
+                    continue
+
+                self.stdout.write(f"\n🖼️ {concurrency} descargas a la vez")
+                self.stdout.write(f"  Tiempo:            {result['seconds']}s "
+                                  f"({result['files_per_second']} archivos/s, "
+                                  f"{result['mb_per_second']} MB/s)")
+                self.stdout.write(f"  Encolar todo:      {result['add_ms']} ms")
+                self.stdout.write(f"  Bajados:           {result['media_downloaded']} "
+                                  f"({result['files_on_disk']} en disco)")
+                self.stdout.write(f"  Repetidos:         {result['media_deduplicated']}")
+                self.stdout.write(f"  Con error:         {result['media_failed']}")
+                self.stdout.write(f"  Pedidos HTTP:      {result['requests']} "
+                                  f"(con reintentos)")
+
+    def _run(self, urls, concurrency, root):
+        downloader = MediaDownloader(concurrency=concurrency, root=root, record=False).start()
+        start = time.perf_counter()
+        # Lo que le cuesta al scraper: add() no debería esperar nunca
+        downloader.add(urls)
+        add_seconds = time.perf_counter() - start
+        downloader.join()
+        seconds = time.perf_counter() - start
+        fetched = len(urls) - downloader.failed
+        return {
+            'concurrency': concurrency,
+            'seconds': round(seconds, 2),
+            'add_ms': round(add_seconds * 1000, 2),
+            'files_per_second': round(fetched / seconds, 1),
+            'mb_per_second': round(downloader.bytes / (1024 * 1024) / seconds, 1),
+            **downloader.counters(),
+        }
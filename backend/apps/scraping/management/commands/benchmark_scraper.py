@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.scraping.benchmarks.fake_x import FakeXServer
+from apps.scraping.benchmarks.recording import har_path, load_session
+from apps.scraping.benchmarks.runner import run_search_benchmark
+
+
+class Command(BaseCommand):
+    help = "Mide el scraper contra un x.com local de mentira (tweets/s, llamadas, memoria)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('users', nargs='*', default=['usuario_a', 'usuario_b'],
+                            help="Targets de la búsqueda")
+        parser.add_argument('--query-type', default='from',
+                            choices=['from', 'to', 'mentioning'])
+        parser.add_argument('--since', default='2024-01-01', help="YYYY-MM-DD")
+        parser.add_argument('--until', default='2024-01-08', help="YYYY-MM-DD")
+        parser.add_argument('--density', type=float, default=10,
+                            help="Tweets por target por día")
+        parser.add_argument('--latency', type=float, default=0.1,
+                            help="Segundos que tarda cada página del timeline")
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--wait-scale', type=float, default=1.0,
+                            help="Multiplica las esperas fijas del scraper (0.1 = 10 veces menos)")
+        parser.add_argument('--extraction-mode', choices=['live', 'snapshot', 'push'],
+                            help="Por defecto, SCRAPING_EXTRACTION_MODE")
+        parser.add_argument('--prune', action='store_true',
+                            help="Vaciar los tweets ya extraídos (SCRAPING_DOM_PRUNING)")
+        parser.add_argument('--recycle-scrolls', type=int,
+                            help="Recrear el contexto cada N scrolls (SCRAPING_RECYCLE_SCROLLS)")
+        parser.add_argument('--prefetch', type=int,
+                            help="Ventanas precargándose a la vez (SCRAPING_PREFETCH_WINDOWS)")
+        parser.add_argument('--viewport', choices=['default', 'tall'],
+                            help="Perfil del contexto (SCRAPING_VIEWPORT_PROFILE)")
+        parser.add_argument('--runs', type=int, default=1)
+        parser.add_argument('--json', action='store_true',
+                            help="Una línea JSON por corrida, para guardar y comparar")
+        parser.add_argument('--headed', action='store_true')
+        parser.add_argument('--replay', metavar='DIR',
+                            help="Reproduce una sesión grabada con record_session en vez "
+                                 "del x.com de mentira (usa sus usuarios y fechas)")
+
+    def handle(self, *args, **options):
+        if options['replay']:
+            try:
+                session = load_session(options['replay'])
+            except (OSError, ValueError) as e:
+                raise CommandError(str(e))
+            self.stdout.write(f"📼 Reproduciendo {session['tweets']} tweets grabados "
+                              f"el {session['recorded_at']} ({session['seconds']}s en vivo)")
+            self._run_all(options, session['base_url'], session['users'], session['query_type'],
+                          session['since'], session['until'], har_path(options['replay']))
+            return
+
+        with FakeXServer(density=options['density'], latency=options['latency'],
+                         page_size=options['page_size']) as server:
+            self._run_all(options, server.url, options['users'], options['query_type'],
+                          options['since'], options['until'])
+
+    def _run_all(self, options, base_url, users, query_type, since, until, replay_har=None):
+        for run in range(1, options['runs'] + 1):
+            result = asyncio.run(run_search_benchmark(
+                base_url, users, since, until,
+                query_type=query_type, wait_scale=options['wait_scale'],
+                headless=not options['headed'], replay_har=replay_har,
+                extraction_mode=options['extraction_mode'],
+                dom_pruning=options['prune'] or None,
+                recycle_scrolls=options['recycle_scrolls'],
+                prefetch_windows=options['prefetch'],
+                viewport_profile=options['viewport'],
+            ))
+            if options['json']:
+                self.stdout.write(json.dumps({'run': run, **result}))
+                continue
+
+            self.stdout.write(f"\n🏁 Corrida {run}/{options['runs']}")
+            self.stdout.write(f"  Tweets:            {result['tweets']} en {result['seconds']}s")
+            self.stdout.write(f"  Tweets/s:          {result['tweets_per_second']}")
+            self.stdout.write(f"  Tweets/scroll:     {result['tweets_per_scroll']} ({result['scrolls']} scrolls)")
+            self.stdout.write(f"  Llamadas/tweet:    {result['calls_per_tweet']} ({result['calls']} en total)")
+            self.stdout.write(f"  Pico de memoria:   {result['peak_memory_mb']} MB")
+            if result['page_memory']:
+                self.stdout.write("  Página (primer cuarto → último cuarto, máximo):")
+                for key, trend in result['page_memory'].items():
+                    self.stdout.write(f"    {key:16} {trend['first']} → {trend['last']}  (máx {trend['max']})")
+            self.stdout.write("  Fases:")
+            phases = result['metrics']['phases']
+            for name, stats in sorted(phases.items(), key=lambda item: -item[1]['total']):
+                self.stdout.write(f"    {name:16} {stats['total']:8.2f}s  x{stats['count']}")
@@ -0,0 +1,50 @@
+import asyncio
+import json
+
+from django.core.management.base import BaseCommand
+
+from apps.scraping.benchmarks.fake_x import FakeXServer
+from apps.scraping.benchmarks.runner import run_session_memory_benchmark
+
+
+class Command(BaseCommand):
+    help = ("Mide la memoria por sesión activa: varias cuentas como contextos de un "
+            "Chromium contra un navegador por cuenta, contra el x.com de mentira")
+
+    def add_arguments(self, parser):
+        parser.add_argument('users', nargs='*', default=['usuario_a', 'usuario_b'],
+                            help="Targets de la búsqueda")
+        parser.add_argument('--sessions', type=int, default=4, help="Cuentas a la vez")
+        parser.add_argument('--since', default='2024-01-01', help="YYYY-MM-DD")
+        parser.add_argument('--until', default='2024-01-08', help="YYYY-MM-DD")
+        parser.add_argument('--density', type=float, default=10,
+                            help="Tweets por target por día")
+        parser.add_argument('--latency', type=float, default=0.1,
+                            help="Segundos que tarda cada página del timeline")
+        parser.add_argument('--wait-scale', type=float, default=1.0,
+                            help="Multiplica las esperas fijas del scraper")
+        parser.add_argument('--mode', choices=['contexts', 'browsers', 'both'], default='both')
+        parser.add_argument('--json', action='store_true')
+        parser.add_argument('--headed', action='store_true')
+
+    def handle(self, *args, **options):
+        modes = ['contexts', 'browsers'] if options['mode'] == 'both' else [options['mode']]
+        with FakeXServer(density=options['density'], latency=options['latency']) as server:
+            for mode in modes:
+                result = asyncio.run(run_session_memory_benchmark(
+                    server.url, options['users'], options['since'], options['until'],
+                    sessions=options['sessions'], shared=mode == 'contexts',
+                    wait_scale=options['wait_scale'], headless=not options['headed'],
+                ))
+                if options['json']:
+                    self.stdout.write(json.dumps(result))
+                    continue
+
+                label = "Un Chromium, un contexto por cuenta" if mode == 'contexts' \
+                    else "Un navegador por cuenta"
+                self.stdout.write(f"\n🧠 {label} ({result['sessions']} sesiones)")
+                self.stdout.write(f"  Tweets:            {result['tweets']} en {result['seconds']}s")
+                self.stdout.write(f"  Pico de memoria:   {result['peak_memory_mb']} MB")
+                if mode == 'contexts':
+                    self.stdout.write(f"  Navegador vacío:   {result['baseline_mb']} MB")
+                self.stdout.write(f"  Por sesión:        {result['per_session_mb']} MB")
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from apps.scraping.models import ScrapingJob
+from apps.scraping.services.artifacts import build_artifacts
+
+
+class Command(BaseCommand):
+    help = "Genera los exports de jobs terminados que todavía no los tienen"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--job', type=int, action='append', help="Solo estos jobs (se puede repetir)")
+        parser.add_argument('--format', action='append', dest='formats',
+                            help="Formatos a generar (default: SCRAPING_EXPORT_ARTIFACT_FORMATS)")
+        parser.add_argument('--force', action='store_true', help="Regenerar aunque ya existan")
+
+    def handle(self, *args, **options):
+        jobs = ScrapingJob.objects.filter(status__in=['completed', 'cancelled', 'budget_exceeded'])
+        if options['job']:
+            jobs = jobs.filter(pk__in=options['job'])
+        if not options['force']:
+            jobs = jobs.filter(artifacts__isnull=True)
+
+        for job in jobs.distinct():
+            built = build_artifacts(job, options['formats'])
+            self.stdout.write(f"✅ Job {job.id}: {', '.join(a.export_format for a in built) or 'nada'}")
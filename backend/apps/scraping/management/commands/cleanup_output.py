@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from apps.scraping.models import ScrapingJob
+from apps.scraping.services.output_writer import apply_retention
+
+
+class Command(BaseCommand):
+    help = "Comprime y borra archivos viejos de la carpeta output"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--compact-after', type=int,
+                            help="Días para comprimir (default: SCRAPING_OUTPUT_COMPACT_DAYS)")
+        parser.add_argument('--delete-after', type=int,
+                            help="Días para borrar (default: SCRAPING_OUTPUT_RETENTION_DAYS)")
+
+    def handle(self, *args, **options):
+        # Los archivos de jobs que siguen corriendo no se tocan
+        running = ScrapingJob.objects.filter(status='running').values_list('id', flat=True)
+
+        result = apply_retention(
+            compact_after_days=options['compact_after'],
+            delete_after_days=options['delete_after'],
+            skip_names=[f"job_{job_id}" for job_id in running],
+        )
+
+        for name in result['compacted']:
+            self.stdout.write(f"🗜️ Comprimido: {name}")
+        for name in result['deleted']:
+            self.stdout.write(f"🗑️ Borrado: {name}")
+        self.stdout.write(f"✅ {len(result['compacted'])} comprimidos, {len(result['deleted'])} borrados")
@@ -0,0 +1,54 @@
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.scraping.services import snapshot_parser
+
+
+class Command(BaseCommand):
+    help = ("Parsea snapshots HTML guardados (SCRAPING_SNAPSHOT_DIR) con el parser "
+            "del modo snapshot; sirve para probar cambios de extracción sin navegador")
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help="Carpeta con los .html")
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--base-url', default='https://x.com/')
+        parser.add_argument('--output', help="NDJSON con los tweets parseados, para comparar")
+
+    def handle(self, *args, **options):
+        if snapshot_parser.lxml is None:
+            raise CommandError("Hace falta lxml para parsear snapshots")
+
+        files = sorted(Path(options['directory']).glob('*.html'))
+        if not files:
+            raise CommandError(f"No hay snapshots en {options['directory']}")
+
+        start = time.perf_counter()
+        snapshots = [path.read_text(encoding='utf-8') for path in files]
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            results = list(pool.map(snapshot_parser.parse_snapshot, snapshots,
+                                    [options['base_url']] * len(snapshots)))
+        elapsed = time.perf_counter() - start
+
+        tweets, errors = {}, 0
+        for path, records in zip(files, results):
+            self.stdout.write(f"  {path.name}: {len(records)} tweets")
+            for data in records:
+                if data is None:
+                    errors += 1
+                else:
+                    tweets.setdefault(data['tweet_id'], data)
+
+        self.stdout.write(
+            f"📊 {len(files)} snapshots, {len(tweets)} tweets únicos, {errors} errores "
+            f"en {elapsed:.2f}s"
+        )
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                for data in tweets.values():
+                    f.write(json.dumps(data, ensure_ascii=False) + '\n')
+            self.stdout.write(f"💾 Tweets en {options['output']}")
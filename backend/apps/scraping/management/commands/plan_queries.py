@@ -0,0 +1,44 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.scraping.services.query_planner import QueryPlanner
+
+
+class Command(BaseCommand):
+    help = "Muestra cómo se agrupan los targets en queries y compara estrategias"
+
+    def add_arguments(self, parser):
+        parser.add_argument('users', nargs='+', help="Usuarios a buscar, sin @")
+        parser.add_argument('--query-type', default='from',
+                            choices=['from', 'to', 'mentioning'])
+        parser.add_argument('--since', required=True, help="YYYY-MM-DD")
+        parser.add_argument('--until', required=True, help="YYYY-MM-DD")
+        parser.add_argument('--densities',
+                            help="JSON con tweets/día por usuario (fixture local), "
+                                 "en vez de usar el historial de la base")
+        parser.add_argument('--compare', action='store_true',
+                            help="Compara combinada vs una query por target vs planner")
+
+    def handle(self, *args, **options):
+        densities = None
+        if options['densities']:
+            try:
+                with open(options['densities'], encoding='utf-8') as f:
+                    densities = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"No se pudo leer {options['densities']}: {e}")
+
+        planner = QueryPlanner(densities=densities)
+        args = (options['users'], options['query_type'], options['since'], options['until'])
+
+        batches = planner.plan(*args)
+        self.stdout.write(f"📦 {len(batches)} lotes:")
+        for i, batch in enumerate(batches, 1):
+            self.stdout.write(f"  {i}. {', '.join(batch)}")
+
+        if options['compare']:
+            self.stdout.write("\n📊 Comparación por ventana:")
+            for name, stats in planner.compare_strategies(*args).items():
+                summary = ', '.join(f"{k}={v}" for k, v in stats.items())
+                self.stdout.write(f"  {name}: {summary}")
@@ -0,0 +1,42 @@
+import asyncio
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.scraping.models import XAccount
+from apps.scraping.benchmarks.recording import record_session
+
+
+class Command(BaseCommand):
+    help = ("Graba una búsqueda real (todo el tráfico, en HAR) para reproducirla "
+            "después con benchmark_scraper --replay")
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help="Carpeta donde queda la sesión")
+        parser.add_argument('users', nargs='+', help="Usuarios a buscar, sin @")
+        parser.add_argument('--account', type=int, required=True,
+                            help="XAccount con cookies guardadas")
+        parser.add_argument('--query-type', default='from',
+                            choices=['from', 'to', 'mentioning'])
+        parser.add_argument('--since', required=True, help="YYYY-MM-DD")
+        parser.add_argument('--until', required=True, help="YYYY-MM-DD")
+        parser.add_argument('--base-url', help="Otro host (p.ej. el x.com de mentira)")
+        parser.add_argument('--headed', action='store_true')
+
+    def handle(self, *args, **options):
+        try:
+            account = XAccount.objects.get(pk=options['account'])
+        except XAccount.DoesNotExist:
+            raise CommandError(f"No existe la cuenta {options['account']}")
+        if not account.cookies and not options['base_url']:
+            raise CommandError("La cuenta no tiene cookies: corré un job con ella primero")
+
+        session = asyncio.run(record_session(
+            options['output'], options['users'], options['query_type'],
+            options['since'], options['until'], cookies=account.cookies,
+            base_url=options['base_url'], headless=not options['headed'],
+        ))
+        self.stdout.write(self.style.SUCCESS(
+            f"📼 Sesión grabada en {options['output']}: {session['tweets']} tweets "
+            f"en {session['seconds']}s"
+        ))
+        self.stdout.write("⚠️ El HAR tiene las cookies de la cuenta, no lo compartas")
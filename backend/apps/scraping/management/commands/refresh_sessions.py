@@ -0,0 +1,41 @@
+import asyncio
+
+from django.core.management.base import BaseCommand
+
+from apps.scraping.models import XAccount
+from apps.scraping.services.sessions import needs_refresh, refresh_session
+
+
+class Command(BaseCommand):
+    help = ("Verifica las sesiones de las cuentas X y se loguea antes de que venzan "
+            "(para correr con cron, p.ej. cada hora)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--account', type=int, help="Solo esta cuenta")
+        parser.add_argument('--force', action='store_true',
+                            help="Verificar aunque no le toque")
+        parser.add_argument('--headed', action='store_true')
+
+    def handle(self, *args, **options):
+        accounts = XAccount.objects.filter(is_active=True)
+        if options['account']:
+            accounts = accounts.filter(pk=options['account'])
+
+        checked = failed = 0
+        for account in accounts:
+            if not options['force'] and not needs_refresh(account):
+                continue
+            checked += 1
+            try:
+                result = asyncio.run(refresh_session(account, headless=not options['headed']))
+            except Exception as e:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f"❌ @{account.username}: {e}"))
+                continue
+
+            expires = account.session_expires_at
+            label = '🔄 Renovada' if result == 'refreshed' else '✅ Válida'
+            self.stdout.write(f"{label}: @{account.username}"
+                              + (f" (vence {expires:%Y-%m-%d %H:%M})" if expires else ""))
+
+        self.stdout.write(f"📋 {checked} sesiones verificadas, {failed} con error")
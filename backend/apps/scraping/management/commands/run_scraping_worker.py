@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.scraping.services.async_runner import AsyncJobRunner
+
+
+class Command(BaseCommand):
+    help = ("Corre los jobs de la cola en un solo proceso y un solo navegador, "
+            "un contexto por job (usar con SCRAPING_RUNNER=async)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-jobs', type=int, help="Jobs a la vez")
+        parser.add_argument('--poll', type=float, help="Segundos entre vueltas a la cola")
+        parser.add_argument('--headed', action='store_true')
+
+    def handle(self, *args, **options):
+        if settings.SCRAPING_RUNNER != 'async':
+            self.stdout.write(self.style.WARNING(
+                "⚠️ SCRAPING_RUNNER no es 'async': la API también va a arrancar jobs en threads"
+            ))
+        AsyncJobRunner(
+            max_jobs=options['max_jobs'],
+            poll_seconds=options['poll'],
+            headless=not options['headed'],
+        ).run()
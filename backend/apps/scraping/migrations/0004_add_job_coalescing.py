@@ -0,0 +1,24 @@
+# Generated by Django 5.0.1 on 2026-10-19 18:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping', '0003_add_export_format'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='coalesced_into',
+            field=models.ForeignKey(blank=True, help_text='Job con la misma búsqueda del que reusamos resultados', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='subscribers', to='scraping.scrapingjob'),
+        ),
+        migrations.AlterField(
+            model_name='scrapingjob',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pendiente'), ('running', 'Ejecutando'), ('waiting', 'Esperando job compartido'), ('completed', 'Completado'), ('failed', 'Falló')], default='pending', max_length=20),
+        ),
+    ]
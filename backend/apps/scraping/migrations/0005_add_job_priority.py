@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-19 18:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping', '0004_add_job_coalescing'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='priority',
+            field=models.IntegerField(choices=[(0, 'Baja'), (1, 'Normal'), (2, 'Alta'), (3, 'Urgente')], default=1, help_text='Los de mayor prioridad arrancan primero'),
+        ),
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='queued_at',
+            field=models.DateTimeField(blank=True, help_text='Cuándo entró a la cola', null=True),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.0.1 on 2026-10-19 18:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping', '0005_add_job_priority'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='cancel_requested',
+            field=models.BooleanField(default=False, help_text='Se pidió cancelar el job'),
+        ),
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='max_browser_memory_mb',
+            field=models.PositiveIntegerField(blank=True, help_text='Memoria máxima del navegador (RSS)', null=True),
+        ),
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='max_duration_minutes',
+            field=models.PositiveIntegerField(blank=True, help_text='Tiempo máximo de ejecución', null=True),
+        ),
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='max_pages',
+            field=models.PositiveIntegerField(blank=True, help_text='Máximo de scrolls del timeline', null=True),
+        ),
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='max_tweets',
+            field=models.PositiveIntegerField(blank=True, help_text='Cortar al llegar a esta cantidad de tweets', null=True),
+        ),
+        migrations.AlterField(
+            model_name='scrapingjob',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pendiente'), ('running', 'Ejecutando'), ('waiting', 'Esperando job compartido'), ('completed', 'Completado'), ('failed', 'Falló'), ('cancelled', 'Cancelado'), ('budget_exceeded', 'Límite excedido')], default='pending', max_length=20),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-19 18:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping', '0006_add_job_budgets'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='scrapingjob',
+            name='export_format',
+            field=models.CharField(choices=[('json', 'JSON'), ('csv', 'CSV'), ('parquet', 'Parquet'), ('arrow', 'Arrow IPC')], default='json', help_text='Formato de exportación', max_length=10),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.1 on 2026-10-19 18:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping', '0007_add_columnar_export_formats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportArtifact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('export_format', models.CharField(choices=[('json', 'JSON'), ('csv', 'CSV'), ('parquet', 'Parquet'), ('arrow', 'Arrow IPC')], max_length=10)),
+                ('path', models.CharField(help_text='Relativo a BASE_DIR/output/exports', max_length=500)),
+                ('sha256', models.CharField(help_text='Hash del contenido, se usa de ETag', max_length=64)),
+                ('size', models.BigIntegerField(default=0, help_text='Bytes')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='artifacts', to='scraping.scrapingjob')),
+            ],
+            options={
+                'verbose_name': 'Export generado',
+                'verbose_name_plural': 'Exports generados',
+                'unique_together': {('job', 'export_format')},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.1 on 2026-10-19 18:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping', '0008_add_export_artifacts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobMetrics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('phases', models.JSONField(default=dict, help_text='Por fase: count, total y max en segundos')),
+                ('counters', models.JSONField(default=dict, help_text='Tweets extraídos, duplicados, errores, ventanas...')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='metrics', to='scraping.scrapingjob')),
+            ],
+            options={
+                'verbose_name': 'Métricas de job',
+                'verbose_name_plural': 'Métricas de jobs',
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-19 18:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping', '0009_add_job_metrics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='xaccount',
+            name='session_checked_at',
+            field=models.DateTimeField(blank=True, help_text='Última vez que se verificó la sesión', null=True),
+        ),
+        migrations.AddField(
+            model_name='xaccount',
+            name='session_expires_at',
+            field=models.DateTimeField(blank=True, help_text='Cuándo vencen las cookies de sesión', null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-19 18:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping', '0010_add_session_expiry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='expand_conversations',
+            field=models.BooleanField(default=False, help_text='Abrir los tweets con respuestas y juntar hilo y respuestas'),
+        ),
+        migrations.AddField(
+            model_name='tweet',
+            name='conversation_id',
+            field=models.CharField(blank=True, db_index=True, help_text='Tweet desde el que se expandió la conversación', max_length=100, null=True),
+        ),
+    ]
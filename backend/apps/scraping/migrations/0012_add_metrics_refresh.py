@@ -0,0 +1,29 @@
+# Generated by Django 5.0.1 on 2026-10-19 18:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping', '0011_add_conversation_expansion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='job_type',
+            field=models.CharField(choices=[('search', 'Búsqueda'), ('refresh', 'Actualizar métricas')], default='search', help_text='Buscar tweets, o actualizar las métricas de los ya guardados (de las fechas y targets del job)', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='refresh_source',
+            field=models.ForeignKey(blank=True, help_text='Solo actualizar los tweets de este job', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='refreshes', to='scraping.scrapingjob'),
+        ),
+        migrations.AddField(
+            model_name='tweet',
+            name='metrics_updated_at',
+            field=models.DateTimeField(blank=True, help_text='Última actualización de las métricas', null=True),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.1 on 2026-10-19 18:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping', '0012_add_metrics_refresh'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=500, unique=True)),
+                ('sha256', models.CharField(db_index=True, max_length=64)),
+                ('path', models.CharField(help_text='Relativo a MEDIA_ROOT', max_length=500)),
+                ('content_type', models.CharField(blank=True, max_length=100)),
+                ('size', models.BigIntegerField(default=0, help_text='Bytes')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Archivo multimedia',
+                'verbose_name_plural': 'Archivos multimedia',
+            },
+        ),
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='download_media',
+            field=models.BooleanField(default=False, help_text='Bajar las fotos y videos de los tweets a MEDIA_ROOT'),
+        ),
+        migrations.AddField(
+            model_name='tweet',
+            name='media_urls',
+            field=models.JSONField(blank=True, default=list, help_text='Todas las fotos y videos del tweet'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-19 18:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping', '0013_add_media_downloads'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='scrapingjob',
+            name='query_type',
+            field=models.CharField(blank=True, choices=[('from', 'Tweets DE este usuario'), ('to', 'Tweets HACIA este usuario'), ('mentioning', 'Tweets que MENCIONAN al usuario')], help_text='Tipo de búsqueda (no se usa en jobs refresh)', max_length=20),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-19 18:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping', '0014_optional_query_type_for_refresh'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapingjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, help_text='Última señal de vida del proceso que lo corre', null=True),
+        ),
+    ]
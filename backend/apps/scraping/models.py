@@ -25,6 +25,10 @@ class XAccount(models.Model):
                              help_text="Las cookies de sesión, como en states/")
     last_login = models.DateTimeField(null=True, blank=True,
                                     help_text="Última vez que se logueó")
+    session_expires_at = models.DateTimeField(null=True, blank=True,
+                                            help_text="Cuándo vencen las cookies de sesión")
+    session_checked_at = models.DateTimeField(null=True, blank=True,
+                                            help_text="Última vez que se verificó la sesión")
     
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
@@ -68,8 +72,19 @@ class ScrapingJob(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pendiente'),
         ('running', 'Ejecutando'), 
+        ('waiting', 'Esperando job compartido'),
         ('completed', 'Completado'),
         ('failed', 'Falló'),
+        ('cancelled', 'Cancelado'),
+        ('budget_exceeded', 'Límite excedido'),
+    ]
+    
+    # Estados en los que el job ya no va a cambiar
+    FINAL_STATUSES = ('completed', 'failed', 'cancelled', 'budget_exceeded')
+    
+    JOB_TYPE_CHOICES = [
+        ('search', 'Búsqueda'),
+        ('refresh', 'Actualizar métricas'),
     ]
     
     QUERY_TYPE_CHOICES = [
@@ -78,9 +93,18 @@ class ScrapingJob(models.Model):
         ('mentioning', 'Tweets que MENCIONAN al usuario'),
     ]
 
+    PRIORITY_CHOICES = [
+        (0, 'Baja'),
+        (1, 'Normal'),
+        (2, 'Alta'),
+        (3, 'Urgente'),
+    ]
+
     EXPORT_FORMAT_CHOICES = [
         ('json', 'JSON'),
         ('csv', 'CSV'),
+        ('parquet', 'Parquet'),
+        ('arrow', 'Arrow IPC'),
     ]
 
     export_format = models.CharField(
@@ -93,6 +117,12 @@ class ScrapingJob(models.Model):
     # Configuración del job
     name = models.CharField(max_length=200, blank=True, default='',
                           help_text="Nombre descriptivo opcional")
+    job_type = models.CharField(max_length=10, choices=JOB_TYPE_CHOICES, default='search',
+                              help_text="Buscar tweets, o actualizar las métricas de los ya guardados "
+                                        "(de las fechas y targets del job)")
+    refresh_source = models.ForeignKey('self', on_delete=models.SET_NULL,
+                                     null=True, blank=True, related_name='refreshes',
+                                     help_text="Solo actualizar los tweets de este job")
     account = models.ForeignKey(XAccount, on_delete=models.CASCADE,
                               help_text="Con qué cuenta hacemos el scraping")
     targets = models.ManyToManyField(SearchTarget,
@@ -100,18 +130,47 @@ class ScrapingJob(models.Model):
     
     start_date = models.DateTimeField(help_text="Desde cuándo buscar")
     end_date = models.DateTimeField(help_text="Hasta cuándo buscar")
-    query_type = models.CharField(max_length=20, choices=QUERY_TYPE_CHOICES,
-                                help_text="Tipo de búsqueda")
+    query_type = models.CharField(max_length=20, choices=QUERY_TYPE_CHOICES, blank=True,
+                                help_text="Tipo de búsqueda (no se usa en jobs refresh)")
+    
+    # Cola
+    priority = models.IntegerField(choices=PRIORITY_CHOICES, default=1,
+                                 help_text="Los de mayor prioridad arrancan primero")
+    queued_at = models.DateTimeField(null=True, blank=True,
+                                   help_text="Cuándo entró a la cola")
+    
+    # Límites (vacío = el default de settings)
+    max_duration_minutes = models.PositiveIntegerField(null=True, blank=True,
+                                                     help_text="Tiempo máximo de ejecución")
+    max_tweets = models.PositiveIntegerField(null=True, blank=True,
+                                           help_text="Cortar al llegar a esta cantidad de tweets")
+    max_pages = models.PositiveIntegerField(null=True, blank=True,
+                                          help_text="Máximo de scrolls del timeline")
+    max_browser_memory_mb = models.PositiveIntegerField(null=True, blank=True,
+                                                      help_text="Memoria máxima del navegador (RSS)")
+    cancel_requested = models.BooleanField(default=False,
+                                         help_text="Se pidió cancelar el job")
+    
+    # Expansión
+    expand_conversations = models.BooleanField(default=False,
+                                             help_text="Abrir los tweets con respuestas y juntar hilo y respuestas")
+    download_media = models.BooleanField(default=False,
+                                       help_text="Bajar las fotos y videos de los tweets a MEDIA_ROOT")
     
     # Estado y resultados
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, 
                             default='pending')
     started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True,
+                                      help_text="Última señal de vida del proceso que lo corre")
     completed_at = models.DateTimeField(null=True, blank=True)
     error_message = models.TextField(blank=True,
                                    help_text="Si falló, acá va el error")
     tweets_count = models.IntegerField(default=0,
                                      help_text="Cuántos tweets encontramos")
+    coalesced_into = models.ForeignKey('self', on_delete=models.SET_NULL,
+                                     null=True, blank=True, related_name='subscribers',
+                                     help_text="Job con la misma búsqueda del que reusamos resultados")
     
     created_by = models.ForeignKey(User, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -122,13 +181,23 @@ class ScrapingJob(models.Model):
         ordering = ['-created_at']
     
     def __str__(self):
-        return self.name or f"Job {self.id} - {self.get_query_type_display()}"
+        return self.name or f"Job {self.id} - {self.get_query_type_display() or self.get_job_type_display()}"
     
     def duration(self):
         """Cuánto tardó el scraping"""
         if self.started_at and self.completed_at:
             return self.completed_at - self.started_at
         return None
+    
+    def budget(self):
+        """Límites del job, completando con los defaults de settings"""
+        from django.conf import settings
+        return {
+            'max_duration_minutes': self.max_duration_minutes or settings.SCRAPING_MAX_DURATION_MINUTES,
+            'max_tweets': self.max_tweets or settings.SCRAPING_MAX_TWEETS,
+            'max_pages': self.max_pages or settings.SCRAPING_MAX_PAGES,
+            'max_browser_memory_mb': self.max_browser_memory_mb or settings.SCRAPING_MAX_BROWSER_MEMORY_MB,
+        }
 
 
 class Tweet(models.Model):
@@ -148,6 +217,8 @@ class Tweet(models.Model):
     # Multimedia
     image_url = models.URLField(max_length=500, blank=True, null=True)
     video_url = models.URLField(max_length=500, blank=True, null=True)
+    media_urls = models.JSONField(default=list, blank=True,
+                                help_text="Todas las fotos y videos del tweet")
     
     # Métricas
     date = models.DateTimeField(help_text="Cuándo se publicó el tweet")
@@ -163,6 +234,10 @@ class Tweet(models.Model):
     is_rt = models.BooleanField(default=False)
     rt_by = models.CharField(max_length=100, blank=True, null=True,
                            help_text="Quién hizo el RT")
+    metrics_updated_at = models.DateTimeField(null=True, blank=True,
+                                            help_text="Última actualización de las métricas")
+    conversation_id = models.CharField(max_length=100, blank=True, null=True, db_index=True,
+                                     help_text="Tweet desde el que se expandió la conversación")
     
     # Metadata del scraping
     scraped_at = models.DateTimeField(auto_now_add=True)
@@ -177,4 +252,66 @@ class Tweet(models.Model):
         unique_together = ['job', 'tweet_id']
     
     def __str__(self):
-        return f"@{self.username}: {self.text[:50]}..." if self.text else f"Tweet {self.tweet_id}"
\ No newline at end of file
+        return f"@{self.username}: {self.text[:50]}..." if self.text else f"Tweet {self.tweet_id}"
+
+class ExportArtifact(models.Model):
+    """
+    Un export ya generado de un job terminado.
+    """
+    job = models.ForeignKey(ScrapingJob, on_delete=models.CASCADE,
+                          related_name='artifacts')
+    export_format = models.CharField(max_length=10,
+                                   choices=ScrapingJob.EXPORT_FORMAT_CHOICES)
+    path = models.CharField(max_length=500,
+                          help_text="Relativo a BASE_DIR/output/exports")
+    sha256 = models.CharField(max_length=64, help_text="Hash del contenido, se usa de ETag")
+    size = models.BigIntegerField(default=0, help_text="Bytes")
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = "Export generado"
+        verbose_name_plural = "Exports generados"
+        unique_together = ['job', 'export_format']
+    
+    def __str__(self):
+        return f"Job {self.job_id} - {self.export_format}"
+
+
+class MediaFile(models.Model):
+    """
+    Una foto o video bajado. El archivo se nombra por el hash del contenido:
+    la misma imagen desde dos URLs (o dos jobs) se guarda una sola vez.
+    """
+    url = models.URLField(max_length=500, unique=True)
+    sha256 = models.CharField(max_length=64, db_index=True)
+    path = models.CharField(max_length=500,
+                          help_text="Relativo a MEDIA_ROOT")
+    content_type = models.CharField(max_length=100, blank=True)
+    size = models.BigIntegerField(default=0, help_text="Bytes")
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = "Archivo multimedia"
+        verbose_name_plural = "Archivos multimedia"
+    
+    def __str__(self):
+        return self.path
+
+class JobMetrics(models.Model):
+    """
+    Tiempos por fase y contadores de una corrida de un job.
+    """
+    job = models.OneToOneField(ScrapingJob, on_delete=models.CASCADE,
+                             related_name='metrics')
+    phases = models.JSONField(default=dict,
+                            help_text="Por fase: count, total y max en segundos")
+    counters = models.JSONField(default=dict,
+                              help_text="Tweets extraídos, duplicados, errores, ventanas...")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Métricas de job"
+        verbose_name_plural = "Métricas de jobs"
+    
+    def __str__(self):
+        return f"Métricas del job {self.job_id}"
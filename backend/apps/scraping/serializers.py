@@ -32,9 +32,22 @@ class ScrapingJobSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'name', 'account', 'target_usernames', 
             'start_date', 'end_date', 'query_type', 'status', 
-            'status_display', 'tweets_count', 'created_at', 'error_message'
+            'status_display', 'tweets_count', 'created_at', 'error_message',
+            'coalesced_into', 'priority', 'queued_at',
+            'max_duration_minutes', 'max_tweets', 'max_pages', 'max_browser_memory_mb',
+            'cancel_requested', 'export_format', 'expand_conversations',
+            'download_media', 'job_type', 'refresh_source'
         ]
-        read_only_fields = ['status', 'status_display', 'tweets_count', 'created_at', 'error_message']
+        read_only_fields = ['status', 'status_display', 'tweets_count', 'created_at', 'error_message',
+                            'coalesced_into', 'queued_at', 'cancel_requested']
+    
+    def validate(self, attrs):
+        job_type = attrs.get('job_type', getattr(self.instance, 'job_type', 'search'))
+        query_type = attrs.get('query_type', getattr(self.instance, 'query_type', ''))
+        # Los jobs refresh no buscan: el tipo de búsqueda no aplica
+        if job_type == 'search' and not query_type:
+            raise serializers.ValidationError({'query_type': "Obligatorio para jobs de búsqueda"})
+        return attrs
     
     def create(self, validated_data):
         target_usernames = validated_data.pop('target_usernames', [])
@@ -69,5 +82,6 @@ class TweetSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'tweet_id', 'username', 'text', 'url', 'date',
             'reply_count', 'retweet_count', 'like_count', 'analytics_count',
-            'is_quote', 'is_thread', 'is_rt'
+            'is_quote', 'is_thread', 'is_rt', 'rt_by', 'conversation_id',
+            'image_url', 'video_url', 'media_urls', 'metrics_updated_at'
         ]
\ No newline at end of file
@@ -0,0 +1,118 @@
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import List
+
+from django.conf import settings
+from django.db import connection
+
+from ..models import ScrapingJob, ExportArtifact
+from . import exporters
+
+
+def artifacts_dir() -> Path:
+    """Carpeta de los exports ya generados"""
+    return Path(settings.BASE_DIR) / 'output' / 'exports'
+
+
+def artifact_path(artifact: ExportArtifact) -> Path:
+    return artifacts_dir() / artifact.path
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_artifact(job: ScrapingJob, export_format: str) -> ExportArtifact:
+    """Genera el export en disco y lo registra con su hash"""
+    directory = artifacts_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            exporters.WRITERS[export_format](job, f)
+        sha256 = file_sha256(Path(tmp_path))
+        # El nombre lleva el hash: si cambia el contenido, cambia el archivo
+        name = f"job_{job.id}_{sha256[:16]}.{exporters.EXTENSIONS[export_format]}"
+        os.replace(tmp_path, directory / name)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    previous = ExportArtifact.objects.filter(job=job, export_format=export_format).first()
+    if previous and previous.path != name and artifact_path(previous).exists():
+        artifact_path(previous).unlink()
+
+    artifact, _ = ExportArtifact.objects.update_or_create(
+        job=job, export_format=export_format,
+        defaults={'path': name, 'sha256': sha256, 'size': (directory / name).stat().st_size},
+    )
+    return artifact
+
+
+def build_artifacts(job: ScrapingJob, formats: List[str] = None) -> List[ExportArtifact]:
+    """Genera todos los formatos configurados; si uno falla sigue con el resto"""
+    formats = formats or settings.SCRAPING_EXPORT_ARTIFACT_FORMATS
+    built = []
+    for export_format in formats:
+        if not exporters.available(export_format):
+            print(f"⚠️ Export {export_format} salteado: formato desconocido o falta pyarrow")
+            continue
+        try:
+            artifact = build_artifact(job, export_format)
+            built.append(artifact)
+            print(f"📦 Export {export_format} del job {job.id} listo ({artifact.size} bytes)")
+        except Exception as e:
+            print(f"⚠️ No se pudo generar el export {export_format} del job {job.id}: {e}")
+    return built
+
+
+def start_artifact_generation(job: ScrapingJob):
+    """Genera los exports en un thread aparte, sin demorar el cierre del job"""
+    def run():
+        try:
+            build_artifacts(job)
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=run)
+    thread.daemon = True
+    thread.start()
+    return thread
+
+
+def rebuild_artifacts(job_ids) -> threading.Thread:
+    """
+    Los tweets de esos jobs cambiaron: borra sus exports ya (así nadie baja
+    uno viejo con un ETag válido) y los vuelve a generar en un thread aparte.
+    """
+    for artifact in ExportArtifact.objects.filter(job_id__in=job_ids):
+        if artifact_path(artifact).exists():
+            artifact_path(artifact).unlink()
+        artifact.delete()
+
+    # Los mismos jobs que tienen exports al terminar (ver JobCoalescer._settle)
+    jobs = list(ScrapingJob.objects
+                .filter(pk__in=job_ids, job_type='search', status__in=ScrapingJob.FINAL_STATUSES,
+                        started_at__isnull=False)
+                .exclude(status='failed'))
+
+    def run():
+        try:
+            for job in jobs:
+                build_artifacts(job)
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=run)
+    thread.daemon = True
+    thread.start()
+    return thread
@@ -0,0 +1,144 @@
+import asyncio
+import signal
+from typing import Dict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from playwright.async_api import async_playwright
+
+from ..models import ScrapingJob
+from .job_scheduler import JobScheduler
+from .process_memory import playwright_driver_pid, process_tree_rss_mb
+from .scraping_service import ScrapingService
+from .twitter_scraper import BROWSER_ARGS
+
+
+class AsyncJobRunner:
+    """
+    Corre muchos jobs como corutinas en un solo event loop, con un solo
+    Playwright y un solo Chromium: cada job tiene su propio contexto, con el
+    storage_state de su XAccount, así varias cuentas comparten un proceso.
+
+    Un job que falla no afecta a los demás (cada uno es una tarea aparte y
+    ScrapingService marca su propio error). Si el navegador se cae, los jobs
+    que estaban corriendo fallan y el próximo ciclo lanza otro.
+    """
+
+    def __init__(self, max_jobs: int = None, poll_seconds: float = None,
+                 headless: bool = True):
+        self.max_jobs = max_jobs or settings.SCRAPING_RUNNER_MAX_JOBS
+        self.poll_seconds = poll_seconds or settings.SCRAPING_RUNNER_POLL_SECONDS
+        self.headless = headless
+        self.scheduler = JobScheduler(max_slots=self.max_jobs)
+        self.playwright = None
+        self.browser = None
+        # RSS del navegador recién lanzado, sin contextos: lo que sobra de
+        # ahí es lo que cuestan las sesiones activas
+        self.baseline_mb = 0.0
+        self.tasks: Dict[int, asyncio.Task] = {}
+        self._stopping = False
+        self._polls = 0
+
+    def run(self):
+        asyncio.run(self._main())
+
+    def stop(self):
+        """Primera vez: no toma más jobs. Segunda: cancela los que corren"""
+        if self._stopping:
+            print(f"🛑 Cancelando {len(self.tasks)} jobs en curso...")
+            for task in self.tasks.values():
+                task.cancel()
+            return
+        self._stopping = True
+        print(f"⏳ Esperando {len(self.tasks)} jobs en curso (otra señal los cancela)")
+
+    async def _main(self):
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self.stop)
+
+        self.playwright = await async_playwright().start()
+        print(f"🚀 Runner async: hasta {self.max_jobs} jobs en un navegador")
+        try:
+            while not self._stopping:
+                await self._fill_slots()
+                await asyncio.sleep(self.poll_seconds)
+                self._log_memory()
+            if self.tasks:
+                await asyncio.gather(*self.tasks.values(), return_exceptions=True)
+        finally:
+            await self._close_browser()
+            await self.playwright.stop()
+
+    async def _fill_slots(self):
+        """Toma de la cola tantos jobs como contextos libres haya"""
+        if len(self.tasks) >= self.max_jobs:
+            return
+        jobs = await sync_to_async(self.scheduler.claim)()
+        if not jobs:
+            return
+
+        try:
+            await self._ensure_browser()
+        except Exception as e:
+            # Sin navegador no corre nada: se devuelven y se reintenta en la próxima vuelta
+            print(f"❌ No se pudo lanzar el navegador: {e}")
+            await sync_to_async(self.scheduler.release)(jobs)
+            return
+        for job in jobs:
+            self.tasks[job.id] = asyncio.ensure_future(self._run_job(job))
+        print(f"🧵 {len(self.tasks)} jobs corriendo en un navegador")
+    
+    def browser_rss_mb(self) -> float:
+        if not self.playwright:
+            return 0.0
+        return process_tree_rss_mb(playwright_driver_pid(self.playwright))
+    
+    def session_memory_mb(self) -> float:
+        """MB que suma cada sesión activa sobre el navegador vacío"""
+        if not self.tasks:
+            return 0.0
+        return max(self.browser_rss_mb() - self.baseline_mb, 0.0) / len(self.tasks)
+    
+    def _log_memory(self):
+        self._polls += 1
+        # Cada ~minuto alcanza
+        if not self.tasks or self._polls % max(int(60 / self.poll_seconds), 1):
+            return
+        print(f"🧠 Navegador {self.browser_rss_mb():.0f} MB, {len(self.tasks)} sesiones, "
+              f"{self.session_memory_mb():.0f} MB por sesión")
+
+    async def _run_job(self, job: ScrapingJob):
+        try:
+            # El supervisor de cada job compara su parte de la memoria con
+            # max_browser_memory_mb
+            await ScrapingService(job, browser=self.browser,
+                                  memory_probe=self.session_memory_mb).run_async()
+        except asyncio.CancelledError:
+            print(f"🛑 Job {job.id} cancelado por el runner")
+        except Exception as e:
+            # ScrapingService ya guarda sus errores; esto es la última red
+            print(f"❌ Job {job.id} falló en el runner: {e}")
+        finally:
+            self.tasks.pop(job.id, None)
+
+    async def _ensure_browser(self):
+        """Lanza el navegador si no hay uno vivo"""
+        if self.browser and self.browser.is_connected():
+            return
+        if self.browser:
+            print("⚠️ El navegador se cayó, lanzando otro")
+        self.browser = await self.playwright.chromium.launch(
+            headless=self.headless, args=BROWSER_ARGS
+        )
+        self.baseline_mb = self.browser_rss_mb()
+
+    async def _close_browser(self):
+        if not self.browser:
+            return
+        try:
+            await asyncio.wait_for(self.browser.close(),
+                                   timeout=settings.SCRAPING_BROWSER_CLOSE_TIMEOUT)
+        except Exception as e:
+            print(f"⚠️ El navegador no cerró bien ({type(e).__name__})")
+        self.browser = None
@@ -0,0 +1,131 @@
+import asyncio
+from typing import Dict, Iterable, List, Set
+
+from django.conf import settings
+
+from .twitter_scraper import TweetScraper, TWEET_SELECTOR, RESULTS_SELECTOR
+
+
+class ConversationExpander:
+    """
+    Después de la búsqueda, abre el detalle de los tweets que tienen
+    respuestas y junta el hilo del autor y las respuestas de la conversación.
+
+    Usa hasta `concurrency` páginas del contexto del scraper. Los tweets
+    cuya conversación ya se expandió (en este job o en otro) no se vuelven a
+    abrir, así el costo crece solo con los tweets nuevos. Lo que encuentra
+    pasa por TweetScraper._add_tweet: mismo deduplicado, archivo y base.
+    """
+
+    def __init__(self, scraper: TweetScraper, concurrency: int = None,
+                 max_scrolls: int = None):
+        self.scraper = scraper
+        self.concurrency = concurrency or settings.SCRAPING_EXPANSION_CONCURRENCY
+        self.max_scrolls = max_scrolls or settings.SCRAPING_EXPANSION_MAX_SCROLLS
+        # Tweets cuya conversación ya se abrió -> si el autor siguió el hilo
+        self.expanded: Dict[str, bool] = {}
+
+    def candidates(self, tweets: Iterable[Dict], known_ids: Set[str]) -> List[Dict]:
+        """Tweets propios con respuestas que todavía no se expandieron"""
+        return [
+            tweet for tweet in tweets
+            if not tweet['is_retweet']
+            and tweet['metrics']['replies'] > 0
+            and not tweet.get('conversation_id')
+            and tweet['tweet_id'] not in known_ids
+            and tweet['tweet_id'] not in self.expanded
+        ]
+
+    async def expand(self, tweets: Iterable[Dict], known_ids: Set[str] = frozenset()) -> int:
+        """Expande las conversaciones elegidas; devuelve cuántos tweets nuevos sumó"""
+        selected = self.candidates(list(tweets), known_ids)
+        if not selected:
+            return 0
+        print(f"🧵 Expandiendo {len(selected)} conversaciones "
+              f"({self.concurrency} páginas a la vez)...")
+
+        pages = asyncio.Queue()
+        own_pages = []
+        for _ in range(min(self.concurrency, len(selected))):
+            page = await self.scraper.context.new_page()
+            own_pages.append(page)
+            pages.put_nowait(page)
+
+        async def run(tweet):
+            page = await pages.get()
+            try:
+                if self.scraper.stop_reason or tweet['tweet_id'] in self.expanded:
+                    return 0
+                return await self._expand_one(page, tweet)
+            except Exception as e:
+                print(f"⚠️ No se pudo expandir {tweet['url']}: {e}")
+                return 0
+            finally:
+                pages.put_nowait(page)
+
+        try:
+            with self.scraper.metrics.phase('expand'):
+                added = sum(await asyncio.gather(*(run(tweet) for tweet in selected)))
+        finally:
+            for page in own_pages:
+                await page.close()
+
+        print(f"🧵 {added} tweets nuevos de {len(self.expanded)} conversaciones")
+        return added
+
+    async def _expand_one(self, page, root: Dict) -> int:
+        root_id = root['tweet_id']
+        try:
+            await page.goto(root['url'], wait_until='domcontentloaded')
+            await page.locator(RESULTS_SELECTOR).first.wait_for(
+                timeout=settings.SCRAPING_SEARCH_LOAD_TIMEOUT * 1000)
+        except Exception as e:
+            # Sin marcar: queda como candidato para la próxima expansión
+            print(f"⚠️ No cargó la conversación de {root['url']}: {e}")
+            self.scraper.metrics.incr('expansion_errors')
+            return 0
+        # Marcado apenas carga: si otro tweet del hilo aparece, no se repite
+        self.expanded[root_id] = False
+
+        added = 0
+        seen = set()
+        previous_height = 0
+        for _ in range(self.max_scrolls):
+            for article in await page.query_selector_all(TWEET_SELECTOR):
+                data = await self.scraper._extract_tweet_data(article)
+                if not data or data['tweet_id'] in seen:
+                    continue
+                seen.add(data['tweet_id'])
+                if data['tweet_id'] == root_id:
+                    continue
+                # Respuestas del mismo autor: el hilo
+                data['is_thread'] = data['username'].lower() == root['username'].lower()
+                data['conversation_id'] = root_id
+                if data['is_thread']:
+                    self.expanded[root_id] = True
+                    # Ya está adentro de esta conversación, no hace falta abrirlo
+                    self.expanded.setdefault(data['tweet_id'], True)
+                if self.scraper._add_tweet(data):
+                    added += 1
+                    self.scraper.metrics.incr('replies_collected')
+                elif self.scraper.db_writer:
+                    # Ya vino en la búsqueda: se marca la fila que ya está guardada
+                    self.scraper.db_writer.update(data['tweet_id'], {
+                        'conversation_id': root_id,
+                        'is_thread': data['is_thread'],
+                    })
+
+            height = await page.evaluate("document.body.scrollHeight")
+            if height == previous_height:
+                break
+            previous_height = height
+            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+            await self.scraper.wait(1000, page)
+
+        self.scraper.metrics.incr('conversations_expanded')
+        if added and self.scraper.output_writer:
+            self.scraper.output_writer.flush()
+        if self.scraper.db_writer:
+            # Como en cada scroll de la búsqueda: espera si la base se atrasa
+            await self.scraper.db_writer.submit()
+        return added
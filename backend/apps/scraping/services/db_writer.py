@@ -0,0 +1,159 @@
+import asyncio
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from ..models import ScrapingJob, Tweet
+
+
+def build_tweet(job: ScrapingJob, data: Dict) -> Tweet:
+    """Arma el Tweet (sin guardar) a partir de lo que devuelve el scraper"""
+    # Parsear fecha
+    tweet_date = datetime.fromisoformat(
+        data['datetime'].replace('Z', '+00:00')
+    )
+    images = data.get('images') or []
+    videos = data.get('videos') or []
+
+    return Tweet(
+        job=job,
+        tweet_id=data['tweet_id'],
+        username=data['username'],
+        url=data['url'],
+        text=data['text'],
+        date=tweet_date,
+        reply_count=data['metrics']['replies'],
+        retweet_count=data['metrics']['retweets'],
+        like_count=data['metrics']['likes'],
+        analytics_count=data['metrics']['views'],
+        is_rt=data['is_retweet'],
+        rt_by=data.get('rt_by'),
+        is_quote=data['is_quote'],
+        # Solo los trae la expansión de conversaciones
+        is_thread=data.get('is_thread', False),
+        conversation_id=data.get('conversation_id'),
+        # Grabaciones viejas no traen las URLs de la multimedia
+        image_url=images[0] if images else None,
+        video_url=videos[0] if videos else None,
+        media_urls=images + videos,
+    )
+
+
+class _Update:
+    """Cambios para un tweet ya guardado (o en la cola del writer)"""
+
+    def __init__(self, tweet_id: str, fields: Dict):
+        self.tweet_id = tweet_id
+        self.fields = fields
+
+
+class TweetDBWriter:
+    """
+    Guarda los tweets en la base desde un thread propio, mientras se scrapea.
+
+    El scraper va agregando tweets con `add()` y en cada scroll los manda con
+    `submit()`. El thread junta tandas hasta `batch_size` y las guarda en una
+    transacción. La cola tiene `max_pending` tandas: si la base se atrasa,
+    `submit()` espera (sin bloquear el event loop) y el scraper se frena.
+    """
+
+    def __init__(self, job: ScrapingJob, batch_size: int = None, max_pending: int = None):
+        self.job = job
+        self.batch_size = batch_size or settings.SCRAPING_DB_BATCH_SIZE
+        self.queue = queue.Queue(maxsize=max_pending or settings.SCRAPING_DB_QUEUE_SIZE)
+        self.saved = 0
+        self.transactions = 0
+        self.write_seconds = 0.0
+        # Tiempo que el scraper pasó esperando a la base
+        self.backpressure_seconds = 0.0
+        self.error = None
+        self._pending = []
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def add(self, data: Dict):
+        """Anota un tweet para la próxima tanda (no toca la base)"""
+        self._pending.append(data)
+
+    def update(self, tweet_id: str, fields: Dict):
+        """Anota cambios para un tweet del job ya mandado; se aplican en orden, después de guardarlo"""
+        self._pending.append(_Update(tweet_id, fields))
+
+    async def submit(self):
+        """Manda lo anotado al thread; espera solo si la cola está llena"""
+        self._raise_if_failed()
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        try:
+            self.queue.put_nowait(batch)
+        except queue.Full:
+            start = time.perf_counter()
+            await asyncio.get_running_loop().run_in_executor(None, self.queue.put, batch)
+            self.backpressure_seconds += time.perf_counter() - start
+
+    async def close(self):
+        """Manda lo que queda y espera a que se termine de guardar"""
+        try:
+            await self.submit()
+        finally:
+            loop = asyncio.get_running_loop()
+            if self._thread.is_alive():
+                await loop.run_in_executor(None, self.queue.put, None)
+            await loop.run_in_executor(None, self._thread.join)
+        self._raise_if_failed()
+
+    def _raise_if_failed(self):
+        if self.error:
+            raise Exception(f"Error guardando tweets: {self.error}")
+
+    def _run(self):
+        try:
+            done = False
+            while not done:
+                # Junta todo lo que haya en la cola hasta batch_size
+                records = self.queue.get()
+                if records is None:
+                    break
+                while len(records) < self.batch_size:
+                    try:
+                        more = self.queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if more is None:
+                        done = True
+                        break
+                    records.extend(more)
+                self._write(records)
+        except Exception as e:
+            self.error = e
+            # Vaciar la cola para que nadie quede esperando lugar
+            while True:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    break
+        finally:
+            connection.close()
+
+    def _write(self, records: List):
+        start = time.perf_counter()
+        tweets = [build_tweet(self.job, data) for data in records if not isinstance(data, _Update)]
+        updates = [data for data in records if isinstance(data, _Update)]
+        with transaction.atomic():
+            Tweet.objects.bulk_create(tweets, batch_size=1000, ignore_conflicts=True)
+            for change in updates:
+                Tweet.objects.filter(job=self.job, tweet_id=change.tweet_id).update(**change.fields)
+        self.write_seconds += time.perf_counter() - start
+        self.saved += len(tweets)
+        self.transactions += 1
@@ -0,0 +1,191 @@
+import csv
+import json
+from itertools import islice
+from typing import IO, Iterator, List, Tuple
+
+from django.conf import settings
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+# Columnas del export, en el mismo orden que el CSV de siempre
+EXPORT_FIELDS = [
+    ('tweet_id', 'tweet_id'),
+    ('username', 'username'),
+    ('date', 'date'),
+    ('text', 'text'),
+    ('likes', 'like_count'),
+    ('retweets', 'retweet_count'),
+    ('replies', 'reply_count'),
+    ('views', 'analytics_count'),
+    ('url', 'url'),
+    ('is_retweet', 'is_rt'),
+    ('is_quote', 'is_quote'),
+]
+
+EXTENSIONS = {
+    'csv': 'csv',
+    'parquet': 'parquet',
+    'arrow': 'arrow',
+}
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.file',
+}
+
+
+def export_filename(job, export_format: str) -> str:
+    """Nombre con el que se descarga el export"""
+    return f'tweets_job_{job.id}_{job.created_at.strftime("%Y%m%d")}.{EXTENSIONS[export_format]}'
+
+
+def iter_batches(job, batch_size: int = None) -> Iterator[List[Tuple]]:
+    """Tweets del job en lotes, leídos con cursor sin cargar todo en memoria"""
+    batch_size = batch_size or settings.SCRAPING_EXPORT_BATCH_SIZE
+    rows = (job.tweets.order_by('-date')
+            .values_list(*[field for _, field in EXPORT_FIELDS])
+            .iterator(chunk_size=batch_size))
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+class _Echo:
+    """Pseudo-buffer para que csv.writer devuelva la línea en vez de guardarla"""
+    def write(self, value):
+        return value
+
+
+def iter_csv(job, batch_size: int = None) -> Iterator[str]:
+    """CSV línea por línea, para un StreamingHttpResponse"""
+    writer = csv.writer(_Echo())
+    yield writer.writerow([name for name, _ in EXPORT_FIELDS])
+    for batch in iter_batches(job, batch_size):
+        for row in batch:
+            row = list(row)
+            row[2] = row[2].isoformat()
+            row[9] = 'Yes' if row[9] else 'No'
+            row[10] = 'Yes' if row[10] else 'No'
+            yield writer.writerow(row)
+
+
+def tweet_record(tweet: dict) -> dict:
+    """Un tweet de la base con las mismas claves que escribe el scraper en el NDJSON"""
+    return {
+        'tweet_id': tweet['tweet_id'],
+        'username': tweet['username'],
+        'text': tweet['text'],
+        'datetime': tweet['date'].isoformat(),
+        'metrics': {
+            'replies': tweet['reply_count'],
+            'retweets': tweet['retweet_count'],
+            'likes': tweet['like_count'],
+            'views': tweet['analytics_count'],
+        },
+        'has_image': bool(tweet['image_url']),
+        'has_video': bool(tweet['video_url']),
+        'is_retweet': tweet['is_rt'],
+        'rt_by': tweet['rt_by'],
+        'is_quote': tweet['is_quote'],
+        'url': tweet['url'],
+    }
+
+
+def iter_ndjson(job, batch_size: int = None) -> Iterator[str]:
+    """NDJSON armado desde la base (incluye los tweets copiados de otro job)"""
+    batch_size = batch_size or settings.SCRAPING_EXPORT_BATCH_SIZE
+    rows = (job.tweets.order_by('-date')
+            .values('tweet_id', 'username', 'text', 'date', 'reply_count', 'retweet_count',
+                    'like_count', 'analytics_count', 'image_url', 'video_url',
+                    'is_rt', 'rt_by', 'is_quote', 'url')
+            .iterator(chunk_size=batch_size))
+    for row in rows:
+        yield json.dumps(tweet_record(row), ensure_ascii=False) + '\n'
+
+
+def write_csv(job, fileobj: IO[bytes], batch_size: int = None):
+    """Escribe el CSV en un archivo binario"""
+    for line in iter_csv(job, batch_size):
+        fileobj.write(line.encode('utf-8'))
+
+
+def available(export_format: str) -> bool:
+    """El formato existe y su dependencia está instalada"""
+    if export_format not in WRITERS:
+        return False
+    return export_format == 'csv' or pa is not None
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ValueError("Para exportar a Parquet/Arrow hay que instalar pyarrow")
+
+
+def arrow_schema(dictionary_usernames: bool = True):
+    """Schema columnar de los tweets"""
+    _require_pyarrow()
+    username_type = pa.dictionary(pa.int32(), pa.string()) if dictionary_usernames else pa.string()
+    return pa.schema([
+        ('tweet_id', pa.string()),
+        ('username', username_type),
+        ('date', pa.timestamp('us', tz='UTC')),
+        ('text', pa.large_string()),
+        ('likes', pa.int64()),
+        ('retweets', pa.int64()),
+        ('replies', pa.int64()),
+        ('views', pa.int64()),
+        ('url', pa.string()),
+        ('is_retweet', pa.bool_()),
+        ('is_quote', pa.bool_()),
+    ])
+
+
+def _record_batch(batch: List[Tuple], schema):
+    """Pasa un lote de filas a un RecordBatch de Arrow"""
+    columns = list(zip(*batch))
+    arrays = [pa.array(column, type=field.type) if not pa.types.is_dictionary(field.type)
+              else pa.array(column, type=pa.string()).dictionary_encode()
+              for column, field in zip(columns, schema)]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def write_parquet(job, fileobj: IO[bytes], batch_size: int = None):
+    """
+    Parquet con un row group por lote.
+
+    Los usernames van con diccionario (se repiten mucho) y el texto
+    comprimido con zstd.
+    """
+    _require_pyarrow()
+    schema = arrow_schema()
+    with pq.ParquetWriter(fileobj, schema, compression='zstd',
+                          use_dictionary=['username']) as writer:
+        for batch in iter_batches(job, batch_size):
+            writer.write_batch(_record_batch(batch, schema))
+
+
+def write_arrow(job, fileobj: IO[bytes], batch_size: int = None):
+    """Archivo Arrow IPC, un record batch por lote, comprimido con zstd"""
+    _require_pyarrow()
+    # El formato de archivo IPC no admite diccionarios distintos por lote
+    schema = arrow_schema(dictionary_usernames=False)
+    options = pa.ipc.IpcWriteOptions(compression='zstd')
+    with pa.ipc.new_file(fileobj, schema, options=options) as writer:
+        for batch in iter_batches(job, batch_size):
+            writer.write_batch(_record_batch(batch, schema))
+
+
+WRITERS = {
+    'csv': write_csv,
+    'parquet': write_parquet,
+    'arrow': write_arrow,
+}
@@ -0,0 +1,191 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import ScrapingJob, Tweet
+from .artifacts import start_artifact_generation
+from .progress import publish_status
+
+
+# Campos que copiamos al pasarle tweets de un job a otro
+TWEET_COPY_FIELDS = [
+    'tweet_id', 'username', 'url', 'text', 'image_url', 'video_url', 'media_urls', 'date',
+    'reply_count', 'retweet_count', 'like_count', 'analytics_count',
+    'is_quote', 'is_thread', 'is_rt', 'rt_by', 'conversation_id', 'raw_data',
+]
+
+
+class JobCoalescer:
+    """
+    Junta jobs que buscan lo mismo.
+
+    Dos jobs tienen la misma firma si buscan los mismos targets con el mismo
+    `query_type` (y la misma expansión de conversaciones y descarga de
+    multimedia), sin importar la cuenta. Si un job nuevo se superpone con
+    otro pendiente o en ejecución, se suscribe a sus resultados y solo
+    scrapea la parte del rango que el otro no cubre.
+
+    La API y el runner pueden ser procesos distintos: suscribir y resolver
+    se serializan con un lock de la fila del padre en la base. Siempre se
+    bloquea primero el padre y después el suscriptor.
+    """
+
+    def signature(self, job: ScrapingJob) -> Tuple[str, bool, bool, Tuple[str, ...]]:
+        """Firma de la búsqueda, independiente de la cuenta"""
+        usernames = job.targets.values_list('username', flat=True)
+        return (job.query_type, job.expand_conversations, job.download_media,
+                tuple(sorted(u.lower() for u in usernames)))
+
+    def find_parent(self, job: ScrapingJob) -> Optional[ScrapingJob]:
+        """Busca el job activo con la misma firma que más se superpone"""
+        if job.job_type != 'search':
+            return None
+        signature = self.signature(job)
+        # Solo jobs que ya están en la cola o corriendo: uno creado y nunca
+        # arrancado no se arranca por colgarse de él
+        candidates = (ScrapingJob.objects
+                      .filter(self._active())
+                      .filter(job_type='search',
+                              query_type=job.query_type,
+                              coalesced_into__isnull=True,
+                              start_date__lt=job.end_date,
+                              end_date__gt=job.start_date)
+                      .exclude(pk=job.pk))
+
+        best, best_overlap = None, None
+        for candidate in candidates:
+            if self.signature(candidate) != signature:
+                continue
+            overlap = (min(candidate.end_date, job.end_date)
+                       - max(candidate.start_date, job.start_date))
+            # A igual superposición preferimos el que ya está corriendo
+            key = (overlap, candidate.status == 'running')
+            if best is None or key > best_overlap:
+                best, best_overlap = candidate, key
+        return best
+
+    def submit(self, job: ScrapingJob):
+        """Encola el job, reusando otro job activo si se puede"""
+        from .job_scheduler import JobScheduler
+
+        to_start = []
+        with transaction.atomic():
+            parent = self.find_parent(job)
+            if parent:
+                # Si el padre terminó mientras tanto, finish() ya resolvió a
+                # sus suscriptores: no nos colgamos de él
+                parent = self._lock(parent.pk, active=True)
+            if parent:
+                print(f"🔗 Job {job.id} suscripto a resultados del job {parent.id}")
+                job.coalesced_into = parent
+                job.save(update_fields=['coalesced_into'])
+                # El job compartido (ya en la cola) hereda la prioridad más alta
+                if parent.status == 'pending' and job.priority > parent.priority:
+                    parent.priority = job.priority
+                    parent.save(update_fields=['priority'])
+
+            if parent and not self.pending_ranges(job):
+                # Todo el rango lo cubre el otro job: no abrimos navegador
+                job.status = 'waiting'
+                job.started_at = timezone.now()
+                job.save(update_fields=['status', 'started_at'])
+                publish_status(job)
+            else:
+                to_start.append(job)
+
+        for pending_job in to_start:
+            JobScheduler().submit(pending_job)
+
+    def pending_ranges(self, job: ScrapingJob) -> List[Tuple[datetime, datetime]]:
+        """Partes del rango del job que tiene que scrapear él mismo"""
+        parent = job.coalesced_into
+        if not parent or self._unusable(parent):
+            return [(job.start_date, job.end_date)]
+
+        ranges = []
+        if job.start_date < parent.start_date:
+            ranges.append((job.start_date, min(parent.start_date, job.end_date)))
+        if job.end_date > parent.end_date:
+            ranges.append((max(parent.end_date, job.start_date), job.end_date))
+        return ranges
+
+    def _unusable(self, parent: ScrapingJob) -> bool:
+        """El job compartido terminó sin cubrir todo su rango"""
+        return parent.status in ScrapingJob.FINAL_STATUSES and parent.status != 'completed'
+
+    def copy_results(self, parent: ScrapingJob, job: ScrapingJob) -> int:
+        """Copia al job los tweets del padre que caen en su rango"""
+        rows = (parent.tweets
+                .filter(date__gte=job.start_date, date__lt=job.end_date)
+                .values(*TWEET_COPY_FIELDS))
+        copies = [Tweet(job=job, **row) for row in rows.iterator(chunk_size=2000)]
+        Tweet.objects.bulk_create(copies, batch_size=1000, ignore_conflicts=True)
+        return len(copies)
+
+    def finish(self, job: ScrapingJob):
+        """
+        Cierra un job que terminó su propia parte del scraping.
+
+        Si está suscripto a otro job que sigue corriendo queda en 'waiting';
+        cuando ese job termina le pasamos los tweets. Si el otro falló, el
+        job vuelve a arrancar con su rango completo.
+        """
+        from .job_scheduler import JobScheduler
+
+        to_restart = []
+        with transaction.atomic():
+            if job.coalesced_into_id:
+                self._lock(job.coalesced_into_id)
+            self._lock(job.pk)
+            self._settle(job, to_restart)
+
+        for restarted in to_restart:
+            JobScheduler().submit(restarted)
+
+    def _active(self) -> Q:
+        """Corriendo, o pendiente y ya encolado"""
+        return Q(status='running') | Q(status='pending', queued_at__isnull=False)
+
+    def _lock(self, pk: int, active: bool = False) -> Optional[ScrapingJob]:
+        """Bloquea la fila del job hasta el fin de la transacción"""
+        jobs = ScrapingJob.objects.select_for_update().filter(pk=pk)
+        if active:
+            jobs = jobs.filter(self._active())
+        return jobs.first()
+
+    def _settle(self, job: ScrapingJob, to_restart: list):
+        """Resuelve el estado final del job y el de sus suscriptores (con lock)"""
+        if job.status == 'completed' and job.coalesced_into_id:
+            parent = ScrapingJob.objects.get(pk=job.coalesced_into_id)
+            if parent.status == 'completed':
+                copied = self.copy_results(parent, job)
+                print(f"🔗 Job {job.id}: {copied} tweets reusados del job {parent.id}")
+                job.tweets_count = job.tweets.count()
+            elif self._unusable(parent):
+                print(f"⚠️ El job {parent.id} no terminó ({parent.status}), job {job.id} vuelve a la cola")
+                job.coalesced_into = None
+                job.status = 'pending'
+                job.completed_at = None
+                to_restart.append(job)
+            else:
+                job.status = 'waiting'
+                job.completed_at = None
+        job.save()
+        publish_status(job)
+
+        if job.status not in ScrapingJob.FINAL_STATUSES:
+            return
+
+        # Un job cancelado antes de arrancar no tiene resultados que exportar
+        if job.status != 'failed' and job.job_type == 'search' and job.started_at:
+            # Los resultados ya no cambian: generamos los exports de una vez
+            transaction.on_commit(lambda: start_artifact_generation(job))
+
+        # Este job terminó: resolvemos a los que estaban esperándolo
+        for subscriber in job.subscribers.filter(status='waiting'):
+            subscriber.status = 'completed'
+            subscriber.completed_at = timezone.now()
+            self._settle(subscriber, to_restart)
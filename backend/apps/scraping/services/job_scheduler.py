@@ -0,0 +1,189 @@
+import threading
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from ..models import ScrapingJob
+
+
+_lock = threading.RLock()
+
+
+class JobScheduler:
+    """
+    Decide qué job pendiente se lleva el próximo navegador libre.
+
+    Ordena por prioridad más envejecimiento (cada `aging_minutes` en cola
+    suma un nivel), y reparte los slots entre usuarios: quien ya tiene
+    `user_quota` jobs corriendo solo recibe otro si nadie más está esperando.
+    Con `account_quota` tampoco se usa una cuenta X en más de esos jobs a la
+    vez, y a igual prioridad pasa la cuenta que menos sesiones tiene abiertas.
+    """
+
+    def __init__(self, max_slots: int = None, user_quota: int = None,
+                 aging_minutes: int = None, account_quota: int = None):
+        if not max_slots:
+            # Con el runner async los slots son contextos, no navegadores
+            max_slots = (settings.SCRAPING_RUNNER_MAX_JOBS if settings.SCRAPING_RUNNER == 'async'
+                         else settings.SCRAPING_MAX_CONCURRENT_JOBS)
+        self.max_slots = max_slots
+        self.user_quota = user_quota or settings.SCRAPING_USER_QUOTA
+        self.aging_minutes = aging_minutes or settings.SCRAPING_AGING_MINUTES
+        # 0 = sin límite por cuenta
+        self.account_quota = (settings.SCRAPING_ACCOUNT_QUOTA if account_quota is None
+                              else account_quota)
+
+    def submit(self, job: ScrapingJob):
+        """Pone el job en la cola y trata de arrancar lo que se pueda"""
+        if not job.queued_at:
+            job.queued_at = timezone.now()
+            job.save(update_fields=['queued_at'])
+        print(f"📥 Job {job.id} en cola (prioridad {job.get_priority_display()})")
+        self.dispatch()
+
+    def dispatch(self):
+        """Llena los slots libres con los jobs que más lo merecen"""
+        if settings.SCRAPING_RUNNER == 'async':
+            # Los toma el proceso de run_scraping_worker en su próxima vuelta
+            return
+        from .scraping_service import start_job
+
+        for job in self.claim():
+            start_job(job)
+
+    def claim(self) -> List[ScrapingJob]:
+        """Marca como running los jobs que entran en los slots libres y los devuelve"""
+        claimed = []
+        with _lock:
+            # Un job de un proceso que se cayó ocuparía su slot para siempre
+            self.reap_orphans()
+            while True:
+                running = ScrapingJob.objects.filter(status='running').count()
+                if running >= self.max_slots:
+                    break
+
+                job = self.next_job()
+                if not job:
+                    break
+
+                # Lo marcamos acá para que el próximo ciclo ya lo cuente; el
+                # filtro por status evita que otro proceso se lleve el mismo
+                started_at = timezone.now()
+                taken = ScrapingJob.objects.filter(pk=job.pk, status='pending').update(
+                    status='running', started_at=started_at, heartbeat_at=started_at
+                )
+                if not taken:
+                    continue
+                job.status = 'running'
+                job.started_at = started_at
+                job.heartbeat_at = started_at
+                wait = job.started_at - job.queued_at
+                print(f"🚦 Arranca job {job.id} después de {str(wait).split('.')[0]} en cola")
+                claimed.append(job)
+        return claimed
+
+    def reap_orphans(self) -> List[ScrapingJob]:
+        """
+        Da por fallados los jobs 'running' que dejaron de mandar heartbeat.
+
+        Pasa cuando se reinicia el proceso (deploy, OOM, el worker async se
+        cae) con jobs a medias: nadie los va a terminar. Sus suscriptores
+        vuelven a la cola con el rango completo.
+        """
+        from .job_coalescer import JobCoalescer
+
+        cutoff = timezone.now() - timedelta(seconds=settings.SCRAPING_ORPHAN_SECONDS)
+        stale = (Q(heartbeat_at__lt=cutoff)
+                 | Q(heartbeat_at__isnull=True, started_at__lt=cutoff)
+                 | Q(heartbeat_at__isnull=True, started_at__isnull=True))
+        orphans = []
+        for job in ScrapingJob.objects.filter(stale, status='running'):
+            # El filtro evita pisar un job que justo mandó su heartbeat
+            reaped = ScrapingJob.objects.filter(stale, pk=job.pk, status='running').update(
+                status='failed', completed_at=timezone.now(),
+                error_message='El proceso que lo corría dejó de responder',
+            )
+            if not reaped:
+                continue
+            job.refresh_from_db()
+            print(f"💀 Job {job.id} quedó huérfano (último heartbeat {job.heartbeat_at or job.started_at})")
+            JobCoalescer().finish(job)
+            orphans.append(job)
+        return orphans
+
+    def release(self, jobs: List[ScrapingJob]):
+        """Devuelve a la cola jobs que se tomaron pero no se llegaron a arrancar"""
+        for job in jobs:
+            ScrapingJob.objects.filter(pk=job.pk, status='running').update(
+                status='pending', started_at=None
+            )
+            print(f"↩️ Job {job.id} vuelve a la cola")
+
+    def next_job(self) -> Optional[ScrapingJob]:
+        """El job pendiente con mejor puntaje, respetando la cuota por usuario"""
+        queued = list(ScrapingJob.objects.filter(status='pending', queued_at__isnull=False))
+        if not queued:
+            return None
+
+        running = ScrapingJob.objects.filter(status='running')
+        running_by_user = dict(running.values_list('created_by').annotate(n=Count('id')))
+        running_by_account = dict(running.values_list('account').annotate(n=Count('id')))
+        if self.account_quota:
+            # Esos esperan a que la cuenta libere una sesión
+            queued = [j for j in queued
+                      if running_by_account.get(j.account_id, 0) < self.account_quota]
+            if not queued:
+                return None
+        now = timezone.now()
+
+        def sort_key(job):
+            return (
+                self.effective_priority(job, now),
+                -running_by_user.get(job.created_by_id, 0),
+                -running_by_account.get(job.account_id, 0),
+                -job.queued_at.timestamp(),
+            )
+
+        within_quota = [j for j in queued
+                        if running_by_user.get(j.created_by_id, 0) < self.user_quota]
+        # Si todos los que esperan ya llenaron su cuota, no dejamos slots ociosos
+        return max(within_quota or queued, key=sort_key)
+
+    def effective_priority(self, job: ScrapingJob, now=None) -> float:
+        """Prioridad más lo ganado por esperar en la cola"""
+        now = now or timezone.now()
+        waited = (now - job.queued_at).total_seconds() / 60
+        return job.priority + waited / self.aging_minutes
+
+    def queue_stats(self, hours: int = 24) -> Dict[str, Dict]:
+        """Espera en cola por clase de prioridad (en segundos)"""
+        now = timezone.now()
+        since = now - timedelta(hours=hours)
+        stats = {}
+
+        for value, label in ScrapingJob.PRIORITY_CHOICES:
+            waiting = [
+                (now - queued_at).total_seconds()
+                for queued_at in ScrapingJob.objects
+                .filter(priority=value, status='pending', queued_at__isnull=False)
+                .values_list('queued_at', flat=True)
+            ]
+            started = [
+                (started_at - queued_at).total_seconds()
+                for queued_at, started_at in ScrapingJob.objects
+                .filter(priority=value, queued_at__isnull=False, started_at__gte=since)
+                .values_list('queued_at', 'started_at')
+                if started_at >= queued_at
+            ]
+            stats[label] = {
+                'priority': value,
+                'queued': len(waiting),
+                'current_max_wait': round(max(waiting, default=0), 1),
+                'started': len(started),
+                'avg_wait': round(sum(started) / len(started), 1) if started else 0,
+                'max_wait': round(max(started, default=0), 1),
+            }
+        return stats
@@ -0,0 +1,105 @@
+import asyncio
+import time
+from typing import Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+from ..models import ScrapingJob, JobMetrics
+
+
+async def keep_alive(job: ScrapingJob, stop: asyncio.Event, interval: int = None,
+                     metrics=None):
+    """
+    Marca el heartbeat del job hasta que se setee `stop`.
+
+    Si el proceso se cae el heartbeat queda viejo y el scheduler sabe que
+    ese job 'running' ya no tiene dueño (ver JobScheduler.reap_orphans).
+    `metrics` devuelve las métricas parciales (o None): se guardan con cada
+    heartbeat para que /metrics vea también los jobs que siguen corriendo.
+    """
+    interval = interval or settings.SCRAPING_HEARTBEAT_SECONDS
+
+    def beat(snapshot):
+        ScrapingJob.objects.filter(pk=job.pk, status='running').update(heartbeat_at=timezone.now())
+        if snapshot:
+            JobMetrics.objects.update_or_create(job_id=job.pk, defaults=snapshot)
+
+    while not stop.is_set():
+        # La foto se saca en el loop: el scraper sigue sumando mientras se guarda
+        snapshot = metrics() if metrics else None
+        await sync_to_async(beat)(snapshot)
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+class JobSupervisor:
+    """
+    Vigila un job en ejecución y lo frena si se pasa de sus límites.
+
+    Primero pide una parada cooperativa (el scraper termina el scroll
+    actual y devuelve lo que tiene); si no frena dentro del período de
+    gracia, cancela la tarea de búsqueda a la fuerza.
+    """
+
+    def __init__(self, job: ScrapingJob, scraper, interval: int = None,
+                 grace_seconds: int = None):
+        self.job = job
+        self.scraper = scraper
+        self.budget = job.budget()
+        self.interval = interval or settings.SCRAPING_SUPERVISOR_INTERVAL
+        self.grace_seconds = grace_seconds or settings.SCRAPING_STOP_GRACE_SECONDS
+        self.started = time.monotonic()
+        # (status, mensaje) con el que hay que cerrar el job, si lo frenamos
+        self.stop_reason: Optional[Tuple[str, str]] = None
+
+    async def watch(self, task: asyncio.Task):
+        """Chequea los límites hasta que la tarea termine"""
+        while not task.done():
+            await asyncio.sleep(self.interval)
+            reason = await self.check()
+            if not reason:
+                continue
+
+            self.stop_reason = reason
+            print(f"🛑 Frenando job {self.job.id}: {reason[1]}")
+            self.scraper.stop_reason = reason[1]
+
+            try:
+                await asyncio.wait_for(asyncio.shield(task), timeout=self.grace_seconds)
+            except asyncio.TimeoutError:
+                print("🛑 El scraper no frenó a tiempo, cancelando la tarea")
+                task.cancel()
+            except Exception:
+                # El error de la búsqueda lo maneja quien espera la tarea
+                pass
+            return
+
+    async def check(self) -> Optional[Tuple[str, str]]:
+        """Devuelve (status, mensaje) si hay que frenar el job"""
+        if await sync_to_async(self._cancel_requested)():
+            return 'cancelled', "Cancelado por el usuario"
+
+        elapsed_minutes = (time.monotonic() - self.started) / 60
+        if elapsed_minutes > self.budget['max_duration_minutes']:
+            return 'budget_exceeded', f"Superó {self.budget['max_duration_minutes']} minutos"
+
+        if self.scraper.tweets_extracted >= self.budget['max_tweets']:
+            return 'budget_exceeded', f"Llegó a {self.budget['max_tweets']} tweets"
+
+        if self.scraper.pages_scrolled >= self.budget['max_pages']:
+            return 'budget_exceeded', f"Llegó a {self.budget['max_pages']} scrolls"
+
+        rss = self.scraper.browser_rss_mb()
+        if rss > self.budget['max_browser_memory_mb']:
+            what = "El navegador usa" if self.scraper.owns_browser else "La sesión usa unos"
+            return 'budget_exceeded', f"{what} {rss:.0f} MB (máximo {self.budget['max_browser_memory_mb']})"
+
+        return None
+
+    def _cancel_requested(self) -> bool:
+        """Lee el pedido de cancelación de la base (sync)"""
+        return ScrapingJob.objects.filter(pk=self.job.pk, cancel_requested=True).exists()
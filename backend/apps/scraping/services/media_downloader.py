@@ -0,0 +1,182 @@
+import asyncio
+import hashlib
+import mimetypes
+import os
+import queue
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+from django.conf import settings
+from django.db import connection
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ..models import MediaFile
+
+
+CHUNK_SIZE = 64 * 1024
+
+# Errores del lado del servidor que vale la pena reintentar
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def media_extension(url: str, content_type: str) -> str:
+    """'.jpg', '.mp4'... por el Content-Type, o por la URL si no viene"""
+    extension = mimetypes.guess_extension((content_type or '').split(';')[0].strip())
+    if extension:
+        return extension
+    parts = urlsplit(url)
+    # pbs.twimg.com/media/XXX?format=jpg&name=orig
+    media_format = parse_qs(parts.query).get('format')
+    if media_format:
+        return '.' + media_format[0]
+    return os.path.splitext(parts.path)[1].lower()
+
+
+class MediaDownloader:
+    """
+    Baja las fotos y videos de los tweets por HTTP, desde threads propios y
+    sin pasar por el navegador: el scroll nunca espera a una descarga.
+
+    El scraper pasa URLs con `add()`, que no bloquea (la cola no tiene
+    límite, son solo URLs). `concurrency` threads comparten una sesión de
+    requests con un pool del mismo tamaño y reintentos con backoff para
+    errores de conexión, 429 y 5xx. Cada archivo se nombra con el sha256 de
+    su contenido: si ya existe (otra URL, otro job) no se vuelve a escribir,
+    y una URL que ya tiene su MediaFile ni se pide.
+    """
+
+    def __init__(self, concurrency: int = None, retries: int = None, timeout: float = None,
+                 root: str = None, max_mb: int = None, record: bool = True):
+        self.concurrency = concurrency or settings.SCRAPING_MEDIA_CONCURRENCY
+        self.retries = settings.SCRAPING_MEDIA_RETRIES if retries is None else retries
+        self.timeout = timeout or settings.SCRAPING_MEDIA_TIMEOUT
+        self.max_bytes = (max_mb or settings.SCRAPING_MEDIA_MAX_MB) * 1024 * 1024
+        self.root = Path(root) if root else Path(settings.MEDIA_ROOT) / settings.SCRAPING_MEDIA_DIR
+        # Sin record no se toca la base (benchmarks)
+        self.record = record
+        self.queue = queue.Queue()
+        self.downloaded = 0
+        self.deduplicated = 0
+        self.skipped = 0
+        self.failed = 0
+        self.bytes = 0
+        self.download_seconds = 0.0
+        self.session = None
+        self._seen = set()
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        retry = Retry(total=self.retries, backoff_factor=0.5, status_forcelist=RETRY_STATUSES,
+                      allowed_methods=frozenset(['GET']), raise_on_status=False)
+        # pool_block: nunca más de `concurrency` conexiones por host
+        adapter = HTTPAdapter(pool_maxsize=self.concurrency, pool_block=True, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        for _ in range(self.concurrency):
+            thread = threading.Thread(target=self._run)
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def add(self, urls: Iterable[str]):
+        """Encola las URLs que no se pidieron todavía (no bloquea)"""
+        for url in urls:
+            if url not in self._seen:
+                self._seen.add(url)
+                self.queue.put_nowait(url)
+
+    async def close(self):
+        """Espera a que se baje lo encolado, sin bloquear el event loop"""
+        await asyncio.get_running_loop().run_in_executor(None, self.join)
+
+    def join(self):
+        for _ in self._threads:
+            self.queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        if self.session:
+            self.session.close()
+
+    def counters(self) -> Dict[str, int]:
+        return {
+            'media_downloaded': self.downloaded,
+            'media_deduplicated': self.deduplicated,
+            'media_skipped': self.skipped,
+            'media_failed': self.failed,
+            'media_bytes': self.bytes,
+        }
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def _run(self):
+        try:
+            while True:
+                url = self.queue.get()
+                if url is None:
+                    break
+                try:
+                    self._fetch(url)
+                except Exception as e:
+                    self._count('failed')
+                    print(f"⚠️ No se pudo bajar {url}: {e}")
+        finally:
+            connection.close()
+
+    def _fetch(self, url: str):
+        if self.record and MediaFile.objects.filter(url=url).exists():
+            self._count('skipped')
+            return
+
+        start = time.perf_counter()
+        digest = hashlib.sha256()
+        size = 0
+        # Se baja a un temporal al lado del destino: el rename es atómico
+        fd, part = tempfile.mkstemp(dir=self.root, prefix='.', suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as out, \
+                    self.session.get(url, stream=True, timeout=self.timeout) as response:
+                response.raise_for_status()
+                content_type = response.headers.get('Content-Type', '')
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise ValueError(f"pesa más de {self.max_bytes // (1024 * 1024)} MB")
+                    digest.update(chunk)
+                    out.write(chunk)
+
+            sha256 = digest.hexdigest()
+            relative = Path(sha256[:2]) / (sha256 + media_extension(url, content_type))
+            target = self.root / relative
+            if target.exists():
+                self._count('deduplicated')
+            else:
+                target.parent.mkdir(exist_ok=True)
+                os.replace(part, target)
+                part = None
+                self._count('downloaded')
+                self._count('bytes', size)
+        finally:
+            if part:
+                os.unlink(part)
+        self._count('download_seconds', time.perf_counter() - start)
+
+        if self.record:
+            MediaFile.objects.get_or_create(url=url, defaults={
+                'sha256': sha256,
+                'path': os.path.relpath(target, settings.MEDIA_ROOT),
+                'content_type': content_type,
+                'size': size,
+            })
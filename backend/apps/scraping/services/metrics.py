@@ -0,0 +1,118 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterable, Tuple
+
+
+class MetricsCollector:
+    """
+    Tiempos por fase y contadores de un job.
+
+    `phase()` sirve igual en código async: `with metrics.phase('goto'):
+    await page.goto(url)` mide el tiempo de pared del await.
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[str, int] = defaultdict(int)
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def observe(self, name: str, seconds: float):
+        stats = self.phases.setdefault(name, {'count': 0, 'total': 0.0, 'max': 0.0})
+        stats['count'] += 1
+        stats['total'] += seconds
+        stats['max'] = max(stats['max'], seconds)
+
+    def incr(self, name: str, amount: int = 1):
+        self.counters[name] += amount
+
+    def as_dict(self) -> Dict:
+        return {
+            'phases': {
+                name: {'count': s['count'], 'total': round(s['total'], 4), 'max': round(s['max'], 4)}
+                for name, s in self.phases.items()
+            },
+            'counters': dict(self.counters),
+        }
+
+    def summary(self) -> str:
+        """Una línea por fase, ordenadas por tiempo total"""
+        lines = []
+        for name, s in sorted(self.phases.items(), key=lambda item: -item[1]['total']):
+            lines.append(f"  {name:16} {s['total']:8.2f}s  x{s['count']}")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"  {name:16} {value}")
+        return '\n'.join(lines)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus(job_counts: Iterable[Tuple[str, int]],
+                      job_metrics: Iterable[Tuple[dict, dict]]) -> str:
+    """
+    Arma el texto de /metrics en el formato de exposición de Prometheus.
+
+    `job_counts` son pares (status, cantidad) y `job_metrics` pares
+    (phases, counters) de cada job, que se suman. Como son sumas sobre lo
+    que hay en la base (bajan si se borran jobs) van como gauge, no como
+    counter; los jobs que corren aportan lo que llevan hasta su último
+    heartbeat.
+    """
+    phase_total = defaultdict(float)
+    phase_count = defaultdict(int)
+    phase_max = defaultdict(float)
+    counters = defaultdict(int)
+
+    for phases, job_counters in job_metrics:
+        for name, stats in (phases or {}).items():
+            phase_total[name] += stats.get('total', 0)
+            phase_count[name] += stats.get('count', 0)
+            phase_max[name] = max(phase_max[name], stats.get('max', 0))
+        for name, value in (job_counters or {}).items():
+            counters[name] += value
+
+    lines = [
+        '# HELP scraping_jobs Jobs de scraping por estado',
+        '# TYPE scraping_jobs gauge',
+    ]
+    for status, count in job_counts:
+        lines.append(f'scraping_jobs{{status="{_escape(status)}"}} {count}')
+
+    lines += [
+        '# HELP scraping_phase_seconds Tiempo acumulado por fase del scraping',
+        '# TYPE scraping_phase_seconds gauge',
+    ]
+    for name in sorted(phase_total):
+        lines.append(f'scraping_phase_seconds{{phase="{_escape(name)}"}} {phase_total[name]:.4f}')
+
+    lines += [
+        '# HELP scraping_phase_calls Veces que se ejecutó cada fase',
+        '# TYPE scraping_phase_calls gauge',
+    ]
+    for name in sorted(phase_count):
+        lines.append(f'scraping_phase_calls{{phase="{_escape(name)}"}} {phase_count[name]}')
+
+    lines += [
+        '# HELP scraping_phase_max_seconds Duración máxima de una ejecución de la fase',
+        '# TYPE scraping_phase_max_seconds gauge',
+    ]
+    for name in sorted(phase_max):
+        lines.append(f'scraping_phase_max_seconds{{phase="{_escape(name)}"}} {phase_max[name]:.4f}')
+
+    lines += [
+        '# HELP scraping_events Contadores del scraping (tweets, duplicados, errores, ventanas)',
+        '# TYPE scraping_events gauge',
+    ]
+    for name in sorted(counters):
+        lines.append(f'scraping_events{{event="{_escape(name)}"}} {counters[name]}')
+
+    return '\n'.join(lines) + '\n'
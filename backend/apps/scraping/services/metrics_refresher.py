@@ -0,0 +1,152 @@
+import asyncio
+import re
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+
+from .twitter_scraper import TweetScraper
+
+
+# Las respuestas de la API de X que traen el tweet del detalle
+TWEET_API_RE = re.compile(r'/graphql/[^/]+/(TweetDetail|TweetResultByRestId)')
+
+# En el detalle no hace falta bajar nada de esto
+BLOCKED_RESOURCES = ('image', 'media', 'font')
+
+
+def find_tweet_metrics(payload, tweet_id: str) -> Optional[Dict[str, Optional[int]]]:
+    """
+    Busca el tweet en la respuesta de la API y devuelve sus métricas exactas.
+
+    Los tweets viejos no traen vistas: ahí 'views' es None (no se sabe), no 0.
+    """
+    stack = [payload]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(node)
+            continue
+        if not isinstance(node, dict):
+            continue
+        legacy = node.get('legacy')
+        if node.get('rest_id') == tweet_id and isinstance(legacy, dict):
+            views = (node.get('views') or {}).get('count')
+            return {
+                'replies': int(legacy.get('reply_count', 0)),
+                'retweets': int(legacy.get('retweet_count', 0)),
+                'likes': int(legacy.get('favorite_count', 0)),
+                'views': int(views) if views is not None else None,
+            }
+        stack.extend(node.values())
+    return None
+
+
+class MetricsRefresher:
+    """
+    Trae las métricas actuales de tweets ya guardados, sin volver a buscar.
+
+    Abre el detalle de cada tweet en una de `concurrency` páginas, sin
+    imágenes ni fuentes, y se queda con lo primero que llega: la respuesta
+    de la API (números exactos) o, si no aparece a tiempo, el tweet ya
+    renderizado (números redondeados, como en la búsqueda).
+    """
+
+    def __init__(self, scraper: TweetScraper, concurrency: int = None, timeout: float = None):
+        self.scraper = scraper
+        self.concurrency = concurrency or settings.SCRAPING_REFRESH_CONCURRENCY
+        self.timeout = timeout or settings.SCRAPING_REFRESH_TIMEOUT
+        self.from_api = 0
+        self.from_dom = 0
+
+    async def refresh(self, tweets: Iterable[Tuple[str, str]]) -> Dict[str, Dict[str, Optional[int]]]:
+        """(tweet_id, url) -> {tweet_id: métricas} de los que se pudieron leer"""
+        tweets = list(tweets)
+        results = {}
+        if not tweets:
+            return results
+        print(f"🔄 Actualizando métricas de {len(tweets)} tweets "
+              f"({self.concurrency} páginas a la vez)...")
+
+        pages = asyncio.Queue()
+        own_pages = []
+        for _ in range(min(self.concurrency, len(tweets))):
+            page = await self.scraper.context.new_page()
+            await page.route('**/*', self._block_heavy)
+            own_pages.append(page)
+            pages.put_nowait(page)
+
+        async def run(tweet_id, url):
+            page = await pages.get()
+            try:
+                if self.scraper.stop_reason:
+                    return
+                metrics = await self._fetch(page, tweet_id, url)
+                if metrics:
+                    results[tweet_id] = metrics
+                    self.scraper.metrics.incr('tweets_refreshed')
+                else:
+                    self.scraper.metrics.incr('refresh_errors')
+                self.scraper.pages_scrolled += 1
+                self.scraper._report_progress({'type': 'progress', 'refreshed': len(results),
+                                               'total': len(tweets),
+                                               'pages': self.scraper.pages_scrolled})
+            finally:
+                pages.put_nowait(page)
+
+        try:
+            with self.scraper.metrics.phase('refresh'):
+                await asyncio.gather(*(run(tweet_id, url) for tweet_id, url in tweets))
+        finally:
+            for page in own_pages:
+                await page.close()
+
+        print(f"🔄 {len(results)}/{len(tweets)} actualizados "
+              f"({self.from_api} desde la API, {self.from_dom} desde la página)")
+        return results
+
+    async def _block_heavy(self, route):
+        if route.request.resource_type in BLOCKED_RESOURCES:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _fetch(self, page, tweet_id: str, url: str) -> Optional[Dict[str, Optional[int]]]:
+        captured = asyncio.get_running_loop().create_future()
+
+        async def on_response(response):
+            if captured.done() or not TWEET_API_RE.search(response.url):
+                return
+            try:
+                metrics = find_tweet_metrics(await response.json(), tweet_id)
+            except Exception:
+                return
+            if metrics and not captured.done():
+                captured.set_result(metrics)
+
+        page.on('response', on_response)
+        try:
+            await page.goto(url, wait_until='commit')
+            try:
+                metrics = await asyncio.wait_for(asyncio.shield(captured), timeout=self.timeout)
+                self.from_api += 1
+                return metrics
+            except asyncio.TimeoutError:
+                pass
+
+            # Sin respuesta de la API: leer el tweet de la página
+            article = page.locator(f'article[data-testid="tweet"]:has(a[href*="/status/{tweet_id}"])').first
+            await article.wait_for(timeout=self.timeout * 1000)
+            element = await article.element_handle()
+            metrics = await self.scraper._extract_metrics(element)
+            if not await element.query_selector('a[href*="/analytics"]'):
+                # Sin contador de vistas en la página: no se sabe, no es 0
+                metrics['views'] = None
+            self.from_dom += 1
+            return metrics
+        except Exception as e:
+            print(f"⚠️ No se pudieron actualizar las métricas de {tweet_id}: {e}")
+            return None
+        finally:
+            page.remove_listener('response', on_response)
+            if not captured.done():
+                captured.cancel()
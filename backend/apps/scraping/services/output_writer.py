@@ -0,0 +1,201 @@
+import gzip
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+EXTENSIONS = {
+    None: '.ndjson',
+    'gzip': '.ndjson.gz',
+    'zstd': '.ndjson.zst',
+}
+
+
+def output_dir() -> Path:
+    """Carpeta donde quedan los archivos de salida"""
+    return Path(settings.BASE_DIR) / 'output'
+
+
+def normalize_compression(compression: Optional[str]) -> Optional[str]:
+    """'none', '' o None significan sin compresión"""
+    if not compression or compression == 'none':
+        return None
+    if compression not in EXTENSIONS:
+        raise ValueError(f"Compresión no soportada: {compression}")
+    if compression == 'zstd' and zstandard is None:
+        raise ValueError("Para usar zstd hay que instalar el paquete zstandard")
+    return compression
+
+
+class TweetOutputWriter:
+    """
+    Escribe los tweets como NDJSON (un JSON por línea) a medida que salen.
+
+    No hace falta juntar todo en memoria: cada tweet se agrega al final del
+    archivo, opcionalmente comprimido con gzip o zstd. Al cerrar se escribe
+    un `.meta.json` al lado con los datos de la búsqueda y el total.
+    """
+
+    def __init__(self, name: str, compression: Optional[str] = 'default',
+                 directory: Path = None):
+        if compression == 'default':
+            compression = settings.SCRAPING_OUTPUT_COMPRESSION
+        self.name = name
+        self.compression = normalize_compression(compression)
+        self.directory = Path(directory) if directory else output_dir()
+        self.count = 0
+        self._file = None
+        self._stream = None
+
+    @classmethod
+    def for_job(cls, job_id: int, **kwargs) -> 'TweetOutputWriter':
+        """Un archivo fijo por job"""
+        return cls(f"job_{job_id}", **kwargs)
+
+    @classmethod
+    def find_for_job(cls, job_id: int, directory: Path = None) -> Optional[Path]:
+        """El archivo de salida de un job, con la compresión que tenga"""
+        directory = Path(directory) if directory else output_dir()
+        for extension in EXTENSIONS.values():
+            path = directory / f"job_{job_id}{extension}"
+            if path.exists():
+                return path
+        return None
+
+    @property
+    def path(self) -> Path:
+        return self.directory / f"{self.name}{EXTENSIONS[self.compression]}"
+
+    @property
+    def meta_path(self) -> Path:
+        return self.directory / f"{self.name}.meta.json"
+
+    def open(self):
+        """Abre el archivo; cada ejecución empieza de cero"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Si antes se escribió con otra compresión, no dejamos restos
+        for extension in EXTENSIONS.values():
+            old = self.directory / f"{self.name}{extension}"
+            if old != self.path and old.exists():
+                old.unlink()
+
+        self._file = open(self.path, 'wb')
+        if self.compression == 'gzip':
+            self._stream = gzip.GzipFile(fileobj=self._file, mode='wb')
+        elif self.compression == 'zstd':
+            self._stream = zstandard.ZstdCompressor().stream_writer(self._file)
+        else:
+            self._stream = self._file
+        self.count = 0
+        return self
+
+    def write(self, record: Dict):
+        """Agrega un tweet al final"""
+        if self._stream is None:
+            self.open()
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        self._stream.write(line.encode('utf-8'))
+        self.count += 1
+
+    def flush(self):
+        """Baja a disco lo escrito hasta ahora (se llama por scroll)"""
+        if self._stream is None:
+            return
+        if self.compression == 'zstd':
+            self._stream.flush(zstandard.FLUSH_BLOCK)
+        else:
+            self._stream.flush()
+        self._file.flush()
+
+    def close(self, metadata: Dict = None):
+        """Cierra el archivo y escribe el sidecar con la metadata"""
+        if self._stream is None:
+            return
+        if self._stream is not self._file:
+            self._stream.close()
+        if not self._file.closed:
+            self._file.close()
+        self._stream = None
+        self._file = None
+
+        meta = {
+            'scraping_date': datetime.now().isoformat(),
+            **(metadata or {}),
+            'total_tweets': self.count,
+            'format': 'ndjson',
+            'compression': self.compression,
+            'file': self.path.name,
+        }
+        with open(self.meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2, ensure_ascii=False)
+
+        print(f"💾 NDJSON guardado en: {self.path}")
+        print(f"📊 Total tweets guardados: {self.count}")
+
+
+def apply_retention(compact_after_days: int = None, delete_after_days: int = None,
+                    directory: Path = None, skip_names: Iterable[str] = ()) -> Dict[str, List[str]]:
+    """
+    Compacta y borra archivos viejos de la carpeta de salida.
+
+    Los NDJSON sin comprimir con más de `compact_after_days` se pasan a
+    gzip (los .json viejos no: la descarga legacy los lee tal cual); todo
+    lo que tenga más de `delete_after_days` se borra
+    (con su sidecar). `skip_names` son nombres base a no tocar, ej: los
+    de jobs que siguen corriendo.
+    """
+    if compact_after_days is None:
+        compact_after_days = settings.SCRAPING_OUTPUT_COMPACT_DAYS
+    if delete_after_days is None:
+        delete_after_days = settings.SCRAPING_OUTPUT_RETENTION_DAYS
+    directory = Path(directory) if directory else output_dir()
+    result = {'compacted': [], 'deleted': []}
+    if not directory.exists():
+        return result
+
+    now = time.time()
+    skip_names = set(skip_names)
+
+    for path in sorted(directory.iterdir()):
+        if not path.is_file() or path.name.endswith('.meta.json'):
+            continue
+        name = path.name.split('.')[0]
+        if name in skip_names:
+            continue
+        age_days = (now - path.stat().st_mtime) / 86400
+
+        if age_days > delete_after_days:
+            path.unlink()
+            meta_path = directory / f"{name}.meta.json"
+            if meta_path.exists():
+                meta_path.unlink()
+            result['deleted'].append(path.name)
+
+        elif age_days > compact_after_days and path.suffix == '.ndjson':
+            compacted = path.with_name(path.name + '.gz')
+            with open(path, 'rb') as src, gzip.open(compacted, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.utime(compacted, (path.stat().st_atime, path.stat().st_mtime))
+            path.unlink()
+
+            meta_path = directory / f"{name}.meta.json"
+            if meta_path.exists():
+                with open(meta_path, encoding='utf-8') as f:
+                    meta = json.load(f)
+                meta.update({'compression': 'gzip', 'file': compacted.name})
+                with open(meta_path, 'w', encoding='utf-8') as f:
+                    json.dump(meta, f, indent=2, ensure_ascii=False)
+            result['compacted'].append(path.name)
+
+    return result
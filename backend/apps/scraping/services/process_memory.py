@@ -0,0 +1,63 @@
+import os
+import signal
+from typing import List, Optional
+
+
+def playwright_driver_pid(playwright) -> Optional[int]:
+    """PID del proceso driver de Playwright (el navegador cuelga de él)"""
+    try:
+        return playwright._impl_obj._connection._transport._proc.pid
+    except AttributeError:
+        return None
+
+
+def process_tree(pid: int) -> List[int]:
+    """El proceso y todos sus descendientes, leyendo /proc"""
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # El nombre puede tener espacios: el ppid viene después del ')'
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    tree, pending = [], [pid]
+    while pending:
+        current = pending.pop()
+        tree.append(current)
+        pending.extend(children.get(current, []))
+    return tree
+
+
+def process_rss_mb(pid: int) -> float:
+    """RSS de un proceso en MB (0 si ya no existe)"""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def process_tree_rss_mb(pid: Optional[int]) -> float:
+    """RSS sumado del proceso y sus hijos, en MB"""
+    if not pid or not os.path.exists('/proc'):
+        return 0.0
+    return sum(process_rss_mb(p) for p in process_tree(pid))
+
+
+def kill_process_tree(pid: Optional[int]):
+    """Mata el proceso y sus hijos, empezando por las hojas"""
+    if not pid or not os.path.exists('/proc'):
+        return
+    for p in reversed(process_tree(pid)):
+        try:
+            os.kill(p, signal.SIGKILL)
+        except OSError:
+            pass
@@ -0,0 +1,163 @@
+import json
+import queue
+import threading
+import time
+from typing import Dict, Iterator, Optional
+
+from django.conf import settings
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+
+class LocalProgressBroker:
+    """
+    Pub/sub en memoria, para cuando el job y el SSE corren en el mismo proceso.
+
+    Guarda el último evento de cada job, así quien se suscribe tarde
+    arranca con el estado actual en vez de esperar al próximo scroll.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[int, list] = {}
+        self._last: Dict[int, dict] = {}
+
+    def publish(self, job_id: int, event: dict):
+        with self._lock:
+            self._last[job_id] = event
+            subscribers = list(self._subscribers.get(job_id, []))
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(event)
+            except queue.Full:
+                # Un cliente lento no frena al scraper: pierde eventos viejos
+                pass
+
+    def subscribe(self, job_id: int, timeout: float) -> Iterator[Optional[dict]]:
+        """Eventos del job; devuelve None cada `timeout` segundos sin novedades"""
+        subscriber = queue.Queue(maxsize=100)
+        with self._lock:
+            self._subscribers.setdefault(job_id, []).append(subscriber)
+            last = self._last.get(job_id)
+        try:
+            if last:
+                yield last
+            while True:
+                try:
+                    yield subscriber.get(timeout=timeout)
+                except queue.Empty:
+                    yield None
+        finally:
+            with self._lock:
+                self._subscribers.get(job_id, []).remove(subscriber)
+                if not self._subscribers.get(job_id):
+                    self._subscribers.pop(job_id, None)
+
+    def forget(self, job_id: int):
+        """Libera el último evento guardado de un job terminado"""
+        with self._lock:
+            self._last.pop(job_id, None)
+
+
+class RedisProgressBroker:
+    """Pub/sub con Redis, para cuando el scraping corre en otro proceso"""
+
+    def __init__(self, url: str):
+        self.client = redis.Redis.from_url(url)
+
+    def _channel(self, job_id: int) -> str:
+        return f"scraping:job:{job_id}:progress"
+
+    def publish(self, job_id: int, event: dict):
+        payload = json.dumps(event)
+        try:
+            pipe = self.client.pipeline()
+            pipe.publish(self._channel(job_id), payload)
+            pipe.set(f"{self._channel(job_id)}:last", payload, ex=3600)
+            pipe.execute()
+        except redis.RedisError as e:
+            print(f"⚠️ No se pudo publicar progreso: {e}")
+
+    def subscribe(self, job_id: int, timeout: float) -> Iterator[Optional[dict]]:
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self._channel(job_id))
+        try:
+            last = self.client.get(f"{self._channel(job_id)}:last")
+            if last:
+                yield json.loads(last)
+            while True:
+                message = pubsub.get_message(timeout=timeout)
+                yield json.loads(message['data']) if message else None
+        finally:
+            pubsub.close()
+
+    def forget(self, job_id: int):
+        pass
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """El broker del proceso: Redis si está configurado, si no en memoria"""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            url = settings.SCRAPING_PROGRESS_REDIS_URL
+            if url and redis is not None:
+                _broker = RedisProgressBroker(url)
+            else:
+                _broker = LocalProgressBroker()
+        return _broker
+
+
+def publish_status(job):
+    """Avisa un cambio de estado del job"""
+    broker = get_broker()
+    broker.publish(job.id, {
+        'type': 'status',
+        'job_id': job.id,
+        'status': job.status,
+        'tweets': job.tweets_count,
+        'error': job.error_message,
+        'time': time.time(),
+    })
+    if job.status in job.FINAL_STATUSES:
+        # El SSE arranca con el estado de la base, no hace falta guardarlo
+        broker.forget(job.id)
+
+
+class ProgressReporter:
+    """
+    Callback que el scraper llama en cada scroll.
+
+    Le agrega el id del job y la tasa de tweets por segundo, y limita
+    cuántos eventos se publican para no inundar el canal.
+    """
+
+    def __init__(self, job_id: int, min_interval: float = None):
+        self.job_id = job_id
+        self.min_interval = (min_interval if min_interval is not None
+                             else settings.SCRAPING_PROGRESS_MIN_INTERVAL)
+        self.started = time.monotonic()
+        self._last_sent = 0.0
+
+    def __call__(self, event: dict):
+        now = time.monotonic()
+        # Los cambios de ventana siempre salen; los scrolls, como mucho uno por intervalo
+        if event.get('type') == 'progress' and now - self._last_sent < self.min_interval:
+            return
+        self._last_sent = now
+
+        elapsed = now - self.started
+        get_broker().publish(self.job_id, {
+            **event,
+            'job_id': self.job_id,
+            'elapsed': round(elapsed, 1),
+            'rate': round(event.get('tweets', 0) / elapsed, 2) if elapsed else 0,
+            'time': time.time(),
+        })
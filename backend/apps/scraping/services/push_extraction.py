@@ -0,0 +1,109 @@
+from typing import Dict, Optional
+
+from .snapshot_parser import handle_from_href, media_from, parse_metric_value
+
+
+# Nombre de la función que expone Python en cada página
+BINDING_NAME = '__scraperPush'
+
+# Se inyecta en cada documento: un MutationObserver mira el timeline y manda a
+# Python cada tweet nuevo apenas se renderiza, sin esperar al próximo scroll.
+# Los tweets mandados quedan marcados con data-pushed para no repetirlos.
+OBSERVER_SCRIPT = """(() => {
+    if (window.__scraperScan) return;
+    const SELECTOR = 'article[data-testid="tweet"]:not([data-pruned]):not([data-pushed])';
+    const text = (root, selector) => {
+        const element = root.querySelector(selector);
+        return element ? element.textContent : '';
+    };
+
+    function extract(article) {
+        const link = article.querySelector('a[href*="/status/"]');
+        if (!link) return null;
+        const match = text(article, '[data-testid="User-Name"]').match(/@(\\w+)/);
+        if (!match) return null;
+        const time = article.querySelector('time');
+        return {
+            tweet_id: link.getAttribute('href').split('/status/').pop().split('?')[0],
+            username: match[1],
+            text: text(article, '[data-testid="tweetText"]'),
+            datetime: time ? time.getAttribute('datetime') : null,
+            metrics: {
+                replies: text(article, '[data-testid="reply"]'),
+                retweets: text(article, '[data-testid="retweet"]'),
+                likes: text(article, '[data-testid="like"]'),
+                views: text(article, 'a[href*="/analytics"]'),
+            },
+            has_image: !!article.querySelector('img[src*="pbs.twimg.com/media"]'),
+            has_video: !!article.querySelector('video'),
+            images: Array.from(article.querySelectorAll('img[src*="pbs.twimg.com/media"]'),
+                               img => img.getAttribute('src')),
+            videos: Array.from(article.querySelectorAll('video'), video => {
+                const source = video.querySelector('source[src]');
+                return [video.getAttribute('src') || (source && source.getAttribute('src')),
+                        video.getAttribute('poster')];
+            }),
+            is_retweet: Array.from(article.querySelectorAll('span'))
+                .some(span => span.textContent.toLowerCase().includes('retweeted')),
+            is_quote: !!article.querySelector('[data-testid="quoteTweet"]'),
+            rt_href: (() => {
+                const social = article.querySelector('[data-testid="socialContext"]');
+                const link = social && social.closest('a');
+                return link ? link.getAttribute('href') : null;
+            })(),
+        };
+    }
+
+    let scheduled = false;
+    window.__scraperScan = () => {
+        scheduled = false;
+        const batch = [];
+        for (const article of document.querySelectorAll(SELECTOR)) {
+            article.setAttribute('data-pushed', '1');
+            try {
+                // Sin link o sin @handle no es un tweet (ej: un aviso): no va
+                const record = extract(article);
+                if (record) batch.push(record);
+            } catch (e) {
+                batch.push({error: String(e && e.message || e)});
+            }
+        }
+        return batch.length ? window.__scraperPush(batch) : Promise.resolve();
+    };
+
+    // setTimeout y no requestAnimationFrame: en pestañas de fondo rAF no corre
+    const observer = new MutationObserver(() => {
+        if (!scheduled) {
+            scheduled = true;
+            setTimeout(window.__scraperScan, 50);
+        }
+    });
+    const start = () => {
+        observer.observe(document.body, {childList: true, subtree: true});
+        window.__scraperScan();
+    };
+    if (document.body) start();
+    else document.addEventListener('DOMContentLoaded', start);
+})()"""
+
+# Barrido final: devuelve recién cuando Python recibió lo que faltaba
+FLUSH_SCRIPT = "() => window.__scraperScan ? window.__scraperScan() : null"
+
+
+def normalize_pushed(record: Optional[Dict], base_url: str) -> Optional[Dict]:
+    """Lo que manda la página, con el mismo formato que _extract_tweet_data"""
+    if not record:
+        return None
+    if 'error' in record:
+        # extract() tiró una excepción en la página
+        raise ValueError(record['error'])
+    metrics = {name: parse_metric_value(value) for name, value in record['metrics'].items()}
+    rt_href = record.pop('rt_href', None)
+    media = media_from(record.pop('images', None) or [], record.pop('videos', None) or [])
+    return {
+        **record,
+        **media,
+        'rt_by': handle_from_href(rt_href) if record['is_retweet'] else None,
+        'metrics': metrics,
+        'url': f"{base_url}{record['username']}/status/{record['tweet_id']}",
+    }
@@ -0,0 +1,170 @@
+from datetime import datetime
+from typing import List, Dict
+
+from django.conf import settings
+from django.db.models import Count, Min, Max
+
+
+# Lo que ocupa cada operador dentro del paréntesis, según el tipo de query
+OPERATOR_PREFIX = {
+    'from': 'from:',
+    'to': 'to:',
+    'mentioning': '@',
+}
+
+
+class QueryPlanner:
+    """
+    Agrupa los targets en lotes de búsqueda.
+
+    En vez de meter a todos en un solo `(from:a OR from:b OR ...)`, arma
+    lotes que respeten el largo máximo de la query, la cantidad de
+    operadores y una cantidad esperada de tweets por query, usando la
+    densidad histórica (tweets por día) de cada target.
+    """
+
+    def __init__(self, max_query_length: int = None, max_targets: int = None,
+                 max_tweets_per_query: int = None, default_density: float = None,
+                 densities: Dict[str, float] = None):
+        self.max_query_length = max_query_length or settings.SCRAPING_QUERY_MAX_LENGTH
+        self.max_targets = max_targets or settings.SCRAPING_QUERY_MAX_TARGETS
+        self.max_tweets_per_query = max_tweets_per_query or settings.SCRAPING_QUERY_MAX_TWEETS
+        self.default_density = (default_density if default_density is not None
+                                else settings.SCRAPING_QUERY_DEFAULT_DENSITY)
+        # Densidades fijas (ej: fixtures locales), pisan a las históricas
+        self.densities = densities or {}
+
+    def get_densities(self, users: List[str], query_type: str) -> Dict[str, float]:
+        """Tweets por día de cada target, según lo que ya scrapeamos"""
+        clean_users = [u.lstrip('@') for u in users]
+        densities = {u: self.densities[u] for u in clean_users if u in self.densities}
+        missing = [u for u in clean_users if u not in densities]
+
+        if missing:
+            densities.update(self._historical_densities(missing, query_type))
+
+        return {u: densities.get(u, self.default_density) for u in clean_users}
+
+    def _historical_densities(self, users: List[str], query_type: str) -> Dict[str, float]:
+        """Calcula densidades desde la base (sync)"""
+        from ..models import Tweet, ScrapingJob
+
+        densities = {}
+
+        if query_type == 'from':
+            # Para 'from' el autor del tweet es el target: dato exacto
+            rows = (Tweet.objects.filter(username__in=users)
+                    .values('username')
+                    .annotate(total=Count('tweet_id', distinct=True),
+                              first=Min('date'), last=Max('date')))
+            for row in rows:
+                days = max((row['last'] - row['first']).days, 1)
+                densities[row['username']] = row['total'] / days
+            return densities
+
+        # Para 'to' y 'mentioning' usamos los jobs terminados, repartiendo
+        # los tweets entre los targets del job
+        jobs = (ScrapingJob.objects.filter(status='completed', query_type=query_type,
+                                           targets__username__in=users)
+                .annotate(n_targets=Count('targets', distinct=True))
+                .prefetch_related('targets')
+                .distinct())
+        samples = {}
+        for job in jobs:
+            days = max((job.end_date - job.start_date).days, 1)
+            per_target = job.tweets_count / days / max(job.n_targets, 1)
+            for target in job.targets.all():
+                if target.username in users:
+                    samples.setdefault(target.username, []).append(per_target)
+
+        for username, values in samples.items():
+            densities[username] = sum(values) / len(values)
+        return densities
+
+    def query_length(self, users: List[str], query_type: str) -> int:
+        """Largo de la parte `(... OR ...)` de la query"""
+        prefix = OPERATOR_PREFIX.get(query_type, '@')
+        parts = [f"{prefix}{u}" for u in users]
+        return len(f"({' OR '.join(parts)})")
+
+    def plan(self, users: List[str], query_type: str,
+             since_date: str, until_date: str) -> List[List[str]]:
+        """Arma los lotes para una ventana de búsqueda"""
+        clean_users = [u.lstrip('@') for u in users]
+        if not clean_users:
+            return []
+
+        densities = self.get_densities(clean_users, query_type)
+        days = self._window_days(since_date, until_date)
+
+        # First-fit decreasing: los más densos primero
+        ordered = sorted(clean_users, key=lambda u: densities[u], reverse=True)
+        batches = []
+        for user in ordered:
+            expected = densities[user] * days
+            for batch in batches:
+                if self._fits(batch, user, expected, query_type):
+                    batch['users'].append(user)
+                    batch['expected'] += expected
+                    break
+            else:
+                # Si no entra en ninguno, va solo aunque se pase del límite
+                batches.append({'users': [user], 'expected': expected})
+
+        return [batch['users'] for batch in batches]
+
+    def _fits(self, batch: dict, user: str, expected: float, query_type: str) -> bool:
+        """Verifica si el usuario entra en el lote sin romper ningún límite"""
+        users = batch['users'] + [user]
+        if len(users) > self.max_targets:
+            return False
+        if self.query_length(users, query_type) > self.max_query_length:
+            return False
+        return batch['expected'] + expected <= self.max_tweets_per_query
+
+    def _window_days(self, since_date: str, until_date: str) -> int:
+        """Días de la ventana, igual que la divide TweetScraper"""
+        start = datetime.strptime(since_date, '%Y-%m-%d')
+        end = datetime.strptime(until_date, '%Y-%m-%d')
+        total_days = max((end - start).days, 1)
+        window_size = settings.SCRAPING_WINDOW_DAYS
+        return min(total_days, window_size) if total_days > 30 else total_days
+
+    def describe(self, batches: List[List[str]], query_type: str,
+                 since_date: str, until_date: str) -> Dict:
+        """Estadísticas de un conjunto de lotes para una ventana"""
+        all_users = [u for batch in batches for u in batch]
+        densities = self.get_densities(all_users, query_type)
+        days = self._window_days(since_date, until_date)
+
+        expected = [sum(densities[u] for u in batch) * days for batch in batches]
+        lengths = [self.query_length(batch, query_type) for batch in batches]
+        over_limit = sum(
+            1 for batch, length, tweets in zip(batches, lengths, expected)
+            if length > self.max_query_length
+            or len(batch) > self.max_targets
+            or tweets > self.max_tweets_per_query
+        )
+
+        return {
+            'queries_per_window': len(batches),
+            'max_query_length': max(lengths, default=0),
+            'max_expected_tweets': round(max(expected, default=0), 1),
+            'expected_tweets': round(sum(expected), 1),
+            'queries_over_limit': over_limit,
+        }
+
+    def compare_strategies(self, users: List[str], query_type: str,
+                           since_date: str, until_date: str) -> Dict[str, Dict]:
+        """Compara query combinada, una query por target y los lotes del planner"""
+        clean_users = [u.lstrip('@') for u in users]
+        strategies = {
+            'combined': [clean_users],
+            'per_target': [[u] for u in clean_users],
+            'planned': self.plan(clean_users, query_type, since_date, until_date),
+        }
+        return {
+            name: self.describe(batches, query_type, since_date, until_date)
+            for name, batches in strategies.items()
+        }
+
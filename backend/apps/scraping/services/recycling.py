@@ -0,0 +1,49 @@
+from typing import Optional, Tuple
+
+from django.conf import settings
+
+
+class RecyclePolicy:
+    """
+    Decide cuándo conviene tirar el contexto (o el navegador entero) y
+    arrancar uno nuevo a mitad del job, antes de que la memoria del renderer
+    frene el scroll o el supervisor corte el job por memoria.
+
+    Cuenta scrolls y tweets desde el último reciclado, y cada tanto mira el
+    RSS del navegador. Con 0 ese límite no se usa.
+    """
+
+    # El RSS se lee de /proc: no hace falta en cada scroll
+    MEMORY_CHECK_EVERY = 10
+
+    def __init__(self, max_scrolls: int = None, max_tweets: int = None,
+                 max_memory_mb: int = None):
+        self.max_scrolls = (settings.SCRAPING_RECYCLE_SCROLLS if max_scrolls is None
+                            else max_scrolls)
+        self.max_tweets = (settings.SCRAPING_RECYCLE_TWEETS if max_tweets is None
+                           else max_tweets)
+        self.max_memory_mb = (settings.SCRAPING_RECYCLE_MEMORY_MB if max_memory_mb is None
+                              else max_memory_mb)
+        self.scrolls_at = 0
+        self.tweets_at = 0
+
+    def reset(self, scraper):
+        """Arranca a contar de nuevo (recién creado el contexto)"""
+        self.scrolls_at = scraper.pages_scrolled
+        self.tweets_at = scraper.tweets_extracted
+
+    def due(self, scraper) -> Optional[Tuple[str, str]]:
+        """('context' o 'browser', motivo) si hay que reciclar"""
+        scrolls = scraper.pages_scrolled - self.scrolls_at
+        if (self.max_memory_mb and scraper.owns_browser
+                and scrolls and scrolls % self.MEMORY_CHECK_EVERY == 0):
+            rss = scraper.browser_rss_mb()
+            if rss > self.max_memory_mb:
+                return 'browser', f"navegador en {rss:.0f} MB"
+
+        if self.max_scrolls and scrolls >= self.max_scrolls:
+            return 'context', f"{scrolls} scrolls en el contexto"
+        tweets = scraper.tweets_extracted - self.tweets_at
+        if self.max_tweets and tweets >= self.max_tweets:
+            return 'context', f"{tweets} tweets en el contexto"
+        return None
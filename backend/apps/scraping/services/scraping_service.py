@@ -1,125 +1,365 @@
 import asyncio
-from datetime import datetime
+import threading
 from asgiref.sync import sync_to_async
 
+from django.conf import settings
+from django.db.models import F
 from django.utils import timezone
 
-from ..models import ScrapingJob, Tweet
+from ..models import ScrapingJob, JobMetrics, Tweet
 from .twitter_scraper import TweetScraper
+from .query_planner import QueryPlanner
+from .job_coalescer import JobCoalescer
+from .job_scheduler import JobScheduler
+from .job_supervisor import JobSupervisor, keep_alive
+from .output_writer import TweetOutputWriter
+from .db_writer import TweetDBWriter
+from .media_downloader import MediaDownloader
+from .conversation_expander import ConversationExpander
+from .metrics_refresher import MetricsRefresher
+from .progress import ProgressReporter, publish_status
+from .artifacts import rebuild_artifacts
+from . import sessions
+
+
+def start_job(job: ScrapingJob):
+    """Ejecuta el job en un thread separado"""
+    def run_scraping():
+        try:
+            ScrapingService(job).run()
+        except Exception as e:
+            job.status = 'failed'
+            job.error_message = str(e)
+            job.completed_at = timezone.now()
+            job.save()
+        finally:
+            # Se liberó un navegador: que arranque el siguiente de la cola
+            JobScheduler().dispatch()
+
+    thread = threading.Thread(target=run_scraping)
+    thread.daemon = True
+    thread.start()
+    return thread
 
 
 class ScrapingService:
     """Conecta los modelos de Django con el scraper"""
     
-    def __init__(self, job: ScrapingJob):
+    def __init__(self, job: ScrapingJob, browser=None, memory_probe=None):
         self.job = job
+        # Navegador compartido (runner async); si no hay, el job lanza el suyo
+        self.browser = browser
+        # Estimación de los MB de la sesión en el navegador compartido
+        self.memory_probe = memory_probe
         self.scraper = None
+        self.expander = None
+        # (status, mensaje) si el supervisor frenó el job
+        self.stop_reason = None
         
     def run(self):
         """Ejecuta el job de scraping"""
-        self.job.status = 'running'
-        self.job.started_at = timezone.now()
-        self.job.save()
-        
+        self._mark_running()
         try:
-            asyncio.run(self._execute())
-            self.job.status = 'completed'
+            asyncio.run(self._execute_alive())
+            self._mark_result()
+        except Exception as e:
+            self.job.status = 'failed'
+            self.job.error_message = str(e)
+        finally:
+            self._finish()
+    
+    async def run_async(self):
+        """Como run(), pero dentro de un event loop que ya está corriendo"""
+        await sync_to_async(self._mark_running)()
+        try:
+            await self._execute_alive()
+            self._mark_result()
+        except asyncio.CancelledError:
+            # Se detuvo el runner con el job a medias
+            self.job.status = 'failed'
+            self.job.error_message = 'Runner detenido'
+            raise
         except Exception as e:
             self.job.status = 'failed'
             self.job.error_message = str(e)
         finally:
-            self.job.completed_at = timezone.now()
-            self.job.save()
+            await sync_to_async(self._finish)()
+    
+    def _mark_running(self):
+        self.job.status = 'running'
+        self.job.started_at = self.job.started_at or timezone.now()
+        self.job.save()
+        publish_status(self.job)
+    
+    def _mark_result(self):
+        if self.stop_reason:
+            # Frenado: quedan guardados los tweets parciales
+            self.job.status, self.job.error_message = self.stop_reason
+        else:
+            self.job.status = 'completed'
+    
+    def _finish(self):
+        self.job.completed_at = timezone.now()
+        self._save_metrics()
+        # Guarda el estado y resuelve jobs suscriptos a este
+        JobCoalescer().finish(self.job)
+            
+    async def _execute_alive(self):
+        """Corre _execute() avisando que el job sigue vivo"""
+        stop = asyncio.Event()
+        heartbeat = asyncio.ensure_future(keep_alive(self.job, stop, metrics=self._metrics_snapshot))
+        try:
+            await self._execute()
+        finally:
+            # Sin cancelar: que no quede un heartbeat a medias que pise las
+            # métricas finales
+            stop.set()
+            await heartbeat
             
     async def _execute(self):
         """Lógica principal asíncrona"""
         # Obtener datos de forma síncrona antes del contexto async
         account_data = await sync_to_async(self._get_account_data)()
         target_users = await sync_to_async(self._get_target_users)()
+        ranges = await sync_to_async(self._get_pending_ranges)()
+        
+        if not ranges:
+            print("🔗 Todo el rango lo cubre otro job, no hace falta scrapear")
+            return
         
-        # Inicializar scraper
+        # Un job refresh no busca: no hay tweets nuevos que escribir ni guardar
+        searching = self.job.job_type == 'search'
+        
+        # Inicializar scraper; los tweets van al NDJSON del job a medida que salen
+        output_writer = TweetOutputWriter.for_job(self.job.id).open() if searching else None
         self.scraper = TweetScraper(
             username=account_data['username'],
-            password=account_data['password']
+            password=account_data['password'],
+            output_writer=output_writer,
+            progress_callback=ProgressReporter(self.job.id)
         )
+        self.scraper.email = account_data['email']
+        # Los tweets se guardan en la base desde otro thread mientras se scrapea
+        db_writer = TweetDBWriter(self.job).start() if searching else None
+        self.scraper.db_writer = db_writer
+        # Las fotos y videos se bajan por HTTP en otros threads, no en el navegador
+        media_downloader = None
+        if self.job.download_media and searching:
+            media_downloader = MediaDownloader().start()
+            self.scraper.media_downloader = media_downloader
+        
+        # El supervisor corre al lado de la búsqueda y la frena si se pasa
+        if searching:
+            work = self._scrape(account_data, target_users, ranges)
+        else:
+            work = self._refresh(account_data)
+        task = asyncio.ensure_future(work)
+        supervisor = JobSupervisor(self.job, self.scraper)
+        watcher = asyncio.ensure_future(supervisor.watch(task))
         
         try:
-            await self.scraper.start_browser(headless=True)
+            await task
+        except asyncio.CancelledError:
+            if not supervisor.stop_reason:
+                raise
+        finally:
+            watcher.cancel()
+            await self.scraper.close_browser()
+            if output_writer:
+                output_writer.close({
+                    'job_id': self.job.id,
+                    'target_users': target_users,
+                    'query_type': self.job.query_type,
+                    'date_range': {
+                        'from': self.job.start_date.strftime('%Y-%m-%d'),
+                        'to': self.job.end_date.strftime('%Y-%m-%d'),
+                    },
+                })
+            if media_downloader:
+                with self.scraper.metrics.phase('media_download'):
+                    await media_downloader.close()
+                for name, value in media_downloader.counters().items():
+                    self.scraper.metrics.incr(name, value)
+                print(f"🖼️ {media_downloader.downloaded} archivos bajados, "
+                      f"{media_downloader.deduplicated} repetidos por contenido, "
+                      f"{media_downloader.skipped} ya bajados antes, "
+                      f"{media_downloader.failed} con error")
+            if db_writer:
+                # Esperar a que se guarde lo que quedaba en la cola
+                with self.scraper.metrics.phase('db_save'):
+                    await db_writer.close()
+                self.scraper.metrics.observe('db_backpressure', db_writer.backpressure_seconds)
+                print(f"💾 {db_writer.saved} tweets guardados en {db_writer.transactions} transacciones "
+                      f"({db_writer.write_seconds:.1f}s de escritura, "
+                      f"{db_writer.backpressure_seconds:.1f}s de espera del scraper)")
+        
+        self.stop_reason = supervisor.stop_reason
+        if self.expander:
+            await sync_to_async(self._mark_conversations)()
+        if searching:
+            await sync_to_async(self._update_tweets_count)()
+    
+    async def _scrape(self, account_data: dict, target_users: list, ranges: list):
+        """Abre el navegador y recorre los rangos pendientes"""
+        await self._open_session(account_data)
+        
+        if self.job.expand_conversations:
+            self.expander = ConversationExpander(self.scraper)
+        
+        for range_start, range_end in ranges:
+            if self.scraper.stop_reason:
+                break
+            since_date = range_start.strftime('%Y-%m-%d')
+            until_date = range_end.strftime('%Y-%m-%d')
+            
+            # Agrupar targets en lotes según densidad histórica
+            batches = await sync_to_async(QueryPlanner().plan)(
+                target_users, self.job.query_type, since_date, until_date
+            )
             
-            # Intentar usar cookies guardadas o hacer login
-            if account_data['cookies']:
-                await self.scraper.create_context(cookies=account_data['cookies'])
-            else:
-                await self.scraper.create_context()
-                await self.scraper.login()
-                
-                # Guardar cookies para próxima vez
-                cookies = await self.scraper.save_cookies()
-                await sync_to_async(self._save_cookies)(cookies)
-                
             # Ejecutar búsqueda
-            tweets_data = await self.scraper.search_tweets(
+            await self.scraper.search_tweets(
                 users=target_users,
                 query_type=self.job.query_type,
-                since_date=self.job.start_date.strftime('%Y-%m-%d'),
-                until_date=self.job.end_date.strftime('%Y-%m-%d')
+                since_date=since_date,
+                until_date=until_date,
+                batches=batches,
+                concurrency=settings.SCRAPING_QUERY_CONCURRENCY
             )
+            if self.expander and not self.scraper.stop_reason:
+                known_ids = await sync_to_async(self._expanded_ids)(self.scraper.tweets_data)
+                await self.expander.expand(self.scraper.tweets_data, known_ids)
+            # Ya están en la base (o en la cola del writer)
+            self.scraper.tweets_data = []
+    
+    async def _refresh(self, account_data: dict):
+        """Job de tipo refresh: métricas nuevas para tweets ya guardados"""
+        tweets = await sync_to_async(self._get_refresh_targets)()
+        if not tweets:
+            print("🔄 No hay tweets guardados para actualizar")
+            return
+        await self._open_session(account_data)
+        results = await MetricsRefresher(self.scraper).refresh(tweets.items())
+        await sync_to_async(self._save_refreshed_metrics)(results)
+    
+    async def _open_session(self, account_data: dict):
+        """Abre el navegador (o toma el compartido) con la sesión de la cuenta"""
+        if self.browser:
+            self.scraper.attach_browser(self.browser, self.memory_probe)
+        else:
+            await self.scraper.start_browser(headless=True)
+        
+        # Usar la sesión guardada si sigue sirviendo; si no, login
+        valid = False
+        if sessions.has_session(account_data['cookies']):
+            await self.scraper.create_context(cookies=account_data['cookies'])
+            # Si refresh_sessions la verificó recién, no hace falta probarla
+            valid = account_data['recently_checked'] or await self.scraper.session_is_valid()
+            if not valid:
+                print("🔄 La sesión guardada no sirve, logueando de nuevo...")
+                await self.scraper.context.close()
+        
+        if not valid:
+            await self.scraper.create_context()
+            await self.scraper.login()
             
-            # Guardar tweets de forma síncrona
-            await sync_to_async(self._save_tweets)(tweets_data)
-            
-        finally:
-            await self.scraper.close_browser()
+            # Guardar cookies para próxima vez
+            cookies = await self.scraper.save_cookies()
+            await sync_to_async(self._save_cookies)(cookies)
             
     def _get_account_data(self):
         """Obtiene datos de la cuenta (sync)"""
+        account = self.job.account
         return {
-            'username': self.job.account.username,
-            'password': self.job.account.password,
-            'cookies': self.job.account.cookies
+            'username': account.username,
+            'password': account.password,
+            'email': account.email,
+            'cookies': account.cookies,
+            'recently_checked': sessions.recently_checked(account),
         }
     
     def _get_target_users(self):
         """Obtiene usuarios objetivo (sync)"""
         return list(self.job.targets.values_list('username', flat=True))
     
+    def _get_pending_ranges(self):
+        """Rangos que este job tiene que scrapear él mismo (sync)"""
+        self.job.refresh_from_db(fields=['coalesced_into'])
+        return JobCoalescer().pending_ranges(self.job)
+    
+    def _expanded_ids(self, tweets):
+        """De estos tweets, los que ya se expandieron en algún job (sync)"""
+        ids = [tweet['tweet_id'] for tweet in tweets]
+        return set(Tweet.objects.filter(tweet_id__in=ids, conversation_id__isnull=False)
+                   .values_list('tweet_id', flat=True))
+    
+    def _mark_conversations(self):
+        """Marca los tweets expandidos y los que resultaron ser hilo (sync)"""
+        for is_thread in (True, False):
+            ids = [tweet_id for tweet_id, thread in self.expander.expanded.items()
+                   if thread == is_thread]
+            Tweet.objects.filter(job=self.job, tweet_id__in=ids, conversation_id__isnull=True) \
+                .update(conversation_id=F('tweet_id'), is_thread=is_thread)
+    
+    def _get_refresh_targets(self):
+        """tweet_id -> url de los tweets guardados que cubre el job refresh (sync)"""
+        tweets = Tweet.objects.filter(date__gte=self.job.start_date, date__lt=self.job.end_date)
+        if self.job.refresh_source_id:
+            tweets = tweets.filter(job_id=self.job.refresh_source_id)
+        usernames = list(self.job.targets.values_list('username', flat=True))
+        if usernames:
+            tweets = tweets.filter(username__in=usernames)
+        # Mismo tweet en varios jobs: se pide una sola vez
+        return dict(tweets.values_list('tweet_id', 'url').iterator(chunk_size=2000))
+    
+    def _save_refreshed_metrics(self, results):
+        """
+        Actualiza todas las filas de esos tweets, en cualquier job (sync).
+        
+        Una métrica en None no se pudo leer: la fila se queda con la que tenía.
+        """
+        now = timezone.now()
+        fields = ['reply_count', 'retweet_count', 'like_count', 'analytics_count',
+                  'metrics_updated_at']
+        ids = list(results)
+        touched_jobs = set()
+        for start in range(0, len(ids), 1000):
+            rows = list(Tweet.objects.filter(tweet_id__in=ids[start:start + 1000]))
+            for row in rows:
+                touched_jobs.add(row.job_id)
+                metrics = results[row.tweet_id]
+                for name, field in (('replies', 'reply_count'), ('retweets', 'retweet_count'),
+                                    ('likes', 'like_count'), ('views', 'analytics_count')):
+                    if metrics.get(name) is not None:
+                        setattr(row, field, metrics[name])
+                row.metrics_updated_at = now
+            Tweet.objects.bulk_update(rows, fields, batch_size=1000)
+        self.job.tweets_count = len(results)
+        self.job.save(update_fields=['tweets_count'])
+        if touched_jobs:
+            # Sus exports tenían las métricas viejas
+            rebuild_artifacts(touched_jobs)
+    
     def _save_cookies(self, cookies):
         """Guarda cookies en la cuenta (sync)"""
-        self.job.account.cookies = cookies
-        self.job.account.last_login = timezone.now()
-        self.job.account.save()
+        sessions.save_session(self.job.account, cookies, logged_in=True)
             
-    def _save_tweets(self, tweets_data: list):
-        """Guarda los tweets en la base de datos (sync)"""
-        tweets_to_create = []
-        
-        for data in tweets_data:
-            # Parsear fecha
-            tweet_date = datetime.fromisoformat(
-                data['datetime'].replace('Z', '+00:00')
-            )
-            
-            tweet = Tweet(
-                job=self.job,
-                tweet_id=data['tweet_id'],
-                username=data['username'],
-                url=data['url'],
-                text=data['text'],
-                date=tweet_date,
-                reply_count=data['metrics']['replies'],
-                retweet_count=data['metrics']['retweets'],
-                like_count=data['metrics']['likes'],
-                analytics_count=data['metrics']['views'],
-                is_rt=data['is_retweet'],
-                is_quote=data['is_quote'],
-                image_url=data['url'] if data['has_image'] else None,
-                video_url=data['url'] if data['has_video'] else None,
-            )
-            tweets_to_create.append(tweet)
+    def _metrics_snapshot(self):
+        """Las métricas que lleva la corrida, si ya arrancó el scraper"""
+        return self.scraper.metrics.as_dict() if self.scraper else None
+    
+    def _save_metrics(self):
+        """Guarda los tiempos y contadores de esta corrida (sync)"""
+        if not self.scraper:
+            return
+        metrics = self.scraper.metrics
+        try:
+            JobMetrics.objects.update_or_create(job=self.job, defaults=metrics.as_dict())
+            print(f"⏱️ Métricas del job {self.job.id}:\n{metrics.summary()}")
+        except Exception as e:
+            print(f"⚠️ No se pudieron guardar las métricas: {e}")
             
-        # Crear todos de una vez
-        Tweet.objects.bulk_create(tweets_to_create, ignore_conflicts=True)
-        
-        # Actualizar contador
-        self.job.tweets_count = len(tweets_to_create)
-        self.job.save()
\ No newline at end of file
+    def _update_tweets_count(self):
+        """Actualiza el contador con lo que quedó guardado (sync)"""
+        self.job.tweets_count = self.job.tweets.count()
+        self.job.save(update_fields=['tweets_count'])
@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+from ..models import XAccount
+from .twitter_scraper import TwitterScraper
+
+
+# Sin estas cookies no hay sesión, y la primera que vence la corta
+SESSION_COOKIES = ('auth_token', 'ct0')
+
+
+def session_expiry(storage_state: dict) -> Optional[datetime]:
+    """Cuándo vence la sesión guardada, según sus cookies"""
+    expirations = [
+        cookie['expires'] for cookie in (storage_state or {}).get('cookies', [])
+        if cookie.get('name') in SESSION_COOKIES and cookie.get('expires', -1) > 0
+    ]
+    if not expirations:
+        return None
+    return datetime.fromtimestamp(min(expirations), tz=dt_timezone.utc)
+
+
+def has_session(storage_state: dict) -> bool:
+    """Si hay cookie de sesión y no venció (sin tocar la red)"""
+    names = {cookie.get('name') for cookie in (storage_state or {}).get('cookies', [])}
+    if 'auth_token' not in names:
+        return False
+    expires = session_expiry(storage_state)
+    return expires is None or expires > timezone.now()
+
+
+def recently_checked(account: XAccount) -> bool:
+    """Si la sesión se verificó hace poco y se puede usar sin volver a probarla"""
+    if not account.session_checked_at:
+        return False
+    trust = timedelta(minutes=settings.SCRAPING_SESSION_TRUST_MINUTES)
+    return timezone.now() - account.session_checked_at < trust
+
+
+def needs_refresh(account: XAccount) -> bool:
+    """Si conviene renovar la sesión antes de que un job la necesite"""
+    if not has_session(account.cookies):
+        return True
+    now = timezone.now()
+    refresh_before = timedelta(hours=settings.SCRAPING_SESSION_REFRESH_HOURS)
+    if account.session_expires_at and account.session_expires_at - now < refresh_before:
+        return True
+    check_every = timedelta(hours=settings.SCRAPING_SESSION_CHECK_HOURS)
+    return not account.session_checked_at or now - account.session_checked_at > check_every
+
+
+def save_session(account: XAccount, storage_state: dict, logged_in: bool = False):
+    """Guarda el estado del navegador como sesión verificada"""
+    account.cookies = storage_state
+    account.session_expires_at = session_expiry(storage_state)
+    account.session_checked_at = timezone.now()
+    fields = ['cookies', 'session_expires_at', 'session_checked_at', 'updated_at']
+    if logged_in:
+        account.last_login = account.session_checked_at
+        fields.append('last_login')
+    account.save(update_fields=fields)
+
+
+async def refresh_session(account: XAccount, headless: bool = True) -> str:
+    """
+    Verifica la sesión de la cuenta y, si no sirve o está por vencer, se loguea.
+
+    Devuelve 'valid' o 'refreshed'. Pensado para correr en segundo plano
+    (refresh_sessions), así los jobs casi nunca pagan el login.
+    """
+    scraper = TwitterScraper(account.username, account.password)
+    scraper.email = account.email
+    try:
+        await scraper.start_browser(headless=headless)
+        if has_session(account.cookies):
+            await scraper.create_context(cookies=account.cookies)
+            expires = account.session_expires_at
+            expiring = expires and expires - timezone.now() < timedelta(
+                hours=settings.SCRAPING_SESSION_REFRESH_HOURS)
+            if not expiring and await scraper.session_is_valid():
+                # Al visitar el home X puede rotar cookies: guardamos las nuevas
+                await sync_to_async(save_session)(account, await scraper.save_cookies())
+                return 'valid'
+            await scraper.context.close()
+
+        await scraper.create_context()
+        await scraper.login()
+        await sync_to_async(save_session)(account, await scraper.save_cookies(), True)
+        return 'refreshed'
+    finally:
+        await scraper.close_browser()
@@ -0,0 +1,177 @@
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+
+# Un solo evaluate por scroll: el HTML de los tweets cargados, concatenado
+SNAPSHOT_SCRIPT = """selector => Array.from(
+    document.querySelectorAll(selector),
+    article => article.outerHTML
+).join('\\n')"""
+
+USERNAME_RE = re.compile(r'@(\w+)')
+
+METRIC_BUTTONS = {
+    'replies': 'reply',
+    'retweets': 'retweet',
+    'likes': 'like',
+}
+
+
+def parse_metric_value(text: str) -> int:
+    """Convierte '1.5K' a 1500, '2M' a 2000000, etc"""
+    if not text:
+        return 0
+
+    text = text.strip()
+    if text.endswith('K'):
+        try:
+            return int(float(text[:-1]) * 1000)
+        except ValueError:
+            return 0
+    elif text.endswith('M'):
+        try:
+            return int(float(text[:-1]) * 1000000)
+        except ValueError:
+            return 0
+    else:
+        try:
+            return int(text.replace(',', '') or 0)
+        except ValueError:
+            return 0
+
+
+def _first(element, xpath):
+    found = element.xpath(xpath)
+    return found[0] if found else None
+
+
+def handle_from_href(href: Optional[str]) -> Optional[str]:
+    """'/usuario' -> 'usuario' (el link del perfil en el aviso de RT)"""
+    handle = (href or '').strip('/').split('/')[0].split('?')[0]
+    return handle or None
+
+
+def full_size_image(src: str) -> str:
+    """Las fotos de pbs.twimg.com vienen achicadas (name=small): pedir la original"""
+    parts = urlsplit(src)
+    params = dict(parse_qsl(parts.query))
+    if 'name' not in params:
+        return src
+    params['name'] = 'orig'
+    return urlunsplit(parts._replace(query=urlencode(params)))
+
+
+def media_from(images: Iterable[str],
+               videos: Iterable[Tuple[Optional[str], Optional[str]]]) -> Dict[str, List[str]]:
+    """
+    URLs descargables de las fotos y videos del tweet, sin repetir.
+
+    `videos` son pares (src, poster): el player de X suele reproducir desde
+    un blob: que no se puede bajar, y en ese caso queda la miniatura.
+    """
+    def usable(url):
+        return bool(url) and url.startswith(('http://', 'https://'))
+
+    found_images = []
+    for src in images:
+        if usable(src):
+            src = full_size_image(src)
+            if src not in found_images:
+                found_images.append(src)
+    found_videos = []
+    for src, poster in videos:
+        url = src if usable(src) else poster
+        if usable(url) and url not in found_videos:
+            found_videos.append(url)
+    return {'images': found_images, 'videos': found_videos}
+
+
+def parse_article(article, base_url: str) -> Optional[Dict]:
+    """Lo mismo que TweetScraper._extract_tweet_data, pero sobre el HTML ya bajado"""
+    link = _first(article, './/a[contains(@href, "/status/")]')
+    if link is None:
+        return None
+    tweet_id = link.get('href').split('/status/')[-1].split('?')[0]
+
+    user_elem = _first(article, './/*[@data-testid="User-Name"]')
+    username_match = USERNAME_RE.search(user_elem.text_content() if user_elem is not None else '')
+    if not username_match:
+        return None
+    username = username_match.group(1)
+
+    time_elem = _first(article, './/time')
+    text_elem = _first(article, './/*[@data-testid="tweetText"]')
+
+    metrics = {'replies': 0, 'retweets': 0, 'likes': 0, 'views': 0}
+    for metric, testid in METRIC_BUTTONS.items():
+        elem = _first(article, f'.//*[@data-testid="{testid}"]')
+        if elem is not None:
+            metrics[metric] = parse_metric_value(elem.text_content())
+    analytics = _first(article, './/a[contains(@href, "/analytics")]')
+    if analytics is not None:
+        metrics['views'] = parse_metric_value(analytics.text_content())
+
+    # :has-text de Playwright no distingue mayúsculas
+    is_retweet = any('retweeted' in span.text_content().lower()
+                     for span in article.iter('span'))
+    social = _first(article, './/a[.//*[@data-testid="socialContext"]]')
+    rt_by = handle_from_href(social.get('href')) if is_retweet and social is not None else None
+
+    images = article.xpath('.//img[contains(@src, "pbs.twimg.com/media")]/@src')
+    videos = [(video.get('src') or _first(video, './source/@src'), video.get('poster'))
+              for video in article.xpath('.//video')]
+
+    return {
+        'tweet_id': tweet_id,
+        'username': username,
+        'text': text_elem.text_content() if text_elem is not None else "",
+        'datetime': time_elem.get('datetime') if time_elem is not None else None,
+        'metrics': metrics,
+        'has_image': bool(images),
+        'has_video': bool(videos),
+        **media_from(images, videos),
+        'is_retweet': is_retweet,
+        'rt_by': rt_by,
+        'is_quote': bool(article.xpath('.//*[@data-testid="quoteTweet"]')),
+        'url': f"{base_url}{username}/status/{tweet_id}",
+    }
+
+
+def parse_snapshot(html: str, base_url: str) -> List[Dict]:
+    """Todos los tweets de un snapshot, en orden (None si falló); corre en los procesos del pool"""
+    if not html or not html.strip():
+        return []
+    root = lxml.html.fragment_fromstring(html, create_parent='div')
+    tweets = []
+    for article in root.xpath('.//article[@data-testid="tweet"]'):
+        try:
+            data = parse_article(article, base_url)
+        except Exception:
+            # None = error de extracción
+            tweets.append(None)
+            continue
+        # Sin link al status o sin usuario no es un tweet: se saltea, como en modo live
+        if data is not None:
+            tweets.append(data)
+    return tweets
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_parser_pool(workers: int) -> ProcessPoolExecutor:
+    """El pool del proceso, compartido por todos los jobs que parsean snapshots"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers)
+        return _pool
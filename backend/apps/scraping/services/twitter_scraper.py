@@ -1,27 +1,139 @@
-import os
 import re
-import json
+import time
 import asyncio
+from collections import deque
+from pathlib import Path
 from datetime import datetime, timedelta
 from urllib.parse import urlencode
 from typing import List, Dict
 
-from playwright.async_api import async_playwright
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 from django.conf import settings
 
+from .process_memory import playwright_driver_pid, process_tree_rss_mb, kill_process_tree
+from .output_writer import TweetOutputWriter
+from .metrics import MetricsCollector
+from .recycling import RecyclePolicy
+from . import snapshot_parser, push_extraction
+
+
+# Los mismos para el navegador de cada job y para el compartido del runner
+BROWSER_ARGS = [
+    '--disable-blink-features=AutomationControlled',
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-gpu'
+]
+
+# Perfil 'tall': sin animaciones ni transiciones, el timeline pinta de una
+NO_ANIMATIONS_SCRIPT = """(() => {
+    const apply = () => {
+        const style = document.createElement('style');
+        style.textContent = '*, *::before, *::after { animation: none !important; ' +
+            'transition: none !important; scroll-behavior: auto !important; }';
+        document.head.appendChild(style);
+    };
+    if (document.head) apply();
+    else document.addEventListener('DOMContentLoaded', apply, {once: true});
+})()"""
+
+# Baja casi una pantalla (se solapa un poco para no saltear tweets a medias)
+SCROLL_STEP_SCRIPT = """(fraction) => {
+    const before = window.scrollY;
+    window.scrollBy(0, Math.floor(window.innerHeight * fraction));
+    return {moved: window.scrollY - before, height: document.body.scrollHeight};
+}"""
+SCROLL_STEP_FRACTION = 0.9
+
+# Qué aparece en el home con y sin sesión
+LOGGED_IN_SELECTOR = '[data-testid="AppTabBar_Home_Link"]'
+LOGGED_OUT_SELECTOR = 'a[href="/login"], [data-testid="loginButton"], input[autocomplete="username"]'
+
+# Los tweets ya podados quedan como cáscara vacía, no hay que volver a leerlos;
+# los data-stale son de la ventana anterior mientras la app cambia de ruta
+TWEET_SELECTOR = 'article[data-testid="tweet"]:not([data-pruned]):not([data-stale])'
+EMPTY_STATE_SELECTOR = '[data-testid="empty_state_header_text"]:not([data-stale])'
+# Lo primero que aparece cuando la búsqueda terminó de cargar
+RESULTS_SELECTOR = f'{TWEET_SELECTOR}, {EMPTY_STATE_SELECTOR}'
+
+# Cambia la ruta sin recargar la app: el router de X escucha popstate y solo
+# pide el timeline nuevo. Lo que hay en pantalla queda marcado como viejo.
+SPA_NAVIGATE_SCRIPT = """(url) => {
+    document.querySelectorAll('article[data-testid="tweet"], [data-testid="empty_state_header_text"]')
+        .forEach(element => element.setAttribute('data-stale', ''));
+    window.scrollTo(0, 0);
+    const target = new URL(url);
+    history.pushState({}, '', target.pathname + target.search);
+    window.dispatchEvent(new PopStateEvent('popstate', {state: {}}));
+}"""
+
+# Vacía los tweets ya extraídos salvo los últimos `keep`. Cada uno conserva su
+# alto, así no cambia el scrollHeight ni la posición del scroll.
+PRUNE_SCRIPT = """([selector, keep]) => {
+    const articles = document.querySelectorAll(selector);
+    let pruned = 0;
+    for (let i = 0; i < articles.length - keep; i++) {
+        const article = articles[i];
+        article.style.height = article.offsetHeight + 'px';
+        article.style.boxSizing = 'border-box';
+        article.replaceChildren();
+        article.setAttribute('data-pruned', '1');
+        pruned++;
+    }
+    return pruned;
+}"""
+
+
+# Las fotos y videos de un tweet en un solo evaluate: [srcs, [src, poster]]
+MEDIA_SCRIPT = """article => [
+    Array.from(article.querySelectorAll('img[src*="pbs.twimg.com/media"]'),
+               img => img.getAttribute('src')),
+    Array.from(article.querySelectorAll('video'), video => {
+        const source = video.querySelector('source[src]');
+        return [video.getAttribute('src') || (source && source.getAttribute('src')),
+                video.getAttribute('poster')];
+    }),
+]"""
 
 class TwitterScraper:
     """Maneja la conexión con Twitter/X usando Playwright"""
     
     base_url = "https://x.com/"
     
-    def __init__(self, username: str, password: str = None):
+    def __init__(self, username: str, password: str = None, base_url: str = None):
         self.username = username
         self.password = password
+        # X a veces lo pide entre el usuario y la contraseña
+        self.email = None
+        # Se puede apuntar a otro host, p.ej. el x.com de mentira de los benchmarks
+        if base_url:
+            self.base_url = base_url.rstrip('/') + '/'
+        # Multiplica las esperas fijas; los benchmarks lo bajan para medir extracción
+        self.wait_scale = 1.0
+        # 'record' graba todo el tráfico del contexto a har_path; 'replay' lo
+        # sirve desde ahí sin tocar la red
+        self.har_path = None
+        self.har_mode = None
+        # 'tall': viewport muy alto, menos escala y sin animaciones, para que
+        # cada scroll muestre muchos más tweets
+        self.viewport_profile = settings.SCRAPING_VIEWPORT_PROFILE
+        self.headless = True
         self.playwright = None
         self.browser = None
+        # False si el navegador es de otro (runner async): al cerrar solo se
+        # cierra nuestro contexto
+        self.owns_browser = True
+        # Con navegador compartido: función que estima los MB de esta sesión
+        self.memory_probe = None
         self.context = None
         self.page = None
+        # Si alguien pide frenar, el scraper corta en el próximo scroll
+        self.stop_reason = None
+        self.pages_scrolled = 0
+        self.tweets_extracted = 0
+        # Tiempos por fase y contadores, se guardan con el job al terminar
+        self.metrics = MetricsCollector()
         
     async def manual_pause(self, message: str = "Pausa"):
         """Para debugging - override en subclases"""
@@ -29,32 +141,116 @@ class TwitterScraper:
         
     async def start_browser(self, headless: bool = True):
         """Inicia Playwright y el navegador"""
-        self.playwright = await async_playwright().start()
-        self.browser = await self.playwright.chromium.launch(
-        headless=headless,
-        args=[
-                '--disable-blink-features=AutomationControlled',
-                '--no-sandbox',
-                '--disable-setuid-sandbox',
-                '--disable-dev-shm-usage',
-                '--disable-gpu'
-            ]
-        )
+        self.headless = headless
+        with self.metrics.phase('browser_launch'):
+            self.playwright = await async_playwright().start()
+            self.browser = await self.playwright.chromium.launch(
+                headless=headless, args=BROWSER_ARGS
+            )
+    
+    def attach_browser(self, browser, memory_probe=None):
+        """Usa un navegador que ya está abierto en vez de lanzar uno"""
+        self.browser = browser
+        self.owns_browser = False
+        self.memory_probe = memory_probe
         
     async def close_browser(self):
-        """Cierra todo limpiamente"""
-        if self.browser:
-            await self.browser.close()
-        if self.playwright:
-            await self.playwright.stop()
+        """Cierra todo limpiamente, y a la fuerza si el navegador no responde"""
+        if not self.owns_browser:
+            await self._close_shared_context()
+            return
+        driver_pid = playwright_driver_pid(self.playwright) if self.playwright else None
+        timeout = settings.SCRAPING_BROWSER_CLOSE_TIMEOUT
+        try:
+            with self.metrics.phase('browser_close'):
+                # El HAR se escribe recién al cerrar el contexto
+                if self.context and self.har_mode == 'record':
+                    await asyncio.wait_for(self.context.close(), timeout=timeout)
+                if self.browser:
+                    await asyncio.wait_for(self.browser.close(), timeout=timeout)
+                if self.playwright:
+                    await asyncio.wait_for(self.playwright.stop(), timeout=timeout)
+        except Exception as e:
+            print(f"⚠️ El navegador no cerró bien ({type(e).__name__}), matando procesos...")
+            kill_process_tree(driver_pid)
+        finally:
+            self.context = None
+            self.browser = None
+            self.playwright = None
+    
+    async def _close_shared_context(self):
+        """Cierra solo nuestro contexto; el navegador sigue para los demás jobs"""
+        try:
+            with self.metrics.phase('browser_close'):
+                if self.context:
+                    await asyncio.wait_for(self.context.close(),
+                                           timeout=settings.SCRAPING_BROWSER_CLOSE_TIMEOUT)
+        except Exception as e:
+            # Si el navegador se colgó, el runner lo relanza
+            print(f"⚠️ El contexto no cerró bien ({type(e).__name__})")
+        finally:
+            self.context = None
+            self.browser = None
+    
+    async def wait(self, milliseconds: int, page=None):
+        """Espera fija, escalada por wait_scale y medida como fase 'wait'"""
+        page = page or self.page
+        with self.metrics.phase('wait'):
+            await page.wait_for_timeout(milliseconds * self.wait_scale)
+    
+    def browser_rss_mb(self) -> float:
+        """Memoria (RSS) del driver y el navegador, en MB"""
+        if not self.owns_browser:
+            # El RSS es de todos los jobs: el runner estima lo que es nuestro
+            return self.memory_probe() if self.memory_probe else 0.0
+        if not self.playwright:
+            return 0.0
+        return process_tree_rss_mb(playwright_driver_pid(self.playwright))
             
     async def create_context(self, cookies: dict = None):
         """Crea contexto del navegador con o sin cookies"""
-        if cookies:
-            self.context = await self.browser.new_context(storage_state=cookies)
-        else:
-            self.context = await self.browser.new_context()
-        self.page = await self.context.new_page()
+        options = {'storage_state': cookies} if cookies else {}
+        if self.viewport_profile == 'tall':
+            options.update(
+                viewport={'width': 1280, 'height': settings.SCRAPING_TALL_VIEWPORT_HEIGHT},
+                device_scale_factor=settings.SCRAPING_TALL_DEVICE_SCALE,
+                reduced_motion='reduce',
+            )
+        if self.har_mode:
+            # Con service workers parte del tráfico no pasa por el ruteo
+            options['service_workers'] = 'block'
+        if self.har_mode == 'record':
+            Path(self.har_path).parent.mkdir(parents=True, exist_ok=True)
+            options.update(
+                record_har_path=str(self.har_path),
+                record_har_mode='full',
+                # Los videos pesan mucho y el scraper no los lee
+                record_har_url_filter=re.compile(r'^(?!https?://video\.twimg\.com/)'),
+            )
+        
+        with self.metrics.phase('context'):
+            self.context = await self.browser.new_context(**options)
+            if self.viewport_profile == 'tall':
+                await self.context.add_init_script(NO_ANIMATIONS_SCRIPT)
+            if self.har_mode == 'replay':
+                await self.context.route_from_har(self.har_path, not_found='abort')
+            self.page = await self.context.new_page()
+    
+    async def recycle(self, scope: str = 'context'):
+        """
+        Guarda la sesión, tira el contexto (o el navegador, si es nuestro y
+        scope es 'browser') y arma uno nuevo con las mismas cookies.
+        """
+        with self.metrics.phase('recycle'):
+            state = await self.save_cookies()
+            if scope == 'browser' and self.owns_browser:
+                await self.close_browser()
+                await self.start_browser(headless=self.headless)
+            else:
+                scope = 'context'
+                await self.context.close()
+            await self.create_context(cookies=state)
+        self.metrics.incr(f'{scope}_recycles')
         
     async def save_cookies(self):
         """Guarda el estado actual (cookies, localStorage, etc)"""
@@ -66,25 +262,42 @@ class TwitterScraper:
         """Login en Twitter/X"""
         if not self.password:
             raise ValueError("Password requerido para login")
+        with self.metrics.phase('login'):
+            return await self._login()
             
+    async def _login(self):
+        """Pasos del login; cada uno espera a que aparezca lo que sigue, no un tiempo fijo"""
+        step_timeout = settings.SCRAPING_LOGIN_STEP_TIMEOUT * 1000
+        
         print("🔐 Navegando a login...")
-        await self.page.goto(f"{self.base_url}i/flow/login")
-        await self.page.wait_for_timeout(2000)  # Reducido de 3000
+        await self.page.goto(f"{self.base_url}i/flow/login", wait_until='domcontentloaded')
+        username_input = self.page.locator('input[autocomplete="username"]')
+        await username_input.wait_for(timeout=step_timeout)
         
         print("📝 Ingresando username...")
-        await self.page.fill('input[autocomplete="username"]', self.username)
+        await username_input.fill(self.username)
         await self.page.keyboard.press('Enter')
-        await self.page.wait_for_timeout(2000)  # Reducido de 3000
+        
+        # Después del usuario viene la contraseña, o un pedido de email/teléfono
+        password_input = self.page.locator('input[type="password"]')
+        challenge_input = self.page.locator('input[data-testid="ocfEnterTextTextInput"]')
+        await password_input.or_(challenge_input).first.wait_for(timeout=step_timeout)
+        if await challenge_input.is_visible():
+            if not self.email:
+                raise Exception("Login falló - X pide el email de la cuenta")
+            print("📧 X pide verificación, ingresando email...")
+            await challenge_input.fill(self.email)
+            await self.page.keyboard.press('Enter')
+            await password_input.wait_for(timeout=step_timeout)
         
         print("🔑 Ingresando password...")
-        await self.page.fill('input[type="password"]', self.password)
+        await password_input.fill(self.password)
         await self.page.keyboard.press('Enter')
         
         print("⏳ Esperando login (resolvé el captcha si aparece)...")
-        await self.page.wait_for_timeout(10000)  # Reducido de 15000
-        
         try:
-            await self.page.wait_for_selector('[data-testid="primaryColumn"]', timeout=20000)  # Reducido de 30000
+            await self.page.wait_for_selector('[data-testid="primaryColumn"]',
+                                              timeout=settings.SCRAPING_LOGIN_TIMEOUT * 1000)
             print("✅ Login exitoso!")
             
             current_url = self.page.url
@@ -93,20 +306,74 @@ class TwitterScraper:
                 
         except Exception as e:
             print(f"❌ Error en login: {str(e)}")
-            raise Exception(f"Login falló - verificá las credenciales")
+            raise Exception("Login falló - verificá las credenciales")
             
         await self.manual_pause("Login completado. Verificá que estés en el home")
             
         return True
+    
+    async def session_is_valid(self) -> bool:
+        """
+        Chequeo barato de la sesión: abre el home y espera lo primero que
+        aparezca, la navegación (logueado) o algo del login (no logueado).
+        """
+        with self.metrics.phase('session_probe'):
+            try:
+                await self.page.goto(f"{self.base_url}home", wait_until='domcontentloaded')
+                await self.page.locator(f"{LOGGED_IN_SELECTOR}, {LOGGED_OUT_SELECTOR}").first.wait_for(
+                    timeout=settings.SCRAPING_LOGIN_STEP_TIMEOUT * 1000
+                )
+            except Exception as e:
+                print(f"⚠️ No se pudo verificar la sesión: {e}")
+                return False
+            if "i/flow/login" in self.page.url:
+                return False
+            return await self.page.query_selector(LOGGED_IN_SELECTOR) is not None
 
 
 class TweetScraper(TwitterScraper):
     """Busca y extrae tweets"""
     
-    def __init__(self, username: str, password: str = None, debug_mode: bool = False):
-        super().__init__(username, password)
+    def __init__(self, username: str, password: str = None, debug_mode: bool = False,
+                 output_writer: TweetOutputWriter = None, progress_callback=None,
+                 base_url: str = None):
+        super().__init__(username, password, base_url)
         self.tweets_data = []
         self.debug_mode = debug_mode
+        # Si no nos pasan uno, cada búsqueda arma su propio archivo
+        self.output_writer = output_writer
+        # TweetDBWriter opcional: los tweets se mandan a la base en cada scroll
+        self.db_writer = None
+        # MediaDownloader opcional: las fotos y videos se bajan aparte
+        self.media_downloader = None
+        # Se llama con un dict en cada ventana y en cada scroll
+        self.progress_callback = progress_callback
+        # 'live' lee cada tweet con element handles; 'snapshot' baja el HTML
+        # una vez por scroll y lo parsea un pool de procesos; 'push' deja que
+        # la página mande cada tweet apenas aparece
+        self.extraction_mode = settings.SCRAPING_EXTRACTION_MODE
+        if self.extraction_mode == 'snapshot' and snapshot_parser.lxml is None:
+            print("⚠️ El modo snapshot necesita lxml, se usa extracción en vivo")
+            self.extraction_mode = 'live'
+        self.snapshot_dir = settings.SCRAPING_SNAPSHOT_DIR or None
+        # En ventanas largas, vaciar los tweets ya leídos para que el DOM no crezca
+        self.dom_pruning = settings.SCRAPING_DOM_PRUNING
+        self.prune_keep = settings.SCRAPING_DOM_PRUNE_KEEP
+        # Una muestra por scroll: heap de JS, nodos del DOM y tiempo de extracción
+        self.sample_page_memory = settings.SCRAPING_SAMPLE_PAGE_MEMORY
+        self.page_memory_samples = []
+        self._cdp_sessions = {}
+        # Por página en modo push: la cola que llena la página y su consumidor
+        self._push_pages = {}
+        # Entre ventanas se cambia la ruta dentro de la app en vez de recargarla
+        self.spa_navigation = settings.SCRAPING_SPA_NAVIGATION
+        # Búsquedas que se van abriendo en otras páginas mientras se scrollea (0 = no)
+        self.prefetch_windows = settings.SCRAPING_PREFETCH_WINDOWS
+        # En búsquedas largas se recrea el contexto y se sigue desde el último tweet
+        self.recycle_policy = RecyclePolicy()
+        # Id del tweet más viejo de la ventana actual: desde ahí se retoma
+        self._window_cursor = None
+        self._sharing_context = False
         
     async def manual_pause(self, message: str = "Pausa para debugging"):
         """Pausa manual para debugging"""
@@ -114,7 +381,7 @@ class TweetScraper(TwitterScraper):
             input(f"\n⏸️  {message}. Presioná Enter para continuar...\n")
         
     def build_search_url(self, users: List[str], query_type: str, 
-                        since_date: str, until_date: str) -> str:
+                        since_date: str, until_date: str, max_id: int = None) -> str:
         """Arma la URL de búsqueda avanzada"""
         clean_users = [u.lstrip('@') for u in users]
         print(f"👥 Usuarios a buscar: {clean_users}")
@@ -131,8 +398,13 @@ class TweetScraper(TwitterScraper):
             query_parts = [f"@{user}" for user in clean_users]
             query = f"({' OR '.join(query_parts)})"
             
+        query = f"{query} until:{until_date} since:{since_date}"
+        if max_id:
+            # Retomar una ventana: solo tweets más viejos que el último leído
+            query += f" max_id:{max_id}"
+            
         params = {
-            "q": f"{query} until:{until_date} since:{since_date}",
+            "q": query,
             "src": "typed_query",
             "f": "live"
         }
@@ -142,62 +414,246 @@ class TweetScraper(TwitterScraper):
         return url
         
     async def search_tweets(self, users: List[str], query_type: str,
-                           since_date: str, until_date: str):
+                           since_date: str, until_date: str,
+                           batches: List[List[str]] = None, concurrency: int = 1):
         """Ejecuta búsqueda y extrae tweets - con ventanas de tiempo para períodos largos"""
         self.tweets_data = []
         
+        own_writer = self.output_writer is None
+        if own_writer:
+            self.output_writer = TweetOutputWriter(
+                self._output_name(users, query_type, since_date, until_date)
+            ).open()
+        
         start = datetime.strptime(since_date, '%Y-%m-%d')
         end = datetime.strptime(until_date, '%Y-%m-%d')
         total_days = (end - start).days
+        batches = batches or [users]
         
-        if total_days > 30:
+        if self.prefetch_windows and (len(batches) == 1 or concurrency <= 1):
+            # Una búsqueda por ventana y lote, la siguiente cargándose al lado
+            windows = [(since_date, until_date)]
+            if total_days > 30:
+                print(f"📅 Período largo detectado ({total_days} días). Dividiendo en ventanas...")
+                windows = self._split_windows(start, end)
+            searches = [(batch, window_since, window_until)
+                        for window_since, window_until in windows for batch in batches]
+            await self._search_pipelined(searches, query_type)
+            print(f"\n✅ Búsqueda total completada. Total tweets: {len(self.tweets_data)}")
+        elif total_days > 30:
             print(f"📅 Período largo detectado ({total_days} días). Dividiendo en ventanas...")
             
-            window_size = 14
+            window_size = settings.SCRAPING_WINDOW_DAYS
             current_start = start
             window_count = 0
             
-            while current_start < end:
+            while current_start < end and not self.stop_reason:
                 window_count += 1
                 current_end = min(current_start + timedelta(days=window_size), end)
                 
                 print(f"\n🔍 Ventana #{window_count}: {current_start.strftime('%Y-%m-%d')} a {current_end.strftime('%Y-%m-%d')}")
                 
-                await self._search_window(
-                    users, query_type, 
+                await self._search_batches(
+                    batches, query_type, 
                     current_start.strftime('%Y-%m-%d'),
-                    current_end.strftime('%Y-%m-%d')
+                    current_end.strftime('%Y-%m-%d'),
+                    concurrency
                 )
                 
                 print(f"✅ Ventana #{window_count} completada: {len(self.tweets_data)} tweets totales")
                 
                 current_start = current_end
                 
-                if current_start < end:
+                if current_start < end and not self.stop_reason:
                     print("⏳ Esperando antes de la siguiente ventana...")
-                    await self.page.wait_for_timeout(1000)  # Reducido de 3000
+                    await self.wait(1000)  # Reducido de 3000
             
             print(f"\n✅ Búsqueda total completada. Total tweets: {len(self.tweets_data)}")
         else:
-            await self._search_window(users, query_type, since_date, until_date)
+            await self._search_batches(batches, query_type,
+                                       since_date, until_date, concurrency)
         
-        if self.tweets_data:
+        if own_writer:
             self._save_to_json(users, query_type, since_date, until_date)
+            self.output_writer = None
         
         return self.tweets_data
     
+    def _split_windows(self, start: datetime, end: datetime) -> List[tuple]:
+        """Ventanas de SCRAPING_WINDOW_DAYS entre start y end, como (since, until)"""
+        windows = []
+        current_start = start
+        while current_start < end:
+            current_end = min(current_start + timedelta(days=settings.SCRAPING_WINDOW_DAYS), end)
+            windows.append((current_start.strftime('%Y-%m-%d'), current_end.strftime('%Y-%m-%d')))
+            current_start = current_end
+        return windows
+    
+    async def _search_pipelined(self, searches: List[tuple], query_type: str):
+        """
+        Corre las búsquedas en orden, con hasta `prefetch_windows` de las
+        siguientes abriéndose en otras páginas mientras se scrollea la actual.
+        
+        Cuando una termina, la página de la siguiente ya tiene resultados y
+        pasa a ser la principal. Si la precarga falló, se abre como siempre.
+        """
+        prefetching = {}
+        try:
+            for i, (users, since_date, until_date) in enumerate(searches):
+                if self.stop_reason:
+                    break
+                for j in range(i + 1, min(i + 1 + self.prefetch_windows, len(searches))):
+                    if j not in prefetching:
+                        url = self.build_search_url(searches[j][0], query_type, *searches[j][1:])
+                        prefetching[j] = asyncio.ensure_future(self._prefetch_search(url))
+                
+                print(f"\n🔍 Búsqueda {i + 1}/{len(searches)}: {since_date} a {until_date}, "
+                      f"{len(users)} usuarios")
+                page = await prefetching.pop(i) if i in prefetching else None
+                if page and not page.is_closed():
+                    self.metrics.incr('windows_prefetched')
+                    previous, self.page = self.page, page
+                    await self._close_page(previous)
+                    await self._search_window(users, query_type, since_date, until_date,
+                                              preloaded=True)
+                else:
+                    await self._search_window(users, query_type, since_date, until_date)
+        finally:
+            for task in prefetching.values():
+                task.cancel()
+            for task in prefetching.values():
+                try:
+                    page = await task
+                except (asyncio.CancelledError, Exception):
+                    continue
+                if page:
+                    await self._close_page(page)
+    
+    async def _prefetch_search(self, url: str):
+        """Abre la búsqueda en una página nueva y espera los primeros resultados"""
+        page = None
+        try:
+            with self.metrics.phase('prefetch'):
+                page = await self.context.new_page()
+                if self.extraction_mode == 'push':
+                    # El observer tiene que estar antes de que cargue el documento
+                    await self._register_push(page)
+                await page.goto(url, wait_until='domcontentloaded')
+                await self._wait_for_results(page, settings.SCRAPING_SEARCH_LOAD_TIMEOUT)
+            return page
+        except Exception as e:
+            print(f"⚠️ No se pudo precargar la búsqueda: {e}")
+            if page:
+                await self._close_page(page)
+            return None
+    
+    async def _close_page(self, page):
+        self._push_pages.pop(page, None)
+        self._cdp_sessions.pop(page, None)
+        try:
+            await page.close()
+        except Exception:
+            # Se cerró con el contexto (reciclado)
+            pass
+    
+    async def _search_batches(self, batches: List[List[str]], query_type: str,
+                              since_date: str, until_date: str, concurrency: int = 1):
+        """Corre cada lote de targets, hasta `concurrency` a la vez en páginas separadas"""
+        if len(batches) == 1 or concurrency <= 1:
+            for i, batch in enumerate(batches, 1):
+                if self.stop_reason:
+                    break
+                if len(batches) > 1:
+                    print(f"📦 Lote {i}/{len(batches)}: {len(batch)} usuarios")
+                await self._search_window(batch, query_type, since_date, until_date)
+            return
+        
+        # Una página por slot; la principal se reusa como primer slot. Con
+        # varias páginas en el contexto no se puede reciclar a mitad de ventana
+        self._sharing_context = True
+        pages = asyncio.Queue()
+        pages.put_nowait(self.page)
+        extra_pages = []
+        for _ in range(min(concurrency, len(batches)) - 1):
+            page = await self.context.new_page()
+            extra_pages.append(page)
+            pages.put_nowait(page)
+        
+        async def run_batch(i, batch):
+            page = await pages.get()
+            try:
+                if self.stop_reason:
+                    return
+                print(f"📦 Lote {i}/{len(batches)}: {len(batch)} usuarios")
+                await self._search_window(batch, query_type, since_date, until_date, page=page)
+            finally:
+                pages.put_nowait(page)
+        
+        try:
+            await asyncio.gather(*(run_batch(i, batch) for i, batch in enumerate(batches, 1)))
+        finally:
+            self._sharing_context = False
+            for page in extra_pages:
+                await page.close()
+    
     async def _search_window(self, users: List[str], query_type: str,
-                            since_date: str, until_date: str):
-        """Búsqueda para una ventana de tiempo específica"""
-        url = self.build_search_url(users, query_type, since_date, until_date)
-        print(f"🔍 Navegando a búsqueda...")
+                            since_date: str, until_date: str, page=None,
+                            preloaded: bool = False):
+        """Búsqueda para una ventana de tiempo específica (`preloaded`: ya está abierta)"""
+        page = page or self.page
+        self._window_cursor = None
+        max_id = None
+        while True:
+            state = await self._start_push(page) if self.extraction_mode == 'push' else None
+            try:
+                recycle = await self._scroll_window(users, query_type, since_date, until_date,
+                                                    page, max_id, preloaded)
+            finally:
+                if state:
+                    await self._stop_push(page, state)
+            if not recycle:
+                return
+            
+            scope, reason = recycle
+            print(f"♻️ Reciclando el {'navegador' if scope == 'browser' else 'contexto'} "
+                  f"({reason}), se retoma desde el tweet {self._window_cursor}")
+            await self.recycle(scope)
+            page = self.page
+            max_id = self._window_cursor - 1
+            preloaded = False
+    
+    async def recycle(self, scope: str = 'context'):
+        await super().recycle(scope)
+        # Las sesiones CDP eran de las páginas viejas
+        self._cdp_sessions.clear()
+        self.recycle_policy.reset(self)
+    
+    def _can_recycle(self, page) -> bool:
+        """Solo con una página en el contexto y sin grabar HAR (se pisaría)"""
+        return page is self.page and not self._sharing_context and self.har_mode != 'record'
+    
+    async def _scroll_window(self, users: List[str], query_type: str,
+                             since_date: str, until_date: str, page, max_id: int = None,
+                             preloaded: bool = False):
+        """
+        Navega a la búsqueda y scrollea hasta que no aparece nada nuevo.
+        
+        Si toca reciclar corta antes y devuelve (scope, motivo); la ventana se
+        retoma con max_id desde el último tweet leído.
+        """
+        url = self.build_search_url(users, query_type, since_date, until_date, max_id)
+        window = {'from': since_date, 'to': until_date}
+        self._report_progress({'type': 'window', 'window': window, 'users': len(users),
+                               'tweets': self.tweets_extracted})
+        self.metrics.incr('windows')
+        print("🔍 Navegando a búsqueda...")
         
-        await self.page.goto(url)
-        await self.page.wait_for_timeout(5000)  # Reducido de 8000
+        if not preloaded:
+            await self._open_search(page, url)
         
         await self.manual_pause("Verificá que la búsqueda se cargó correctamente")
         
-        empty_state = await self.page.query_selector('[data-testid="empty_state_header_text"]')
+        empty_state = await page.query_selector(EMPTY_STATE_SELECTOR)
         if empty_state:
             empty_text = await empty_state.text_content()
             print(f"❌ No se encontraron tweets. Mensaje: {empty_text}")
@@ -205,23 +661,23 @@ class TweetScraper(TwitterScraper):
             
         print("✅ Página cargada, buscando tweets...")
         
-        initial_tweets = await self.page.query_selector_all('article[data-testid="tweet"]')
+        initial_tweets = await page.query_selector_all(TWEET_SELECTOR)
         print(f"📊 Tweets iniciales encontrados: {len(initial_tweets)}")
         
         if len(initial_tweets) == 0:
             print("⚠️ No se encontraron tweets con el selector. Verificando página...")
             
-            articles = await self.page.query_selector_all('article')
+            articles = await page.query_selector_all('article')
             print(f"📄 Artículos encontrados: {len(articles)}")
             
-            test_elements = await self.page.query_selector_all('[data-testid]')
+            test_elements = await page.query_selector_all('[data-testid]')
             print(f"🔍 Elementos con data-testid: {len(test_elements)}")
             
             for i, elem in enumerate(test_elements[:10]):
                 testid = await elem.get_attribute('data-testid')
                 print(f"  - {testid}")
             
-            login_prompt = await self.page.query_selector('[href="/login"]')
+            login_prompt = await page.query_selector('[href="/login"]')
             if login_prompt:
                 print("❌ No estás logueado! Redirigiendo a login...")
                 raise Exception("Sesión no autenticada - se requiere login")
@@ -231,84 +687,307 @@ class TweetScraper(TwitterScraper):
         empty_scrolls = 0
         scroll_count = 0
         consecutive_small_batches = 0
+        # Snapshots que se están parseando, en orden
+        snapshots = deque()
+        recycle = None
         
         while empty_scrolls < max_empty_scrolls:
+            if self.stop_reason:
+                print(f"🛑 Búsqueda frenada: {self.stop_reason}")
+                break
             scroll_count += 1
+            self.pages_scrolled += 1
+            self.metrics.incr('scrolls')
             print(f"📜 Scroll #{scroll_count}")
             
-            new_tweets = await self._extract_visible_tweets()
+            extract_start = time.perf_counter()
+            with self.metrics.phase('extract'):
+                if self.extraction_mode == 'snapshot':
+                    new_tweets = await self._snapshot_visible_tweets(page, snapshots, window)
+                elif self.extraction_mode == 'push':
+                    new_tweets = self._collect_pushed(page)
+                else:
+                    new_tweets = await self._extract_visible_tweets(page)
+            extract_seconds = time.perf_counter() - extract_start
+            if self.db_writer:
+                # Solo espera si la base viene atrasada
+                await self.db_writer.submit()
+            
+            # Todo lo que está en el DOM ya se leyó (o está en un snapshot);
+            # en modo push, solo lo que la página ya mandó
+            if self.dom_pruning:
+                selector = TWEET_SELECTOR + ('[data-pushed]' if self.extraction_mode == 'push' else '')
+                with self.metrics.phase('prune'):
+                    pruned = await page.evaluate(PRUNE_SCRIPT, [selector, self.prune_keep])
+                self.metrics.incr('tweets_pruned', pruned)
+            if self.sample_page_memory:
+                await self._sample_page_memory(page, extract_seconds)
             if new_tweets > 0:
                 print(f"📈 Nuevos tweets extraídos: {new_tweets}. Total: {len(self.tweets_data)}")
                 consecutive_small_batches = 0
             else:
                 consecutive_small_batches += 1
             
-            current_height = await self.page.evaluate("document.body.scrollHeight")
-            if current_height == previous_height:
+            self._report_progress({'type': 'progress', 'window': window, 'scroll': scroll_count,
+                                   'new': new_tweets, 'tweets': self.tweets_extracted,
+                                   'pages': self.pages_scrolled})
+            
+            if self.viewport_profile == 'tall':
+                # De a una pantalla: solo está vacío si ya no baja ni crece
+                step = await page.evaluate(SCROLL_STEP_SCRIPT, SCROLL_STEP_FRACTION)
+                current_height = step['height']
+                stalled = not step['moved'] and current_height == previous_height
+            else:
+                current_height = await page.evaluate("document.body.scrollHeight")
+                stalled = current_height == previous_height
+            if stalled:
                 empty_scrolls += 1
                 print(f"⚠️ Sin nuevo contenido, intento {empty_scrolls}/{max_empty_scrolls}")
             else:
                 empty_scrolls = 0
                 
             previous_height = current_height
-            await self.page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+            if self.viewport_profile != 'tall':
+                await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
             
             # Timeout dinámico: más rápido si encontramos tweets, más lento si no
             if new_tweets > 5:
-                await self.page.wait_for_timeout(1500)  # Rápido si hay muchos tweets
+                await self.wait(1500, page)  # Rápido si hay muchos tweets
             elif new_tweets > 0 or consecutive_small_batches < 2:
-                await self.page.wait_for_timeout(2000)  # Normal
+                await self.wait(2000, page)  # Normal
             else:
-                await self.page.wait_for_timeout(3000)  # Más lento si no encuentra nada
+                await self.wait(3000, page)  # Más lento si no encuentra nada
+            
+            if self._can_recycle(page) and self._window_cursor:
+                recycle = self.recycle_policy.due(self)
+                if recycle:
+                    break
+        
+        if snapshots:
+            with self.metrics.phase('extract'):
+                new_tweets = await self._collect_snapshots(snapshots)
+            print(f"📈 Tweets de los últimos snapshots: {new_tweets}. Total: {len(self.tweets_data)}")
+        return recycle
+        
+    async def _open_search(self, page, url: str):
+        """
+        Abre la búsqueda y espera a que aparezcan resultados (o el aviso de
+        que no hay), en vez de una espera fija.
+        
+        Si la app ya está cargada en la página, cambia la ruta del lado del
+        cliente y solo se baja el timeline; si eso no anda, goto de siempre.
+        """
+        # Solo desde otra búsqueda: ahí sabemos que el timeline está montado
+        if self.spa_navigation and page.url.startswith(f"{self.base_url}search"):
+            with self.metrics.phase('spa_navigate'):
+                await page.evaluate(SPA_NAVIGATE_SCRIPT, url)
+                loaded = await self._wait_for_results(page, settings.SCRAPING_SPA_TIMEOUT)
+            if loaded:
+                self.metrics.incr('spa_navigations')
+                return
+            print("⚠️ La búsqueda no cargó dentro de la app, recargando la página...")
+            self.metrics.incr('spa_fallbacks')
+        
+        with self.metrics.phase('goto'):
+            await page.goto(url, wait_until='domcontentloaded')
+            await self._wait_for_results(page, settings.SCRAPING_SEARCH_LOAD_TIMEOUT)
+    
+    async def _wait_for_results(self, page, timeout: float) -> bool:
+        try:
+            await page.locator(RESULTS_SELECTOR).first.wait_for(timeout=timeout * 1000)
+            return True
+        except PlaywrightTimeoutError:
+            return False
+    
+    async def _sample_page_memory(self, page, extract_seconds: float):
+        """Guarda heap de JS y nodos del renderer (CDP Performance.getMetrics)"""
+        try:
+            session = self._cdp_sessions.get(page)
+            if session is None:
+                session = await self.context.new_cdp_session(page)
+                await session.send('Performance.enable')
+                self._cdp_sessions[page] = session
+            response = await session.send('Performance.getMetrics')
+        except Exception as e:
+            print(f"⚠️ No se pudo medir la memoria de la página: {e}")
+            self.sample_page_memory = False
+            return
+        
+        values = {metric['name']: metric['value'] for metric in response['metrics']}
+        self.page_memory_samples.append({
+            'scroll': self.pages_scrolled,
+            'tweets': self.tweets_extracted,
+            'js_heap_mb': round(values.get('JSHeapUsedSize', 0) / 1024 / 1024, 2),
+            'nodes': int(values.get('Nodes', 0)),
+            'extract_ms': round(extract_seconds * 1000, 1),
+        })
+        
+    def _report_progress(self, event: dict):
+        """Avisa el progreso, sin que un error del callback corte la búsqueda"""
+        if not self.progress_callback:
+            return
+        try:
+            self.progress_callback(event)
+        except Exception as e:
+            print(f"⚠️ Error reportando progreso: {e}")
+        
+    def _output_name(self, users: List[str], query_type: str,
+                     since_date: str, until_date: str) -> str:
+        """Nombre fijo del archivo para una búsqueda sin job"""
+        users_str = "_".join(u.lstrip('@') for u in users[:3])
+        return f"tweets_{users_str}_{query_type}_{since_date}_{until_date}"
         
     def _save_to_json(self, users: List[str], query_type: str, 
                      since_date: str, until_date: str):
-        """Guarda los tweets en un archivo JSON"""
-        output_dir = os.path.join(settings.BASE_DIR, 'output')
-        os.makedirs(output_dir, exist_ok=True)
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        users_str = "_".join(users[:3])
-        filename = f"tweets_{users_str}_{query_type}_{timestamp}.json"
-        filepath = os.path.join(output_dir, filename)
-        
-        output = {
-            "metadata": {
-                "scraping_date": datetime.now().isoformat(),
-                "target_users": users,
-                "query_type": query_type,
-                "date_range": {
-                    "from": since_date,
-                    "to": until_date
-                },
-                "total_tweets": len(self.tweets_data)
+        """Cierra el NDJSON de la búsqueda y escribe su metadata"""
+        self.output_writer.close({
+            "target_users": users,
+            "query_type": query_type,
+            "date_range": {
+                "from": since_date,
+                "to": until_date
             },
-            "tweets": self.tweets_data
-        }
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
+        })
         
-        print(f"💾 JSON guardado en: {filepath}")
-        print(f"📊 Total tweets guardados: {len(self.tweets_data)}")
-        
-    async def _extract_visible_tweets(self):
+    async def _extract_visible_tweets(self, page=None):
         """Extrae datos de los tweets visibles en pantalla"""
-        tweets = await self.page.query_selector_all('article[data-testid="tweet"]')
+        page = page or self.page
+        tweets = await page.query_selector_all(TWEET_SELECTOR)
         new_tweets = 0
         
         for tweet in tweets:
             try:
                 data = await self._extract_tweet_data(tweet)
-                if data and not self._is_duplicate(data['tweet_id']):
-                    self.tweets_data.append(data)
+                if data and self._add_tweet(data):
                     new_tweets += 1
-                    print(f"  ✓ Tweet extraído: @{data['username']} - {data['tweet_id']}")
             except Exception as e:
+                self.metrics.incr('extraction_errors')
                 print(f"  ⚠️ Error extrayendo tweet: {str(e)}")
                 continue
+        
+        if new_tweets and self.output_writer:
+            self.output_writer.flush()
                 
         return new_tweets
+    
+    def _add_tweet(self, data: Dict) -> bool:
+        """Guarda el tweet si es nuevo; devuelve si se agregó"""
+        if self._is_duplicate(data['tweet_id']):
+            self.metrics.incr('duplicates_skipped')
+            return False
+        self.tweets_data.append(data)
+        self.tweets_extracted += 1
+        # Los retweets traen el id del original, que puede ser mucho más viejo
+        if not data['is_retweet'] and data['tweet_id'].isdigit():
+            tweet_id = int(data['tweet_id'])
+            if self._window_cursor is None or tweet_id < self._window_cursor:
+                self._window_cursor = tweet_id
+        self.metrics.incr('tweets_extracted')
+        if self.output_writer:
+            self.output_writer.write(data)
+        if self.db_writer:
+            self.db_writer.add(data)
+        if self.media_downloader:
+            self.media_downloader.add(data.get('images', []) + data.get('videos', []))
+        print(f"  ✓ Tweet extraído: @{data['username']} - {data['tweet_id']}")
+        return True
+    
+    async def _snapshot_visible_tweets(self, page, snapshots: deque, window: dict) -> int:
+        """
+        Baja el HTML de los tweets cargados y lo manda a parsear a otro proceso.
+        
+        No espera el resultado: devuelve los tweets de los snapshots que ya
+        terminaron, así el navegador sigue scrolleando mientras se parsea.
+        """
+        html = await page.evaluate(snapshot_parser.SNAPSHOT_SCRIPT, TWEET_SELECTOR)
+        if self.snapshot_dir:
+            self._save_snapshot(html, window)
+        
+        workers = settings.SCRAPING_PARSER_WORKERS
+        pool = snapshot_parser.get_parser_pool(workers)
+        loop = asyncio.get_running_loop()
+        snapshots.append(loop.run_in_executor(pool, snapshot_parser.parse_snapshot,
+                                              html, self.base_url))
+        # Si el parseo no da abasto esperamos al más viejo, en vez de juntar HTML en memoria
+        return await self._collect_snapshots(snapshots, keep=workers * 2)
+    
+    async def _collect_snapshots(self, snapshots: deque, keep: int = 0) -> int:
+        """Agrega los tweets de los snapshots listos (y espera hasta dejar `keep` pendientes)"""
+        new_tweets = 0
+        while snapshots and (snapshots[0].done() or len(snapshots) > keep):
+            with self.metrics.phase('snapshot_wait'):
+                records = await snapshots.popleft()
+            for data in records:
+                if data is None:
+                    self.metrics.incr('extraction_errors')
+                elif self._add_tweet(data):
+                    new_tweets += 1
+        
+        if new_tweets and self.output_writer:
+            self.output_writer.flush()
+        return new_tweets
+    
+    async def _start_push(self, page) -> dict:
+        """Conecta la página con Python y arranca el consumidor de su cola"""
+        state = await self._register_push(page)
+        state['new'] = 0
+        state['consumer'] = asyncio.ensure_future(self._consume_pushed(state))
+        return state
+    
+    async def _register_push(self, page) -> dict:
+        """Expone la función y el observer en la página (una sola vez por página)"""
+        state = self._push_pages.get(page)
+        if state is None:
+            # La página llama a la función con cada tanda de tweets nuevos
+            queue = asyncio.Queue()
+            await page.expose_function(push_extraction.BINDING_NAME, queue.put_nowait)
+            await page.add_init_script(push_extraction.OBSERVER_SCRIPT)
+            state = {'queue': queue}
+            self._push_pages[page] = state
+        return state
+    
+    async def _consume_pushed(self, state: dict):
+        """Agrega los tweets a medida que llegan, mientras el scroll sigue"""
+        queue = state['queue']
+        while True:
+            batch = await queue.get()
+            if batch is None:
+                break
+            added = 0
+            for record in batch:
+                try:
+                    data = push_extraction.normalize_pushed(record, self.base_url)
+                except Exception as e:
+                    print(f"  ⚠️ Error extrayendo tweet: {str(e)}")
+                    self.metrics.incr('extraction_errors')
+                    continue
+                if data and self._add_tweet(data):
+                    added += 1
+            state['new'] += added
+            if added and self.output_writer:
+                self.output_writer.flush()
+    
+    def _collect_pushed(self, page) -> int:
+        """Tweets que llegaron desde el scroll anterior"""
+        state = self._push_pages[page]
+        new_tweets, state['new'] = state['new'], 0
+        return new_tweets
+    
+    async def _stop_push(self, page, state: dict):
+        """Último barrido de la página y espera a que se procese la cola"""
+        try:
+            await page.evaluate(push_extraction.FLUSH_SCRIPT)
+        except Exception as e:
+            print(f"⚠️ No se pudo hacer el último barrido: {e}")
+        state['queue'].put_nowait(None)
+        await state['consumer']
+    
+    def _save_snapshot(self, html: str, window: dict):
+        """Guarda el snapshot tal cual; después sirve de fixture para parse_snapshots"""
+        directory = Path(self.snapshot_dir)
+        directory.mkdir(parents=True, exist_ok=True)
+        name = f"{window['from']}_{window['to']}_{self.pages_scrolled:05d}.html"
+        (directory / name).write_text(html, encoding='utf-8')
                 
     async def _extract_tweet_data(self, tweet_element) -> Dict:
         """Extrae información de un tweet"""
@@ -338,10 +1017,14 @@ class TweetScraper(TwitterScraper):
             
             metrics = await self._extract_metrics(tweet_element)
             
-            has_image = await tweet_element.query_selector('img[src*="pbs.twimg.com/media"]') is not None
-            has_video = await tweet_element.query_selector('video') is not None
+            images, videos = await tweet_element.evaluate(MEDIA_SCRIPT)
             
             is_retweet = await tweet_element.query_selector('span:has-text("Retweeted")') is not None
+            rt_by = None
+            if is_retweet:
+                social = await tweet_element.query_selector('a:has([data-testid="socialContext"])')
+                if social:
+                    rt_by = snapshot_parser.handle_from_href(await social.get_attribute('href'))
             is_quote = await tweet_element.query_selector('[data-testid="quoteTweet"]') is not None
             
             return {
@@ -350,13 +1033,16 @@ class TweetScraper(TwitterScraper):
                 'text': text,
                 'datetime': datetime_str,
                 'metrics': metrics,
-                'has_image': has_image,
-                'has_video': has_video,
+                'has_image': bool(images),
+                'has_video': bool(videos),
+                **snapshot_parser.media_from(images, videos),
                 'is_retweet': is_retweet,
+                'rt_by': rt_by,
                 'is_quote': is_quote,
                 'url': f"{self.base_url}{username}/status/{tweet_id}"
             }
         except Exception as e:
+            self.metrics.incr('extraction_errors')
             print(f"    - Error procesando tweet: {str(e)}")
             return None
         
@@ -390,25 +1076,7 @@ class TweetScraper(TwitterScraper):
         
     def _parse_metric_value(self, text: str) -> int:
         """Convierte '1.5K' a 1500, '2M' a 2000000, etc"""
-        if not text:
-            return 0
-            
-        text = text.strip()
-        if text.endswith('K'):
-            try:
-                return int(float(text[:-1]) * 1000)
-            except:
-                return 0
-        elif text.endswith('M'):
-            try:
-                return int(float(text[:-1]) * 1000000)
-            except:
-                return 0
-        else:
-            try:
-                return int(text.replace(',', '') or 0)
-            except:
-                return 0
+        return snapshot_parser.parse_metric_value(text)
             
     def _is_duplicate(self, tweet_id: str) -> bool:
         """Verifica si ya tenemos este tweet"""
@@ -10,6 +10,7 @@ router.register(r'jobs', views.ScrapingJobViewSet, basename='scrapingjob')
 app_name = 'scraping'
 
 urlpatterns = [
+    path('api/jobs/<int:pk>/progress/', views.job_progress_stream, name='job_progress'),
     path('api/', include(router.urls)),
     path('test/', views.test_scraping, name='test_scraping'),
 ]
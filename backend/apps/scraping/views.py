@@ -2,22 +2,32 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
-from django.shortcuts import render, redirect
+from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
-from django.http import HttpResponse, FileResponse
+from django.http import HttpResponse, FileResponse, StreamingHttpResponse
 from django.conf import settings
 import json
-import os
+import tempfile
+import time
 from pathlib import Path
 from django.utils import timezone
+from django.db.models import Count
 
-from .models import XAccount, SearchTarget, ScrapingJob, Tweet
+from .models import XAccount, SearchTarget, ScrapingJob, JobMetrics
 from .serializers import (
     XAccountSerializer, SearchTargetSerializer, 
     ScrapingJobSerializer, TweetSerializer
 )
 from .services.scraping_service import ScrapingService
+from .services.job_coalescer import JobCoalescer
+from .services.job_scheduler import JobScheduler
+from .services.output_writer import TweetOutputWriter
+from .services import exporters
+from .services.artifacts import artifact_path
+from .http import serve_file
+from .services.progress import get_broker
+from .services.metrics import render_prometheus
 
 
 class XAccountViewSet(viewsets.ReadOnlyModelViewSet):
@@ -89,30 +99,60 @@ class ScrapingJobViewSet(viewsets.ModelViewSet):
                 {'error': 'Job already started'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-    # Ejecutar en thread separado
-        import threading
-        def run_scraping():
-            try:
-                job.status = 'running'
-                job.started_at = timezone.now()
-                job.save()
-                
-                service = ScrapingService(job)
-                service.run()
-            except Exception as e:
-                job.status = 'failed'
-                job.error_message = str(e)
-                job.completed_at = timezone.now()
-                job.save()
-    
-        thread = threading.Thread(target=run_scraping)
-        thread.daemon = True
-        thread.start()
+        if job.queued_at:
+            return Response(
+                {'error': 'Job already queued'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        # Si otro job ya busca lo mismo, reusamos sus resultados
+        JobCoalescer().submit(job)
     
     # Responder inmediatamente
         serializer = self.get_serializer(job)
         return Response(serializer.data) 
    
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        """Cancela un job; si está corriendo frena y guarda lo que tenga"""
+        job = self.get_object()
+        
+        if job.status in ScrapingJob.FINAL_STATUSES:
+            return Response(
+                {'error': 'Job already finished'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if job.status == 'running':
+            # El supervisor lo levanta en el próximo chequeo
+            job.cancel_requested = True
+            job.save(update_fields=['cancel_requested'])
+        else:
+            job.status = 'cancelled'
+            job.error_message = "Cancelado por el usuario"
+            job.completed_at = timezone.now()
+            # Guarda, avisa y vuelve a encolar a los suscriptos que lo esperaban
+            JobCoalescer().finish(job)
+        
+        serializer = self.get_serializer(job)
+        return Response(serializer.data)
+    
+    @action(detail=False, methods=['get'])
+    def queue(self, request):
+        """Estado de la cola y tiempos de espera por prioridad"""
+        try:
+            hours = int(request.query_params.get('hours', 24))
+        except ValueError:
+            hours = 0
+        if hours < 1:
+            return Response({'error': 'hours tiene que ser un entero positivo'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        scheduler = JobScheduler()
+        return Response({
+            'max_slots': scheduler.max_slots,
+            'running': ScrapingJob.objects.filter(status='running').count(),
+            'priorities': scheduler.queue_stats(hours=hours),
+        })
+    
     @action(detail=True, methods=['get'])
     def tweets(self, request, pk=None):
         job = self.get_object()
@@ -136,47 +176,70 @@ class ScrapingJobViewSet(viewsets.ModelViewSet):
     
     @action(detail=True, methods=['get'])
     def download(self, request, pk=None):
-        import csv
-        from django.http import HttpResponse
-        
         job = self.get_object()
+        export_format = request.query_params.get('export_format', job.export_format)
         
-        if job.export_format == 'csv':
-            # Generar CSV
-            response = HttpResponse(content_type='text/csv')
-            response['Content-Disposition'] = f'attachment; filename="tweets_job_{job.id}_{job.created_at.strftime("%Y%m%d")}.csv"'
-            
-            writer = csv.writer(response)
-            
-            # Headers del CSV
-            writer.writerow([
-                'tweet_id', 'username', 'date', 'text', 
-                'likes', 'retweets', 'replies', 'views',
-                'url', 'is_retweet', 'is_quote'
-            ])
-            
-            # Obtener tweets de la DB
-            tweets = job.tweets.all().order_by('-date')
-            
-            for tweet in tweets:
-                writer.writerow([
-                    tweet.tweet_id,
-                    tweet.username,
-                    tweet.date.isoformat(),
-                    tweet.text,
-                    tweet.like_count,
-                    tweet.retweet_count,
-                    tweet.reply_count,
-                    tweet.analytics_count,
-                    tweet.url,
-                    'Yes' if tweet.is_rt else 'No',
-                    'Yes' if tweet.is_quote else 'No'
-                ])
-            
+        # Si ya está generado, se sirve el archivo tal cual
+        artifact = job.artifacts.filter(export_format=export_format).first()
+        if artifact and artifact_path(artifact).exists():
+            return serve_file(
+                request, artifact_path(artifact),
+                filename=exporters.export_filename(job, export_format),
+                content_type=exporters.CONTENT_TYPES[export_format],
+                etag=f'"{artifact.sha256}"'
+            )
+        
+        if export_format == 'csv':
+            # CSV en streaming, leyendo la DB por lotes
+            response = StreamingHttpResponse(exporters.iter_csv(job), content_type='text/csv')
+            response['Content-Disposition'] = f'attachment; filename="{exporters.export_filename(job, "csv")}"'
             return response
         
+        elif export_format in ('parquet', 'arrow'):
+            # Se arma en un archivo temporal, por row groups
+            tmp = tempfile.TemporaryFile()
+            try:
+                exporters.WRITERS[export_format](job, tmp)
+            except ValueError as e:
+                tmp.close()
+                return Response({'error': str(e)}, status=status.HTTP_501_NOT_IMPLEMENTED)
+            tmp.seek(0)
+            return FileResponse(
+                tmp,
+                as_attachment=True,
+                filename=exporters.export_filename(job, export_format),
+                content_type=exporters.CONTENT_TYPES[export_format]
+            )
+        
         else:
-            # JSON original
+            # NDJSON que el scraper fue escribiendo para este job
+            job_file = TweetOutputWriter.find_for_job(job.id)
+            # Los tweets copiados de otro job no están en su archivo, un job
+            # refresh pudo cambiar sus métricas (o no hay archivo): se arma
+            # desde la base
+            if (job.coalesced_into_id
+                    or job.tweets.filter(metrics_updated_at__isnull=False).exists()
+                    or (not job_file and job.tweets.exists())):
+                response = StreamingHttpResponse(exporters.iter_ndjson(job),
+                                                 content_type='application/x-ndjson')
+                response['Content-Disposition'] = (
+                    f'attachment; filename="tweets_job_{job.id}_{job.created_at.strftime("%Y%m%d")}.ndjson"'
+                )
+                return response
+            if job_file:
+                suffix = job_file.name[len(f"job_{job.id}"):]
+                stat = job_file.stat()
+                # Mientras el job corre el archivo sigue creciendo: sin ETag
+                finished = job.status in ScrapingJob.FINAL_STATUSES
+                return serve_file(
+                    request, job_file,
+                    filename=f'tweets_job_{job.id}_{job.created_at.strftime("%Y%m%d")}{suffix}',
+                    content_type='application/x-ndjson',
+                    etag=f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"' if finished else None
+                )
+            
+            # JSON original, de antes de que hubiera un archivo por job (y sin
+            # tweets en la base)
             output_dir = Path(settings.BASE_DIR) / 'output'
             
             if not output_dir.exists():
@@ -209,6 +272,51 @@ class ScrapingJobViewSet(viewsets.ModelViewSet):
             )
             return response
 
+def job_progress_stream(request, pk):
+    """Progreso del job como Server-Sent Events, hasta que termina"""
+    job = get_object_or_404(ScrapingJob, pk=pk)
+    
+    def sse(event):
+        return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    
+    def stream():
+        # Cada stream ocupa un thread del servidor: se corta cada tanto y el
+        # EventSource se reconecta solo, arrancando con el estado de la base
+        deadline = time.monotonic() + settings.SCRAPING_PROGRESS_MAX_STREAM_SECONDS
+        yield "retry: 2000\n\n"
+        # Primero el estado actual, por si el job ya terminó
+        yield sse({'type': 'status', 'job_id': job.id, 'status': job.status,
+                   'tweets': job.tweets_count, 'error': job.error_message})
+        if job.status in ScrapingJob.FINAL_STATUSES:
+            return
+        
+        events = get_broker().subscribe(job.id, timeout=settings.SCRAPING_PROGRESS_HEARTBEAT)
+        try:
+            for event in events:
+                if time.monotonic() > deadline:
+                    return
+                if event is None:
+                    # Por si el evento final se perdió antes de suscribirnos
+                    job.refresh_from_db(fields=['status', 'tweets_count', 'error_message'])
+                    if job.status in ScrapingJob.FINAL_STATUSES:
+                        yield sse({'type': 'status', 'job_id': job.id, 'status': job.status,
+                                   'tweets': job.tweets_count, 'error': job.error_message})
+                        return
+                    # Comentario SSE para que proxies no corten la conexión
+                    yield ": keepalive\n\n"
+                    continue
+                yield sse(event)
+                if event['type'] == 'status' and event['status'] in ScrapingJob.FINAL_STATUSES:
+                    return
+        finally:
+            events.close()
+    
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 @login_required
 def test_scraping(request):
     if request.method == 'POST':
@@ -237,4 +345,13 @@ def test_scraping(request):
         
         return redirect('admin:scraping_scrapingjob_change', job.id)
         
-    return render(request, 'scraping/test.html')
\ No newline at end of file
+    return render(request, 'scraping/test.html')
+
+
+def prometheus_metrics(request):
+    """Métricas de todos los jobs en formato de texto de Prometheus"""
+    job_counts = (ScrapingJob.objects.values_list('status')
+                  .annotate(count=Count('id')).order_by('status'))
+    job_metrics = JobMetrics.objects.values_list('phases', 'counters').iterator()
+    return HttpResponse(render_prometheus(job_counts, job_metrics),
+                        content_type='text/plain; version=0.0.4; charset=utf-8')
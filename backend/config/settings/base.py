@@ -185,4 +185,92 @@ X_PASSWORD = env('X_PASSWORD', default='')
 X_EMAIL = env('X_EMAIL', default='')
 
 # Scraping Settings
-SCRAPING_DATA_DIR = BASE_DIR.parent / 'app' / 'data'  # Use existing data directory
\ No newline at end of file
+SCRAPING_DATA_DIR = BASE_DIR.parent / 'app' / 'data'  # Use existing data directory
+# Ventanas de búsqueda y armado de queries
+SCRAPING_WINDOW_DAYS = env.int('SCRAPING_WINDOW_DAYS', default=14)
+SCRAPING_QUERY_MAX_LENGTH = env.int('SCRAPING_QUERY_MAX_LENGTH', default=450)  # Sin contar since/until
+SCRAPING_QUERY_MAX_TARGETS = env.int('SCRAPING_QUERY_MAX_TARGETS', default=20)
+SCRAPING_QUERY_MAX_TWEETS = env.int('SCRAPING_QUERY_MAX_TWEETS', default=800)  # Esperados por query y ventana
+SCRAPING_QUERY_DEFAULT_DENSITY = env.float('SCRAPING_QUERY_DEFAULT_DENSITY', default=5.0)  # Tweets/día sin historial
+SCRAPING_QUERY_CONCURRENCY = env.int('SCRAPING_QUERY_CONCURRENCY', default=1)  # Lotes en paralelo
+
+# Cola de jobs
+SCRAPING_MAX_CONCURRENT_JOBS = env.int('SCRAPING_MAX_CONCURRENT_JOBS', default=2)  # Navegadores a la vez
+SCRAPING_USER_QUOTA = env.int('SCRAPING_USER_QUOTA', default=1)  # Jobs a la vez por usuario si hay otros esperando
+SCRAPING_AGING_MINUTES = env.int('SCRAPING_AGING_MINUTES', default=30)  # Minutos en cola por cada nivel de prioridad ganado
+SCRAPING_ACCOUNT_QUOTA = env.int('SCRAPING_ACCOUNT_QUOTA', default=0)  # Jobs a la vez por cuenta X (0 = sin límite)
+SCRAPING_RUNNER = env('SCRAPING_RUNNER', default='thread')  # thread (un navegador por job) o async (run_scraping_worker)
+SCRAPING_RUNNER_MAX_JOBS = env.int('SCRAPING_RUNNER_MAX_JOBS', default=8)  # Jobs a la vez en el runner async, un contexto cada uno
+SCRAPING_RUNNER_POLL_SECONDS = env.float('SCRAPING_RUNNER_POLL_SECONDS', default=2.0)  # Cada cuánto busca jobs en la cola
+SCRAPING_HEARTBEAT_SECONDS = env.int('SCRAPING_HEARTBEAT_SECONDS', default=30)  # Cada cuánto un job running avisa que sigue vivo
+SCRAPING_ORPHAN_SECONDS = env.int('SCRAPING_ORPHAN_SECONDS', default=300)  # Sin heartbeat por este tiempo, el job se da por caído
+
+# Límites por job (se pueden pisar en cada ScrapingJob)
+SCRAPING_MAX_DURATION_MINUTES = env.int('SCRAPING_MAX_DURATION_MINUTES', default=240)
+SCRAPING_MAX_TWEETS = env.int('SCRAPING_MAX_TWEETS', default=50000)
+SCRAPING_MAX_PAGES = env.int('SCRAPING_MAX_PAGES', default=5000)  # Scrolls del timeline
+SCRAPING_MAX_BROWSER_MEMORY_MB = env.int('SCRAPING_MAX_BROWSER_MEMORY_MB', default=2048)  # Con el runner async cuenta la parte estimada de cada sesión
+SCRAPING_SUPERVISOR_INTERVAL = env.int('SCRAPING_SUPERVISOR_INTERVAL', default=5)  # Segundos entre chequeos
+SCRAPING_STOP_GRACE_SECONDS = env.int('SCRAPING_STOP_GRACE_SECONDS', default=30)  # Antes de cortar a la fuerza
+SCRAPING_BROWSER_CLOSE_TIMEOUT = env.int('SCRAPING_BROWSER_CLOSE_TIMEOUT', default=15)
+
+# Reciclado del navegador a mitad de job (0 = no se usa ese límite)
+SCRAPING_RECYCLE_SCROLLS = env.int('SCRAPING_RECYCLE_SCROLLS', default=1500)  # Scrolls por contexto
+SCRAPING_RECYCLE_TWEETS = env.int('SCRAPING_RECYCLE_TWEETS', default=30000)  # Tweets por contexto
+SCRAPING_RECYCLE_MEMORY_MB = env.int('SCRAPING_RECYCLE_MEMORY_MB', default=1200)  # RSS para relanzar el navegador (menos que SCRAPING_MAX_BROWSER_MEMORY_MB)
+
+# Archivos de salida (BASE_DIR/output)
+SCRAPING_OUTPUT_COMPRESSION = env('SCRAPING_OUTPUT_COMPRESSION', default='gzip')  # none, gzip o zstd
+SCRAPING_OUTPUT_COMPACT_DAYS = env.int('SCRAPING_OUTPUT_COMPACT_DAYS', default=7)  # Comprimir los que quedaron sin comprimir
+SCRAPING_OUTPUT_RETENTION_DAYS = env.int('SCRAPING_OUTPUT_RETENTION_DAYS', default=90)  # Borrar
+
+# Exports
+SCRAPING_EXPORT_BATCH_SIZE = env.int('SCRAPING_EXPORT_BATCH_SIZE', default=50000)  # Filas por row group
+SCRAPING_EXPORT_ARTIFACT_FORMATS = env.list('SCRAPING_EXPORT_ARTIFACT_FORMATS', default=['csv'])  # Se generan al terminar el job (parquet y arrow necesitan pyarrow)
+
+# Progreso en vivo (SSE)
+SCRAPING_PROGRESS_REDIS_URL = env('SCRAPING_PROGRESS_REDIS_URL', default='')  # Vacío = en memoria, mismo proceso (obligatorio con SCRAPING_RUNNER=async)
+SCRAPING_PROGRESS_MIN_INTERVAL = env.float('SCRAPING_PROGRESS_MIN_INTERVAL', default=1.0)  # Segundos entre eventos
+SCRAPING_PROGRESS_HEARTBEAT = env.int('SCRAPING_PROGRESS_HEARTBEAT', default=15)
+SCRAPING_PROGRESS_MAX_STREAM_SECONDS = env.int('SCRAPING_PROGRESS_MAX_STREAM_SECONDS', default=300)  # Después corta y el EventSource se reconecta (libera el thread)
+
+# Extracción de tweets
+SCRAPING_EXTRACTION_MODE = env('SCRAPING_EXTRACTION_MODE', default='live')  # live (element handles), snapshot (HTML + pool) o push (MutationObserver)
+SCRAPING_PARSER_WORKERS = env.int('SCRAPING_PARSER_WORKERS', default=2)  # Procesos que parsean snapshots
+SCRAPING_SNAPSHOT_DIR = env('SCRAPING_SNAPSHOT_DIR', default='')  # Si se setea, guarda los snapshots (sirven de fixtures)
+SCRAPING_DOM_PRUNING = env.bool('SCRAPING_DOM_PRUNING', default=False)  # Vaciar los tweets ya extraídos
+SCRAPING_DOM_PRUNE_KEEP = env.int('SCRAPING_DOM_PRUNE_KEEP', default=40)  # Los últimos N quedan intactos
+SCRAPING_SAMPLE_PAGE_MEMORY = env.bool('SCRAPING_SAMPLE_PAGE_MEMORY', default=False)  # Heap y nodos por scroll (CDP)
+SCRAPING_SPA_NAVIGATION = env.bool('SCRAPING_SPA_NAVIGATION', default=True)  # Cambiar de ventana sin recargar la app
+SCRAPING_SPA_TIMEOUT = env.int('SCRAPING_SPA_TIMEOUT', default=10)  # Segundos antes de volver a goto
+SCRAPING_SEARCH_LOAD_TIMEOUT = env.int('SCRAPING_SEARCH_LOAD_TIMEOUT', default=20)  # Hasta ver resultados después de goto
+SCRAPING_VIEWPORT_PROFILE = env('SCRAPING_VIEWPORT_PROFILE', default='default')  # default o tall (viewport alto, sin animaciones)
+SCRAPING_TALL_VIEWPORT_HEIGHT = env.int('SCRAPING_TALL_VIEWPORT_HEIGHT', default=4000)  # Píxeles de alto en el perfil tall
+SCRAPING_TALL_DEVICE_SCALE = env.float('SCRAPING_TALL_DEVICE_SCALE', default=0.5)  # Menos píxeles que pintar por tweet
+SCRAPING_PREFETCH_WINDOWS = env.int('SCRAPING_PREFETCH_WINDOWS', default=0)  # Ventanas cargándose en otras páginas mientras se scrollea (0 = no)
+
+# Expansión de conversaciones (jobs con expand_conversations)
+SCRAPING_EXPANSION_CONCURRENCY = env.int('SCRAPING_EXPANSION_CONCURRENCY', default=3)  # Páginas abriendo tweets a la vez
+SCRAPING_EXPANSION_MAX_SCROLLS = env.int('SCRAPING_EXPANSION_MAX_SCROLLS', default=5)  # Scrolls de respuestas por conversación
+
+# Jobs de actualización de métricas (job_type=refresh)
+SCRAPING_REFRESH_CONCURRENCY = env.int('SCRAPING_REFRESH_CONCURRENCY', default=4)  # Detalles abiertos a la vez
+SCRAPING_REFRESH_TIMEOUT = env.int('SCRAPING_REFRESH_TIMEOUT', default=10)  # Segundos esperando la API antes de leer la página
+
+# Descarga de fotos y videos (jobs con download_media)
+SCRAPING_MEDIA_DIR = env('SCRAPING_MEDIA_DIR', default='tweets')  # Carpeta dentro de MEDIA_ROOT
+SCRAPING_MEDIA_CONCURRENCY = env.int('SCRAPING_MEDIA_CONCURRENCY', default=8)  # Descargas a la vez (y conexiones del pool)
+SCRAPING_MEDIA_RETRIES = env.int('SCRAPING_MEDIA_RETRIES', default=3)  # Reintentos por errores de conexión, 429 y 5xx
+SCRAPING_MEDIA_TIMEOUT = env.float('SCRAPING_MEDIA_TIMEOUT', default=30)  # Segundos para conectar y entre lecturas
+SCRAPING_MEDIA_MAX_MB = env.int('SCRAPING_MEDIA_MAX_MB', default=200)  # Archivos más grandes se descartan
+
+# Sesiones de las cuentas X
+SCRAPING_LOGIN_STEP_TIMEOUT = env.int('SCRAPING_LOGIN_STEP_TIMEOUT', default=15)  # Segundos por paso del login
+SCRAPING_LOGIN_TIMEOUT = env.int('SCRAPING_LOGIN_TIMEOUT', default=30)  # Hasta ver el home (captcha incluido)
+SCRAPING_SESSION_TRUST_MINUTES = env.int('SCRAPING_SESSION_TRUST_MINUTES', default=15)  # Sesión recién verificada: no se prueba
+SCRAPING_SESSION_CHECK_HOURS = env.int('SCRAPING_SESSION_CHECK_HOURS', default=6)  # refresh_sessions la verifica cada tanto
+SCRAPING_SESSION_REFRESH_HOURS = env.int('SCRAPING_SESSION_REFRESH_HOURS', default=48)  # Re-login si vence antes de esto
+
+# Escritura en la base
+SCRAPING_DB_BATCH_SIZE = env.int('SCRAPING_DB_BATCH_SIZE', default=2000)  # Tweets por transacción
+SCRAPING_DB_QUEUE_SIZE = env.int('SCRAPING_DB_QUEUE_SIZE', default=20)  # Tandas en cola antes de frenar al scraper
@@ -3,10 +3,13 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from apps.scraping.views import prometheus_metrics
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('apps.api.urls')),
     path('scraping/', include('apps.scraping.urls')),
+    path('metrics', prometheus_metrics, name='metrics'),
 ]
 
 if settings.DEBUG:
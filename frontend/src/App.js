@@ -118,7 +118,7 @@ function App() {
     console.log('Job iniciado correctamente')
     setStatusMessage({ text: 'Procesando tweets...', type: 'info' })
     
-    // 3. POLLING DEL STATUS (SIN LLAMAR A /start/ DE NUEVO)
+    // 3. CONSULTA DEL STATUS (SIN LLAMAR A /start/ DE NUEVO)
     let pollCount = 0
     const maxPolls = 150 // 5 minutos máximo
     
@@ -134,7 +134,7 @@ function App() {
         const jobData = await statusRes.json()
         console.log('Status:', jobData.status, 'Tweets:', jobData.tweets_count)
         
-        if (jobData.status === 'completed') {
+        if (jobData.status === 'completed' || jobData.status === 'budget_exceeded') {
           setStatusMessage({ text: 'Preparando descarga...', type: 'info' })
           
           const downloadRes = await fetch(`/scraping/api/jobs/${responseData.id}/download/`)
@@ -156,7 +156,7 @@ function App() {
           }
           
           return true
-        } else if (jobData.status === 'failed') {
+        } else if (jobData.status === 'failed' || jobData.status === 'cancelled') {
           throw new Error(jobData.error_message || 'El scraping falló')
         } else if (jobData.status === 'running') {
           setStatusMessage({ 
@@ -172,26 +172,64 @@ function App() {
       }
     }
     
-    const pollInterval = setInterval(async () => {
-      try {
-        pollCount++
-        if (pollCount > maxPolls) {
+    const startPolling = () => {
+      const pollInterval = setInterval(async () => {
+        try {
+          pollCount++
+          if (pollCount > maxPolls) {
+            clearInterval(pollInterval)
+            setButtonState('create')
+            setStatusMessage({ text: 'Timeout - verificá el estado en el admin', type: 'error' })
+            return
+          }
+          
+          const isDone = await checkStatus()
+          if (isDone) {
+            clearInterval(pollInterval)
+          }
+        } catch (error) {
           clearInterval(pollInterval)
           setButtonState('create')
-          setStatusMessage({ text: 'Timeout - verificá el estado en el admin', type: 'error' })
-          return
-        }
-        
-        const isDone = await checkStatus()
-        if (isDone) {
-          clearInterval(pollInterval)
+          setStatusMessage({ text: error.message, type: 'error' })
         }
+      }, 2000) // Cada 2 segundos
+    }
+    
+    // 4. PROGRESO EN VIVO POR SSE (si no hay EventSource, polling)
+    if (!window.EventSource) {
+      startPolling()
+      return
+    }
+    
+    const events = new EventSource(`/scraping/api/jobs/${responseData.id}/progress/`)
+    
+    events.addEventListener('progress', (e) => {
+      const data = JSON.parse(e.data)
+      setStatusMessage({ 
+        text: `Procesando... ${data.tweets || 0} tweets encontrados (${data.window.from} a ${data.window.to})`, 
+        type: 'info' 
+      })
+    })
+    
+    events.addEventListener('status', async (e) => {
+      const data = JSON.parse(e.data)
+      if (data.status === 'pending' || data.status === 'running' || data.status === 'waiting') return
+      
+      events.close()
+      try {
+        await checkStatus()
       } catch (error) {
-        clearInterval(pollInterval)
         setButtonState('create')
         setStatusMessage({ text: error.message, type: 'error' })
       }
-    }, 2000) // Cada 2 segundos
+    })
+    
+    events.onerror = () => {
+      // Se cortó el stream: seguimos consultando como antes
+      if (events.readyState === EventSource.CLOSED) {
+        startPolling()
+      }
+    }
     
   } catch (error) {
     console.error('Error en handleSubmit:', error)